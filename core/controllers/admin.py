@@ -19,6 +19,7 @@ __author__ = 'sll@google.com (Sean Lip)'
 import logging
 
 from core import counters
+from core import jobs_registry
 from core.controllers import base
 from core.controllers import editor
 from core.domain import config_domain
@@ -109,11 +110,23 @@ class AdminHandler(base.BaseHandler):
     def get(self):
         """Handles GET requests."""
 
+        jobs_data = []
+        for job_class in jobs_registry.BATCH_JOB_CLASSES:
+            job = job_class()
+            jobs_data.append({
+                'name': job_class.__name__,
+                'status_code': job.status_code,
+                'is_active': job.is_active,
+                'execution_time_sec': job.execution_time_sec,
+                'output': job.output,
+            })
+
         self.render_json({
             'config_properties': (
                 config_domain.Registry.get_config_property_schemas()),
             'computed_properties': (
                 config_domain.Registry.get_computed_property_names()),
+            'jobs': jobs_data,
         })
 
     @require_super_admin
@@ -145,6 +158,18 @@ class AdminHandler(base.BaseHandler):
                     'computed_property_name')
                 config_domain.Registry.get_config_property(
                     computed_property_name).refresh_default_value()
+            elif self.payload.get('action') == 'start_job':
+                job_name = self.payload.get('job_name')
+                job_class = jobs_registry.get_batch_job_class_by_name(
+                    job_name)
+                if job_class is None:
+                    raise Exception('Unknown job: %s' % job_name)
+                job = job_class()
+                if job.is_active:
+                    raise Exception('Job %s is already running.' % job_name)
+                logging.info(
+                    '[ADMIN] %s started job %s' % (self.user_id, job_name))
+                job.start()
 
             self.render_json({})
         except Exception as e:
@@ -14,6 +14,7 @@
 
 __author__ = 'Sean Lip'
 
+from core import jobs
 from core.controllers import editor
 from core.controllers import pages
 from core.domain import config_domain
@@ -92,6 +93,32 @@ class AdminIntegrationTest(test_utils.GenericTestBase):
 
         self.logout()
 
+    def test_start_job(self):
+        """Test that registered jobs can be started from the admin page."""
+        self.login('admin@example.com', is_super_admin=True)
+
+        response = self.testapp.get('/admin')
+        csrf_token = self.get_csrf_token_from_response(response)
+
+        job_name = 'ExplorationSummaryBackfillJob'
+        response_dict = self.get_json('/adminhandler')
+        self.assertIn(
+            job_name, [job['name'] for job in response_dict['jobs']])
+
+        self.post_json('/adminhandler', {
+            'action': 'start_job',
+            'job_name': job_name,
+        }, csrf_token)
+        self.process_deferred_tasks()
+
+        response_dict = self.get_json('/adminhandler')
+        job_data = [
+            job for job in response_dict['jobs'] if job['name'] == job_name][0]
+        self.assertEqual(job_data['status_code'], jobs.STATUS_CODE_COMPLETED)
+        self.assertFalse(job_data['is_active'])
+
+        self.logout()
+
     def test_change_splash_page_config_property(self):
         """Test that the correct variables show up on the splash page."""
         ACTUAL_SITE_NAME = 'oppia.org'
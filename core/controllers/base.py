@@ -18,6 +18,7 @@ __author__ = 'Sean Lip'
 
 import base64
 import datetime
+import hashlib
 import hmac
 import json
 import logging
@@ -65,6 +66,12 @@ def require_user(handler):
             self.redirect(current_user_services.create_login_url(
                 self.request.uri))
             return
+
+        # Creates the user's settings if this is their first request, since
+        # handlers that require a user may assume that these exist.
+        if self.user_settings is None:
+            raise Exception(
+                'Could not load the settings for user %s.' % self.user_id)
         return handler(self, **kwargs)
 
     return test_login
@@ -113,6 +120,20 @@ def require_registered_as_editor(handler):
     return test_registered_as_editor
 
 
+class CachePolicy(object):
+    """Describes how the successful GET responses of a handler may be cached
+    by browsers and by shared caches such as CDNs.
+
+    Responses that depend on the current user are only publicly cacheable
+    when they are served to anonymous users; they vary on the Cookie header
+    so that shared caches do not serve them to logged-in users.
+    """
+
+    def __init__(self, max_age_secs, depends_on_user=True):
+        self.max_age_secs = max_age_secs
+        self.depends_on_user = depends_on_user
+
+
 class BaseHandler(webapp2.RequestHandler):
     """Base class for all Oppia handlers."""
 
@@ -126,6 +147,9 @@ class BaseHandler(webapp2.RequestHandler):
     # TODO(sll): A weakness of the current approach is that the source and
     # destination page names have to be the same. Consider fixing this.
     PAGE_NAME_FOR_CSRF = ''
+    # The CachePolicy for responses of this handler, or None if they should
+    # not be cached by shared caches. Can be overridden by subclasses.
+    CACHE_POLICY = None
 
     @webapp2.cached_property
     def jinja2_env(self):
@@ -140,33 +164,63 @@ class BaseHandler(webapp2.RequestHandler):
         # Initializes the return dict for the handlers.
         self.values = {}
 
+        # Handlers with a CACHE_POLICY can set this to False to prevent a
+        # particular response from being cached publicly.
+        self.is_response_cacheable = True
+
         self.user = current_user_services.get_current_user(self.request)
         self.user_id = current_user_services.get_user_id(
             self.user) if self.user else None
 
-        if self.user_id:
-            email = current_user_services.get_user_email(self.user)
-            user_settings = user_services.get_or_create_user(
-                self.user_id, email)
-            self.username = user_settings.username
-
-            self.values['user_email'] = user_settings.email
-            self.values['username'] = self.username
-
-        self.is_moderator = rights_manager.Actor(self.user_id).is_moderator()
-        self.is_admin = rights_manager.Actor(self.user_id).is_admin()
-        self.is_super_admin = user_services.is_super_admin(
-            self.user_id, self.request)
-
-        self.values['is_moderator'] = self.is_moderator
-        self.values['is_admin'] = self.is_admin
-        self.values['is_super_admin'] = self.is_super_admin
-
         if self.request.get('payload'):
             self.payload = json.loads(self.request.get('payload'))
         else:
             self.payload = None
 
+    # The following properties are only computed if a handler uses them, so
+    # that requests which do not need them avoid the corresponding reads.
+    @webapp2.cached_property
+    def user_settings(self):
+        """The UserSettings of the current user, created if necessary, or None
+        if no user is logged in.
+        """
+        if not self.user_id:
+            return None
+        return user_services.get_or_create_user(
+            self.user_id, current_user_services.get_user_email(self.user))
+
+    @webapp2.cached_property
+    def username(self):
+        return self.user_settings.username if self.user_settings else None
+
+    @webapp2.cached_property
+    def is_moderator(self):
+        return rights_manager.Actor(self.user_id).is_moderator()
+
+    @webapp2.cached_property
+    def is_admin(self):
+        return rights_manager.Actor(self.user_id).is_admin()
+
+    @webapp2.cached_property
+    def is_super_admin(self):
+        return user_services.is_super_admin(self.user_id, self.request)
+
+    def _add_user_values(self, values):
+        """Adds the details of the current user to the given template values,
+        unless the handler has already set them.
+        """
+        user_values = {
+            'is_moderator': self.is_moderator,
+            'is_admin': self.is_admin,
+            'is_super_admin': self.is_super_admin,
+        }
+        if self.user_id:
+            user_values['user_email'] = self.user_settings.email
+            user_values['username'] = self.username
+
+        for (key, value) in user_values.iteritems():
+            values.setdefault(key, value)
+
     def unescape_state_name(self, escaped_state_name):
         """Unescape a state name that is encoded with encodeURIComponent."""
         return urllib.unquote(escaped_state_name).decode('utf-8')
@@ -205,7 +259,13 @@ class BaseHandler(webapp2.RequestHandler):
 
                 return self.handle_exception(e, self.app.debug)
 
-        super(BaseHandler, self).dispatch()
+        # Domain objects loaded while handling the request are cached until
+        # the response has been produced.
+        utils.RequestCache.start_request()
+        try:
+            super(BaseHandler, self).dispatch()
+        finally:
+            utils.RequestCache.end_request()
 
     def get(self, *args, **kwargs):
         """Base method to handle GET requests."""
@@ -223,6 +283,56 @@ class BaseHandler(webapp2.RequestHandler):
         """Base method to handle DELETE requests."""
         raise self.PageNotFoundException
 
+    def _is_response_publicly_cacheable(self):
+        """Returns whether the current response may be stored by shared
+        caches, according to the handler's CACHE_POLICY.
+        """
+        return bool(
+            self.CACHE_POLICY is not None and
+            self.is_response_cacheable and
+            self.request.method == 'GET' and
+            self.response.status_int == 200 and
+            not (self.CACHE_POLICY.depends_on_user and self.user_id))
+
+    def write_response_body(self, body):
+        """Writes the response body, applying the handler's CACHE_POLICY.
+
+        Publicly cacheable responses are given a strong ETag, and requests
+        whose If-None-Match header matches it receive an empty 304 response.
+        """
+        if self.CACHE_POLICY is None or self.request.method != 'GET':
+            self.response.write(body)
+            return
+
+        if self.CACHE_POLICY.depends_on_user:
+            self.response.headers['Vary'] = 'Accept-Encoding, Cookie'
+        else:
+            self.response.headers['Vary'] = 'Accept-Encoding'
+
+        if not self._is_response_publicly_cacheable():
+            if 'Cache-Control' not in self.response.headers:
+                self.response.headers['Cache-Control'] = 'private, no-cache'
+            self.response.write(body)
+            return
+
+        self.response.headers['Cache-Control'] = str(
+            'public, max-age=%s' % self.CACHE_POLICY.max_age_secs)
+        for header_name in ['Expires', 'Pragma']:
+            if header_name in self.response.headers:
+                del self.response.headers[header_name]
+
+        if isinstance(body, unicode):
+            body = body.encode('utf-8')
+        etag = str('"%s"' % hashlib.md5(body).hexdigest())
+        self.response.headers['ETag'] = etag
+
+        if_none_match = self.request.headers.get('If-None-Match', '')
+        if etag in [tag.strip() for tag in if_none_match.split(',')]:
+            self.response.set_status(304)
+            return
+
+        self.response.write(body)
+
     def render_json(self, values):
         self.response.content_type = 'application/javascript; charset=utf-8'
         self.response.headers['Content-Disposition'] = 'attachment'
@@ -230,8 +340,11 @@ class BaseHandler(webapp2.RequestHandler):
             'max-age=31536000; includeSubDomains')
         self.response.headers['X-Content-Type-Options'] = 'nosniff'
 
+        if values is self.values:
+            self._add_user_values(values)
+
         json_output = json.dumps(values, cls=utils.JSONEncoderForHTML)
-        self.response.write('%s%s' % (feconf.XSSI_PREFIX, json_output))
+        self.write_response_body('%s%s' % (feconf.XSSI_PREFIX, json_output))
 
         # Calculate the processing time of this request.
         duration = datetime.datetime.utcnow() - self.start_time
@@ -244,6 +357,8 @@ class BaseHandler(webapp2.RequestHandler):
             self, filename, values=None, iframe_restriction='DENY'):
         if values is None:
             values = self.values
+        if values is self.values:
+            self._add_user_values(values)
 
         values.update({
             'DEV_MODE': feconf.DEV_MODE,
@@ -294,7 +409,7 @@ class BaseHandler(webapp2.RequestHandler):
 
         self.response.expires = 'Mon, 01 Jan 1990 00:00:00 GMT'
         self.response.pragma = 'no-cache'
-        self.response.write(self.jinja2_env.get_template(
+        self.write_response_body(self.jinja2_env.get_template(
             filename).render(**values))
 
         # Calculate the processing time of this request.
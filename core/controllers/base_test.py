@@ -25,6 +25,7 @@ import webapp2
 import webtest
 
 from core.controllers import base
+from core.domain import user_services
 import main
 import test_utils
 
@@ -69,6 +70,22 @@ class BaseHandlerTest(test_utils.GenericTestBase):
         response = self.testapp.put('/gallery/extra', {}, expect_errors=True)
         self.assertEqual(response.status_int, 404)
 
+    def test_user_settings_are_only_loaded_when_needed(self):
+        """Test that the current user's settings are created lazily."""
+        user_id = self.get_user_id_from_email('user@example.com')
+        self.login('user@example.com')
+
+        self.testapp.get('/widgetrepository/data/interactive')
+        self.assertIsNone(user_services.get_user_settings(user_id))
+
+        response = self.testapp.get('/profile')
+        self.assertEqual(response.status_int, 200)
+        self.assertEqual(
+            user_services.get_user_settings(user_id).email,
+            'user@example.com')
+
+        self.logout()
+
 
 class CsrfTokenManagerTest(test_utils.GenericTestBase):
 
@@ -199,3 +216,45 @@ class EscapingTest(test_utils.GenericTestBase):
         self.assertIn('\\n\\u003cscript\\u003e\\u9a6c={{', response.body)
         self.assertNotIn('<script>', response.body)
         self.assertNotIn('马', response.body)
+
+
+class CachePolicyTest(test_utils.GenericTestBase):
+
+    class FakeCacheableHandler(base.BaseHandler):
+        """Fake handler for testing cache policies."""
+
+        CACHE_POLICY = base.CachePolicy(60)
+
+        def get(self):
+            """Handles GET requests."""
+            self.is_response_cacheable = not self.request.get('private')
+            self.render_json({'value': 'abc'})
+
+    def setUp(self):
+        super(CachePolicyTest, self).setUp()
+        self.testapp = webtest.TestApp(webapp2.WSGIApplication(
+            [webapp2.Route('/fake', self.FakeCacheableHandler)],
+            debug=feconf.DEBUG,
+        ))
+
+    def test_anonymous_responses_are_publicly_cacheable(self):
+        response = self.testapp.get('/fake')
+        self.assertEqual(
+            response.headers['Cache-Control'], 'public, max-age=60')
+        self.assertEqual(response.headers['Vary'], 'Accept-Encoding, Cookie')
+        etag = response.headers['ETag']
+
+        response = self.testapp.get(
+            '/fake', headers={'If-None-Match': etag}, status=304)
+        self.assertEqual(response.body, '')
+
+        response = self.testapp.get('/fake?private=true')
+        self.assertEqual(response.headers['Cache-Control'], 'private, no-cache')
+        self.assertNotIn('ETag', response.headers)
+
+        self.login('user@example.com')
+        response = self.testapp.get('/fake', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_int, 200)
+        self.assertEqual(response.headers['Cache-Control'], 'private, no-cache')
+        self.assertNotIn('ETag', response.headers)
+        self.logout()
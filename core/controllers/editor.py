@@ -168,21 +168,18 @@ class ExplorationPage(EditorHandler):
             widget_registry.Registry.get_interactive_widget_js(
                 all_interactive_widget_ids))
 
+        permissions = rights_manager.get_permissions(
+            self.user_id, [exploration_id])[exploration_id]
+
         self.values.update({
             'announcement': jinja2.utils.Markup(
                 EDITOR_PAGE_ANNOUNCEMENT.value),
-            'can_modify_roles': rights_manager.Actor(
-                self.user_id).can_modify_roles(exploration_id),
-            'can_publicize': rights_manager.Actor(
-                self.user_id).can_publicize(exploration_id),
-            'can_publish': rights_manager.Actor(self.user_id).can_publish(
-                exploration_id),
-            'can_release_ownership': rights_manager.Actor(
-                self.user_id).can_release_ownership(exploration_id),
-            'can_unpublicize': rights_manager.Actor(
-                self.user_id).can_unpublicize(exploration_id),
-            'can_unpublish': rights_manager.Actor(self.user_id).can_unpublish(
-                exploration_id),
+            'can_modify_roles': permissions['can_modify_roles'],
+            'can_publicize': permissions['can_publicize'],
+            'can_publish': permissions['can_publish'],
+            'can_release_ownership': permissions['can_release_ownership'],
+            'can_unpublicize': permissions['can_unpublicize'],
+            'can_unpublish': permissions['can_unpublish'],
             'nav_mode': feconf.NAV_MODE_CREATE,
             'object_editors_js': jinja2.utils.Markup(object_editors_js),
             'value_generators_js': jinja2.utils.Markup(value_generators_js),
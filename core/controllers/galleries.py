@@ -59,33 +59,58 @@ class LearnPage(base.BaseHandler):
 
 
 class LearnHandler(base.BaseHandler):
-    """Provides data for the exploration gallery page for learners."""
+    """Provides data for the exploration gallery page for learners.
+
+    Explorations are returned one page per category. If the optional
+    'category' parameter is given, only that category is returned, starting
+    at the optional 'cursor' parameter. The response includes, for each
+    category, the cursor at which its next page starts (or None).
+    """
+
+    CACHE_POLICY = base.CachePolicy(
+        feconf.LEARN_GALLERY_FIRST_PAGE_CACHE_TTL_SECS)
 
     def get(self):
         """Handles GET requests."""
-        # TODO(sll): Implement paging.
-        explorations_dict = (
-            exp_services.get_non_private_explorations_summary_dict())
+        category = self.request.get('category') or None
+        urlsafe_start_cursor = self.request.get('cursor') or None
+        if urlsafe_start_cursor and not category:
+            raise self.InvalidInputException(
+                'A cursor can only be used with a category.')
+
+        try:
+            pages_by_category = (
+                exp_services.get_non_private_exploration_summaries_by_category(
+                    category=category,
+                    urlsafe_start_cursor=urlsafe_start_cursor))
+        except ValueError as e:
+            raise self.InvalidInputException(e)
 
         categories = collections.defaultdict(list)
-        for (eid, exploration_data) in explorations_dict.iteritems():
-            categories[exploration_data['category']].append({
-                'id': eid,
-                'is_public': (
-                    exploration_data['rights']['status'] ==
-                    rights_manager.EXPLORATION_STATUS_PUBLIC),
-                'is_publicized': (
-                    exploration_data['rights']['status'] ==
-                    rights_manager.EXPLORATION_STATUS_PUBLICIZED),
-                'title': exploration_data['title'],
-                'to_playtest': False,
-            })
+        cursors = {}
+        for (category_name, page) in pages_by_category.iteritems():
+            for summary in page['summaries']:
+                categories[category_name].append({
+                    'id': summary['id'],
+                    'is_public': (
+                        summary['status'] ==
+                        rights_manager.EXPLORATION_STATUS_PUBLIC),
+                    'is_publicized': (
+                        summary['status'] ==
+                        rights_manager.EXPLORATION_STATUS_PUBLICIZED),
+                    'title': summary['title'],
+                    'to_playtest': False,
+                })
+            cursors[category_name] = page['cursor']
 
-        if self.user_id:
+        # Explorations to playtest are only shown on the first page.
+        if self.user_id and not urlsafe_start_cursor:
             playtest_dict = (
                 exp_services.get_explicit_viewer_explorations_summary_dict(
                     self.user_id))
             for (eid, exploration_data) in playtest_dict.iteritems():
+                if category and exploration_data['category'] != category:
+                    continue
                 categories[exploration_data['category']].append({
                     'id': eid,
                     'is_public': (
@@ -97,9 +122,11 @@ class LearnHandler(base.BaseHandler):
                     'title': exploration_data['title'],
                     'to_playtest': True,
                 })
+                cursors.setdefault(exploration_data['category'], None)
 
         self.values.update({
             'categories': categories,
+            'cursors': cursors,
         })
         self.render_json(self.values)
 
@@ -141,17 +168,18 @@ class ContributeHandler(base.BaseHandler):
             explorations_dict.update(
                 exp_services.get_non_private_explorations_summary_dict())
 
+        permissions = rights_manager.get_permissions(
+            self.user_id, explorations_dict.keys())
+
         categories = collections.defaultdict(list)
         for (eid, exploration_data) in explorations_dict.iteritems():
             categories[exploration_data['category']].append({
                 'id': eid,
                 'title': exploration_data['title'],
                 'can_clone': (
-                    rights_manager.Actor(self.user_id).can_clone(eid) or
-                    self.is_super_admin),
+                    permissions[eid]['can_clone'] or self.is_super_admin),
                 'can_edit': (
-                    rights_manager.Actor(self.user_id).can_edit(eid) or
-                    self.is_super_admin),
+                    permissions[eid]['can_edit'] or self.is_super_admin),
                 'is_private': (
                     exploration_data['rights']['status'] ==
                     rights_manager.EXPLORATION_STATUS_PRIVATE),
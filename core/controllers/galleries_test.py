@@ -60,9 +60,32 @@ class LearnGalleryTest(test_utils.GenericTestBase):
                     'id': '0',
                     'title': 'Welcome to Oppia!'
                 }]
-            }
+            },
+            'cursors': {'Welcome': None},
         }, response_dict)
 
+        # The explorations of a single category can be requested.
+        response_dict_for_category = self.get_json(
+            '%s?category=Welcome' % feconf.LEARN_GALLERY_DATA_URL)
+        self.assertEqual(
+            response_dict_for_category['categories'],
+            response_dict['categories'])
+        response_dict_for_category = self.get_json(
+            '%s?category=Other' % feconf.LEARN_GALLERY_DATA_URL)
+        self.assertEqual(response_dict_for_category['categories'], {})
+
+    def test_invalid_cursors_are_rejected(self):
+        """Test that malformed or misused cursors result in a 400 error."""
+        response = self.testapp.get(
+            '%s?category=Welcome&cursor=abc' % feconf.LEARN_GALLERY_DATA_URL,
+            expect_errors=True)
+        self.assertEqual(response.status_int, 400)
+
+        response = self.testapp.get(
+            '%s?cursor=abc' % feconf.LEARN_GALLERY_DATA_URL,
+            expect_errors=True)
+        self.assertEqual(response.status_int, 400)
+
     def test_login_message(self):
         """Test that the login message appears when appropriate."""
         response = self.testapp.get(feconf.LEARN_GALLERY_URL)
@@ -151,7 +174,8 @@ class LearnGalleryTest(test_utils.GenericTestBase):
             'is_admin': False,
             'is_moderator': False,
             'is_super_admin': False,
-            'categories': {}
+            'categories': {},
+            'cursors': {},
         }, response_dict)
 
         # If PA logs in, he sees exploration A but not exploration B on the
@@ -171,6 +195,7 @@ class LearnGalleryTest(test_utils.GenericTestBase):
                     'title': 'A'
                 }]
             },
+            'cursors': {'Test Explorations': None},
             'user_email': PLAYTESTER_A_EMAIL,
             'username': None,
         }, response_dict)
@@ -261,7 +286,7 @@ class ContributeGalleryTest(test_utils.GenericTestBase):
         self.assertDictContainsSubset({
             'is_admin': False,
             'is_super_admin': False,
-            'categories': {}
+            'categories': {},
         }, response_dict)
         self.logout()
 
@@ -96,10 +96,10 @@ class EditorPrerequisitesHandler(base.BaseHandler):
     @base.require_user
     def get(self):
         """Handles GET requests."""
-        user_settings = user_services.get_user_settings(self.user_id)
         self.render_json({
-            'has_agreed_to_terms': bool(user_settings.last_agreed_to_terms),
-            'username': user_settings.username,
+            'has_agreed_to_terms': bool(
+                self.user_settings.last_agreed_to_terms),
+            'username': self.user_settings.username,
         })
 
     @base.require_user
@@ -19,7 +19,6 @@ __author__ = 'Sean Lip'
 from core.controllers import base
 from core.domain import exp_services
 from core.domain import rights_manager
-from core.domain import skins_services
 from core.domain import stats_services
 from core.domain import widget_registry
 import feconf
@@ -62,26 +61,19 @@ class ExplorationPage(base.BaseHandler):
 
         is_iframed = (self.request.get('iframed') == 'true')
 
-        # TODO(sll): Cache these computations.
-        interactive_widget_ids = exploration.get_interactive_widget_ids()
-        widget_dependencies = (
-            widget_registry.Registry.get_dependencies_html(
-                interactive_widget_ids))
-        widget_js_directives = (
-            widget_registry.Registry.get_noninteractive_widget_js() +
-            widget_registry.Registry.get_interactive_widget_js(
-                interactive_widget_ids))
+        reader_bundle = exp_services.get_reader_bundle(exploration)
 
         self.values.update({
-            'content': skins_services.get_skin_html(exploration.default_skin),
+            'content': jinja2.utils.Markup(reader_bundle['skin_html']),
             'exploration_version': version,
             'iframed': is_iframed,
             'is_private': rights_manager.is_exploration_private(
                 exploration_id),
             'nav_mode': feconf.NAV_MODE_EXPLORE,
-            'widget_js_directives': jinja2.utils.Markup(widget_js_directives),
+            'widget_js_directives': jinja2.utils.Markup(
+                reader_bundle['widget_js_directives']),
             'widget_dependencies': jinja2.utils.Markup(
-                widget_dependencies),
+                reader_bundle['widget_dependencies']),
         })
 
         if is_iframed:
@@ -94,10 +86,13 @@ class ExplorationPage(base.BaseHandler):
 class ExplorationHandler(base.BaseHandler):
     """Provides the initial data for a single exploration."""
 
+    # Shared caches must revalidate these responses on every request, so that
+    # the hit on the initial state is still recorded; unchanged responses
+    # are then served as empty 304s.
+    CACHE_POLICY = base.CachePolicy(0)
+
     def get(self, exploration_id):
         """Populates the data on the individual exploration page."""
-        # TODO(sll): Maybe this should send a complete state machine to the
-        # frontend, and all interaction would happen client-side?
         version = self.request.get('v')
         if not version:
             version = None
@@ -108,6 +103,9 @@ class ExplorationHandler(base.BaseHandler):
         except Exception as e:
             raise self.PageNotFoundException(e)
 
+        self.is_response_cacheable = (
+            not rights_manager.is_exploration_private(exploration_id))
+
         init_params = exploration.get_init_params()
         reader_params = exploration.update_with_state_params(
             exploration.init_state_name, init_params)
@@ -117,13 +115,18 @@ class ExplorationHandler(base.BaseHandler):
         interactive_widget = widget_registry.Registry.get_widget_by_id(
             feconf.INTERACTIVE_PREFIX, init_state.widget.widget_id)
         interactive_html = interactive_widget.get_interactive_widget_tag(
-            init_state.widget.customization_args, reader_params)
+            init_state.widget.customization_args, reader_params,
+            cache_key=(
+                exploration_id, exploration.version,
+                exploration.init_state_name))
 
         self.values.update({
             'init_html': init_state.content[0].to_html(reader_params),
             'interactive_html': interactive_html,
             'params': reader_params,
             'state_history': [exploration.init_state_name],
+            'state_machine': exp_services.get_reader_bundle(
+                exploration)['state_machine'],
             'state_name': exploration.init_state_name,
             'title': exploration.title,
         })
@@ -133,24 +136,24 @@ class ExplorationHandler(base.BaseHandler):
             exploration_id, exploration.init_state_name, True)
 
 
+def _record_answer_submitted(
+        event_batch, exploration_id, old_state, old_state_name, old_params,
+        handler, rule, answer):
+    """Adds the reader's answer to a batch of statistics events."""
+    widget = widget_registry.Registry.get_widget_by_id(
+        feconf.INTERACTIVE_PREFIX, old_state.widget.widget_id)
+
+    recorded_answer = widget.get_stats_log_html(
+        old_state.widget.customization_args, old_params, answer)
+    event_batch.record_answer_submitted(
+        exploration_id, 1, old_state_name, handler, rule, recorded_answer)
+
+
 class FeedbackHandler(base.BaseHandler):
     """Handles feedback to readers."""
 
     REQUIRE_PAYLOAD_CSRF_CHECK = False
 
-    def _append_answer_to_stats_log(
-            self, old_state, answer, exploration_id, exploration_version,
-            old_state_name, old_params, handler, rule):
-        """Append the reader's answer to the statistics log."""
-        widget = widget_registry.Registry.get_widget_by_id(
-            feconf.INTERACTIVE_PREFIX, old_state.widget.widget_id)
-
-        recorded_answer = widget.get_stats_log_html(
-            old_state.widget.customization_args, old_params, answer)
-        stats_services.EventHandler.record_answer_submitted(
-            exploration_id, 1, old_state_name, handler, rule,
-            recorded_answer)
-
     def _append_content(self, exploration, sticky, finished, old_params,
                         new_state, new_state_name, state_has_changed):
         """Appends content for the new state to the output variables."""
@@ -172,7 +175,9 @@ class FeedbackHandler(base.BaseHandler):
             widget_registry.Registry.get_widget_by_id(
                 feconf.INTERACTIVE_PREFIX, new_state.widget.widget_id
             ).get_interactive_widget_tag(
-                new_state.widget.customization_args, new_params)
+                new_state.widget.customization_args, new_params,
+                cache_key=(
+                    exploration.id, exploration.version, new_state_name))
         )
 
         return (new_params, question_html, interactive_html)
@@ -211,7 +216,10 @@ class FeedbackHandler(base.BaseHandler):
             None if new_state_name == feconf.END_DEST
             else exploration.states[new_state_name])
 
-        stats_services.EventHandler.record_state_hit(
+        # The statistics for this answer are recorded together once the
+        # response has been prepared.
+        event_batch = stats_services.EventBatch()
+        event_batch.record_state_hit(
             exploration_id, new_state_name,
             (new_state_name not in state_history))
         state_history.append(new_state_name)
@@ -230,9 +238,9 @@ class FeedbackHandler(base.BaseHandler):
             new_state.widget.widget_id == old_state.widget.widget_id
         )
 
-        self._append_answer_to_stats_log(
-            old_state, answer, exploration_id, exploration.version,
-            old_state_name, old_params, handler, rule)
+        _record_answer_submitted(
+            event_batch, exploration_id, old_state, old_state_name,
+            old_params, handler, rule, answer)
 
         # Append the reader's answer to the response HTML.
         reader_response_html = old_widget.get_reader_response_html(
@@ -264,6 +272,93 @@ class FeedbackHandler(base.BaseHandler):
 
         self.render_json(values)
 
+        event_batch.flush()
+
+
+class StatsEventsHandler(base.BaseHandler):
+    """Records batches of events from readers who play explorations using
+    the client-side state machine.
+    """
+
+    REQUIRE_PAYLOAD_CSRF_CHECK = False
+
+    @require_viewer
+    def post(self, exploration_id):
+        """Handles POST requests."""
+        # The version of the exploration.
+        version = self.payload.get('version')
+        # A list of event dicts, each with a 'type' key.
+        events = self.payload.get('events', [])
+
+        if not isinstance(events, list):
+            raise self.InvalidInputException('Expected a list of events.')
+        if len(events) > feconf.MAX_EVENTS_PER_STATS_REQUEST:
+            raise self.InvalidInputException(
+                'Expected at most %s events, received %s.' %
+                (feconf.MAX_EVENTS_PER_STATS_REQUEST, len(events)))
+
+        try:
+            exploration = exp_services.get_exploration_by_id(
+                exploration_id, version=version)
+        except Exception as e:
+            raise self.PageNotFoundException(e)
+
+        # Every event is validated before any of them are recorded.
+        event_batch = stats_services.EventBatch()
+        for event in events:
+            if not isinstance(event, dict):
+                raise self.InvalidInputException('Invalid event: %s' % event)
+
+            state_name = event.get('state_name')
+            if not isinstance(state_name, basestring):
+                raise self.InvalidInputException(
+                    'Invalid state name: %s' % state_name)
+
+            if event.get('type') == 'state_hit':
+                if (state_name not in exploration.states and
+                        state_name != feconf.END_DEST):
+                    raise self.InvalidInputException(
+                        'Invalid state name: %s' % state_name)
+                if not isinstance(event.get('first_time'), bool):
+                    raise self.InvalidInputException(
+                        'Expected first_time to be a boolean.')
+
+                event_batch.record_state_hit(
+                    exploration_id, state_name, event['first_time'])
+            elif event.get('type') == 'answer_submitted':
+                if state_name not in exploration.states:
+                    raise self.InvalidInputException(
+                        'Invalid state name: %s' % state_name)
+                if 'answer' not in event:
+                    raise self.InvalidInputException('No answer given.')
+
+                # Answers are classified again here so that the statistics
+                # do not depend on the rules reported by the client.
+                handler = event.get('handler')
+                old_params = {'answer': event['answer']}
+
+                old_state = exploration.states[state_name]
+                try:
+                    answer = widget_registry.Registry.get_widget_by_id(
+                        feconf.INTERACTIVE_PREFIX, old_state.widget.widget_id
+                    ).normalize_answer(event['answer'], handler)
+                    rule = exploration.classify(
+                        state_name, handler, answer, old_params)
+                except Exception as e:
+                    raise self.InvalidInputException(
+                        'Could not classify answer: %s' % e)
+
+                _record_answer_submitted(
+                    event_batch, exploration_id, old_state, state_name,
+                    old_params, handler, rule, answer)
+            else:
+                raise self.InvalidInputException(
+                    'Invalid event type: %s' % event.get('type'))
+
+        self.render_json({})
+
+        event_batch.flush()
+
 
 class ReaderFeedbackHandler(base.BaseHandler):
     """Submits feedback from the reader."""
@@ -20,6 +20,7 @@ from core.domain import config_services
 from core.domain import exp_domain
 from core.domain import exp_services
 from core.domain import rights_manager
+from core.domain import stats_services
 import feconf
 import test_utils
 
@@ -102,6 +103,80 @@ class ReaderPermissionsTest(test_utils.GenericTestBase):
         self.assertNotIn('This is a preview', response.body)
 
 
+class StatsEventsHandlerTest(test_utils.GenericTestBase):
+    """Test the recording of batched reader events."""
+
+    def test_record_events(self):
+        exp_services.delete_demo('0')
+        exp_services.load_demo('0')
+        exploration = exp_services.get_exploration_by_id('0')
+        init_state_name = exploration.init_state_name
+
+        self.post_json('%s/0' % feconf.EXPLORATION_EVENTS_URL_PREFIX, {
+            'events': [{
+                'type': 'state_hit',
+                'state_name': init_state_name,
+                'first_time': True
+            }, {
+                'type': 'answer_submitted',
+                'state_name': init_state_name,
+                'handler': 'submit',
+                'answer': 0
+            }],
+            'version': exploration.version
+        })
+
+        self.assertEqual(
+            stats_services.get_exploration_visit_count('0'), 1)
+        self.assertEqual(sum([
+            rule_stats['rule_hits'] for rule_stats in
+            stats_services.get_state_rules_stats(
+                '0', init_state_name).values()]), 1)
+
+        self.post_json('%s/0' % feconf.EXPLORATION_EVENTS_URL_PREFIX, {
+            'events': [{'type': 'unknown'}],
+            'version': exploration.version
+        }, expect_errors=True, expected_status_int=400)
+
+    def test_invalid_events_are_rejected(self):
+        exp_services.delete_demo('0')
+        exp_services.load_demo('0')
+        exploration = exp_services.get_exploration_by_id('0')
+        init_state_name = exploration.init_state_name
+
+        valid_state_hit = {
+            'type': 'state_hit',
+            'state_name': init_state_name,
+            'first_time': True
+        }
+        # Each request starts with a valid event, which must not be recorded
+        # if a later event is invalid.
+        for invalid_events in [
+                ['event'],
+                [{'type': 'state_hit', 'state_name': 'Unknown state',
+                  'first_time': True}],
+                [{'type': 'state_hit', 'state_name': init_state_name}],
+                [{'type': 'state_hit', 'state_name': [], 'first_time': True}],
+                [{'type': 'answer_submitted', 'state_name': init_state_name,
+                  'handler': 'submit'}],
+                [{'type': 'answer_submitted', 'state_name': init_state_name,
+                  'handler': 'unknown_handler', 'answer': 0}],
+                [valid_state_hit] * feconf.MAX_EVENTS_PER_STATS_REQUEST]:
+            self.post_json('%s/0' % feconf.EXPLORATION_EVENTS_URL_PREFIX, {
+                'events': [valid_state_hit] + invalid_events,
+                'version': exploration.version
+            }, expect_errors=True, expected_status_int=400)
+
+        self.post_json('%s/0' % feconf.EXPLORATION_EVENTS_URL_PREFIX, {
+            'events': 'events',
+            'version': exploration.version
+        }, expect_errors=True, expected_status_int=400)
+
+        # None of the events in the rejected requests are recorded.
+        self.assertEqual(
+            stats_services.get_exploration_visit_count('0'), 0)
+
+
 class ReaderControllerEndToEndTests(test_utils.GenericTestBase):
     """Test the reader controller using the sample explorations."""
 
@@ -30,24 +30,29 @@ import feconf
 class ObjectEditorTemplateHandler(base.BaseHandler):
     """Retrieves a template for an object editor."""
 
+    CACHE_POLICY = base.CachePolicy(3600, depends_on_user=False)
+
     def get(self, obj_type):
         """Handles GET requests."""
         try:
-            self.response.write(
-                obj_services.Registry.get_object_class_by_type(
-                    obj_type).get_editor_html_template())
+            html_template = obj_services.Registry.get_object_class_by_type(
+                obj_type).get_editor_html_template()
         except Exception as e:
             logging.error('Object editor not found: %s. %s' % (obj_type, e))
             raise self.PageNotFoundException
 
+        self.write_response_body(html_template)
+
 
 class ValueGeneratorHandler(base.BaseHandler):
     """Retrieves the HTML template for a value generator editor."""
 
+    CACHE_POLICY = base.CachePolicy(3600, depends_on_user=False)
+
     def get(self, generator_id):
         """Handles GET requests."""
         try:
-            self.response.write(
+            html_template = (
                 value_generators_domain.Registry.get_generator_class_by_id(
                     generator_id).get_html_template())
         except Exception as e:
@@ -55,13 +60,30 @@ class ValueGeneratorHandler(base.BaseHandler):
                           (generator_id, e))
             raise self.PageNotFoundException
 
+        self.write_response_body(html_template)
+
 
 class ImageHandler(base.BaseHandler):
     """Handles image retrievals."""
 
+    # The Cache-Control header for a specific version of an image. Version
+    # numbers are reused if an exploration is fully deleted and then created
+    # again, so these are only cached for a short while, and then revalidated
+    # using the ETag.
+    VERSIONED_CACHE_CONTROL = 'public, max-age=%s' % (
+        feconf.VERSIONED_IMAGE_CACHE_MAX_AGE_SECS)
+    # The Cache-Control header for the latest version of an image. Browsers
+    # must revalidate these using the ETag before reusing them.
+    UNVERSIONED_CACHE_CONTROL = 'no-cache'
+
     def get(self, exploration_id, encoded_filepath):
         """Returns an image.
 
+        If the 'v' query parameter is supplied, the given version of the image
+        is returned, and may be cached by the browser for
+        feconf.VERSIONED_IMAGE_CACHE_MAX_AGE_SECS seconds. Otherwise, the
+        latest version is returned.
+
         Args:
             exploration_id: the id of the exploration.
             encoded_filepath: a string representing the image filepath. This
@@ -70,18 +92,88 @@ class ImageHandler(base.BaseHandler):
         try:
             filepath = urllib.unquote(encoded_filepath)
             file_format = filepath[(filepath.rfind('.') + 1):]
-            # If the following is not cast to str, an error occurs in the wsgi
-            # library because unicode gets used.
-            self.response.headers['Content-Type'] = str(
-                'image/%s' % file_format)
+            version = self.request.get('v')
+            version = int(version) if version else None
 
             fs = fs_domain.AbstractFileSystem(
                 fs_domain.ExplorationFileSystem(exploration_id))
-            raw = fs.get(filepath)
-            self.response.write(raw)
+            file_stream = fs.open(filepath, version=version)
+            if file_stream is None:
+                raise IOError('File %s not found.' % filepath)
         except:
             raise self.PageNotFoundException
 
+        # If the following are not cast to str, an error occurs in the wsgi
+        # library because unicode gets used.
+        self.response.headers['Content-Type'] = str(
+            'image/%s' % file_format)
+        self.response.headers['Cache-Control'] = (
+            self.VERSIONED_CACHE_CONTROL if version
+            else self.UNVERSIONED_CACHE_CONTROL)
+        self.response.headers['Accept-Ranges'] = 'bytes'
+        etag = str('"%s"' % file_stream.content_hash)
+        self.response.headers['ETag'] = etag
+
+        if_none_match = self.request.headers.get('If-None-Match', '')
+        if etag in [tag.strip() for tag in if_none_match.split(',')]:
+            self.response.set_status(304)
+            return
+
+        size = file_stream.metadata.size
+        start, stop = 0, size
+        range_header = self.request.headers.get('Range')
+        if range_header:
+            byte_range = _parse_byte_range(range_header, size)
+            if byte_range is None:
+                self.response.set_status(416)
+                self.response.headers['Content-Range'] = str(
+                    'bytes */%s' % size)
+                return
+            start, stop = byte_range
+            if (start, stop) != (0, size):
+                self.response.set_status(206)
+                self.response.headers['Content-Range'] = str(
+                    'bytes %s-%s/%s' % (start, stop - 1, size))
+
+        # Note that webapp2 buffers the whole response body, so the requested
+        # range is held in memory before it is sent; reading it a chunk at a
+        # time only bounds the size of each datastore read.
+        for chunk in file_stream.iter_chunks(start, stop):
+            self.response.write(chunk)
+
+
+def _parse_byte_range(range_header, size):
+    """Parses the value of a Range header for a file of the given size.
+
+    Only single byte ranges are supported. Headers that cannot be parsed, or
+    that specify several ranges, are treated as a request for the whole file.
+
+    Returns:
+        A (start, stop) tuple, where start is the index of the first byte
+        to return and stop is one more than the index of the last byte to
+        return, or None if the range cannot be satisfied.
+    """
+    units, _, byte_range = range_header.partition('=')
+    if units.strip() != 'bytes' or ',' in byte_range:
+        return (0, size)
+
+    first, _, last = byte_range.strip().partition('-')
+    try:
+        if first:
+            start = int(first)
+            stop = int(last) + 1 if last else size
+        else:
+            # This is a suffix range, e.g. 'bytes=-500' for the last 500
+            # bytes.
+            start = max(size - int(last), 0)
+            stop = size
+    except ValueError:
+        return (0, size)
+
+    if start >= size or stop <= start:
+        return None
+    return (start, min(stop, size))
+
 
 class StaticFileHandler(base.BaseHandler):
     """Handles static file serving on non-GAE platforms."""
@@ -62,6 +62,56 @@ class ImageHandlerTest(test_utils.GenericTestBase):
         self.assertEqual(response.content_type, 'image/png')
         self.assertEqual(response.body, raw_image)
 
+    def test_image_caching_headers(self):
+        """Test the caching headers and conditional requests for images."""
+
+        self._initialize()
+
+        self.login(self.EDITOR_EMAIL, is_super_admin=True)
+        response = self.testapp.get('/create/0')
+        csrf_token = self.get_csrf_token_from_response(response)
+
+        with open(os.path.join(feconf.TESTS_DATA_DIR, 'img.png')) as f:
+            raw_image = f.read()
+        response_dict = self.post_json(
+            '%s/0' % self.IMAGE_UPLOAD_URL_PREFIX,
+            {'filename': 'test.png'},
+            csrf_token=csrf_token,
+            upload_files=(('image', 'unused_filename', raw_image),)
+        )
+        image_url = str(
+            '%s/0/%s' % (self.IMAGE_VIEW_URL_PREFIX, response_dict['filepath']))
+
+        self.logout()
+
+        response = self.testapp.get(image_url)
+        self.assertEqual(response.headers['Cache-Control'], 'no-cache')
+        etag = response.headers['ETag']
+
+        response = self.testapp.get(
+            image_url, headers={'If-None-Match': etag}, status=304)
+        self.assertEqual(response.body, '')
+
+        response = self.testapp.get('%s?v=1' % image_url)
+        self.assertEqual(response.body, raw_image)
+        self.assertEqual(
+            response.headers['Cache-Control'],
+            'public, max-age=%s' % feconf.VERSIONED_IMAGE_CACHE_MAX_AGE_SECS)
+        self.assertEqual(response.headers['ETag'], etag)
+
+        self.testapp.get('%s?v=2' % image_url, status=404)
+
+        response = self.testapp.get(
+            image_url, headers={'Range': 'bytes=0-9'}, status=206)
+        self.assertEqual(response.body, raw_image[:10])
+        self.assertEqual(
+            response.headers['Content-Range'],
+            'bytes 0-9/%s' % len(raw_image))
+
+        self.testapp.get(
+            image_url, headers={'Range': 'bytes=%s-' % len(raw_image)},
+            status=416)
+
     def test_upload_empty_image(self):
         """Test upload of an empty image."""
 
@@ -25,6 +25,9 @@ from core.domain import widget_registry
 class WidgetRepositoryHandler(base.BaseHandler):
     """Populates the widget repository pages."""
 
+    # Widget definitions only change when the app is deployed.
+    CACHE_POLICY = base.CachePolicy(3600, depends_on_user=False)
+
     def get(self, widget_type):
         """Handles GET requests."""
         try:
@@ -81,6 +81,13 @@ MEMCACHE_DELETE_FAILURE = PerfCounter(
     'memcache-delete-failure',
     'Number of times an object failed to be deleted from memcache')
 
+JINJA_TEMPLATE_CACHE_HIT = PerfCounter(
+    'jinja-template-cache-hit',
+    'Number of times a compiled Jinja template was found in the cache')
+JINJA_TEMPLATE_CACHE_MISS = PerfCounter(
+    'jinja-template-cache-miss',
+    'Number of times a Jinja template had to be compiled')
+
 HTML_RESPONSE_TIME_SECS = PerfCounter(
     'html-response-time-secs',
     'Total processing time for all HTML responses, in seconds')
@@ -17,11 +17,14 @@
 __author__ = 'Sean Lip'
 
 
+import time
+
 from core.domain import obj_services
 from core.domain import user_services
 from core.platform import models
 (config_models,) = models.Registry.import_models([models.NAMES.config])
 memcache_services = models.Registry.import_memcache_services()
+import feconf
 
 
 COMPUTED_PROPERTY_PREFIX = 'computed:'
@@ -86,11 +89,22 @@ class ConfigProperty(object):
 
 
 class ComputedProperty(ConfigProperty):
-    """A property whose default value is computed using a given function."""
+    """A property whose default value is computed using a given function.
+
+    The computed value is kept in the memory of each instance for
+    feconf.COMPUTED_PROPERTY_CACHE_TTL_SECS seconds, or until invalidate() is
+    called.
+    """
 
     def refresh_default_value(self):
         memcache_services.delete_multi([self.name])
         self._default_value = self.fn(*self.args)
+        self._value_set = None
+        self._last_refreshed_time = time.time()
+
+    def invalidate(self):
+        """Causes the value to be recomputed the next time it is accessed."""
+        self._last_refreshed_time = None
 
     def __init__(self, name, obj_type, description, fn, *args):
         self.fn = fn
@@ -101,12 +115,31 @@ class ComputedProperty(ConfigProperty):
             '%s%s' % (COMPUTED_PROPERTY_PREFIX, name),
             obj_type, description, default_value)
 
+        # A frozenset of the items in the value, built when first needed by
+        # contains().
+        self._value_set = None
+        self._last_refreshed_time = time.time()
+
     @property
     def value(self):
-        """Compute the value on the fly."""
-        self.refresh_default_value()
+        """Compute the value, unless a recently computed value is cached."""
+        if (self._last_refreshed_time is None or
+                time.time() - self._last_refreshed_time >=
+                feconf.COMPUTED_PROPERTY_CACHE_TTL_SECS):
+            self.refresh_default_value()
         return self.default_value
 
+    def contains(self, item):
+        """Returns whether the value of this property contains the item.
+
+        This uses a set lookup, so it should be preferred over checking
+        membership in the value directly.
+        """
+        value = self.value
+        if self._value_set is None:
+            self._value_set = frozenset(value)
+        return item in self._value_set
+
 
 class Registry(object):
     """Registry of all configuration properties."""
@@ -138,6 +171,17 @@ class Registry(object):
 
         return schemas_dict
 
+    @classmethod
+    def invalidate_computed_properties(cls):
+        """Causes all computed properties to be recomputed on next access.
+
+        This should be called whenever a config property changes, since
+        computed properties may depend on it.
+        """
+        for (property_name, instance) in cls._config_registry.iteritems():
+            if property_name.startswith(COMPUTED_PROPERTY_PREFIX):
+                instance.invalidate()
+
     @classmethod
     def get_computed_property_names(cls):
         """Return a list of computed property names."""
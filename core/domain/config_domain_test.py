@@ -0,0 +1,60 @@
+# coding: utf-8
+#
+# Copyright 2014 The Oppia Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS-IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for config properties."""
+
+from core.domain import config_domain
+from core.domain import config_services
+import feconf
+import test_utils
+
+
+class ComputedPropertyTests(test_utils.GenericTestBase):
+    """Tests for the caching of computed properties."""
+
+    def test_computed_values_are_cached_until_invalidated(self):
+        admin_id = self.get_user_id_from_email('admin@example.com')
+        self.assertFalse(config_domain.ADMIN_IDS.contains(admin_id))
+
+        # Changing a config property invalidates the computed properties.
+        config_services.set_property(
+            feconf.ADMIN_COMMITTER_ID, 'admin_emails', ['admin@example.com'])
+        self.assertTrue(config_domain.ADMIN_IDS.contains(admin_id))
+        self.assertEqual(config_domain.ADMIN_IDS.value, [admin_id])
+
+        num_calls = {'count': 0}
+
+        def _compute_value():
+            num_calls['count'] += 1
+            return ['value']
+
+        computed_property = config_domain.ComputedProperty(
+            'test_property', 'SetOfUnicodeString', 'A test property',
+            _compute_value)
+        # The property is registered globally, so it must be removed even if
+        # the test fails.
+        self.addCleanup(
+            config_domain.Registry._config_registry.pop,
+            computed_property.name)
+        self.assertEqual(num_calls['count'], 1)
+
+        self.assertTrue(computed_property.contains('value'))
+        self.assertEqual(computed_property.value, ['value'])
+        self.assertEqual(num_calls['count'], 1)
+
+        computed_property.invalidate()
+        self.assertEqual(computed_property.value, ['value'])
+        self.assertEqual(num_calls['count'], 2)
@@ -52,6 +52,9 @@ def set_property(committer_id, name, value):
     memcache_services.set_multi({
         datastore_item.id: datastore_item.value})
 
+    # Computed properties may depend on the value that was just changed.
+    config_domain.Registry.invalidate_computed_properties()
+
 
 def revert_property(committer_id, name):
     """Reverts a property value to the default value."""
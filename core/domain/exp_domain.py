@@ -38,6 +38,12 @@ import jinja_utils
 import utils
 
 
+# An in-process cache of compiled answer handlers. Each key is a tuple
+# (exploration_id, version, state_name, handler_name); see
+# Exploration._get_compiled_rules() for the format of the values.
+_COMPILED_RULES_CACHE = utils.LRUCache(feconf.MAX_COMPILED_HANDLERS_IN_CACHE)
+
+
 class ExplorationChange(object):
     """Domain object class for an exploration change.
 
@@ -643,7 +649,7 @@ class Exploration(object):
 
     def __init__(self, exploration_id, title, category, default_skin,
                  init_state_name, states_dict, param_specs_dict,
-                 param_changes_list, version):
+                 param_changes_list, version, created_on=None):
         self.id = exploration_id
         self.title = title
         self.category = category
@@ -663,6 +669,10 @@ class Exploration(object):
             for param_change_dict in param_changes_list]
 
         self.version = version
+        # The time at which the exploration was created, if it has been
+        # saved. An exploration that is deleted and then recreated with the
+        # same id has a different creation time.
+        self.created_on = created_on
 
     @classmethod
     def create_default_exploration(cls, exploration_id, title, category):
@@ -1101,24 +1111,58 @@ class Exploration(object):
 
         return state_dict
 
-    def classify(self, state_name, handler_name, answer, params):
-        """Return the first rule that is satisfied by a reader's answer."""
+    def _get_compiled_rules(self, state_name, handler_name):
+        """Returns the compiled rules for the given state's answer handler.
+
+        The result is a 2-tuple whose first element is the answer handler
+        instance and whose second element is a list of rule_domain.CompiledRule
+        objects, one per rule spec of the handler (in the same order).
+
+        Compiled rules are cached per exploration version. Since an in-memory
+        exploration may have been modified without its version changing, the
+        cached entry is only reused if the widget id, rule definitions and
+        param types it was compiled from are unchanged.
+        """
         state = self.states[state_name]
+        handler = next(
+            h for h in state.widget.handlers if h.name == handler_name)
+
+        compilation_inputs = (
+            state.widget.widget_id,
+            [rule_spec.definition for rule_spec in handler.rule_specs],
+            {ps_name: ps_val.obj_type
+             for (ps_name, ps_val) in self.param_specs.iteritems()})
+
+        cache_key = (self.id, self.version, state_name, handler_name)
+        cached_entry = _COMPILED_RULES_CACHE.get(cache_key)
+        if cached_entry is not None and cached_entry[0] == compilation_inputs:
+            return handler, cached_entry[1]
 
         # Get the widget to determine the input type.
         generic_handler = widget_registry.Registry.get_widget_by_id(
             feconf.INTERACTIVE_PREFIX, state.widget.widget_id
         ).get_handler_by_name(handler_name)
-
-        handler = next(
-            h for h in state.widget.handlers if h.name == handler_name)
         fs = fs_domain.AbstractFileSystem(
             fs_domain.ExplorationFileSystem(self.id))
 
-        for rule_spec in handler.rule_specs:
-            if rule_domain.evaluate_rule(
-                    rule_spec.definition, self.param_specs,
-                    generic_handler.obj_type, params, answer, fs):
+        compiled_rules = [
+            rule_domain.CompiledRule(
+                rule_spec.definition, self.param_specs,
+                generic_handler.obj_type, fs)
+            for rule_spec in handler.rule_specs]
+
+        _COMPILED_RULES_CACHE.set(
+            cache_key, (copy.deepcopy(compilation_inputs), compiled_rules))
+        return handler, compiled_rules
+
+    def classify(self, state_name, handler_name, answer, params):
+        """Return the first rule that is satisfied by a reader's answer."""
+        handler, compiled_rules = self._get_compiled_rules(
+            state_name, handler_name)
+
+        for (rule_spec, compiled_rule) in zip(
+                handler.rule_specs, compiled_rules):
+            if compiled_rule.evaluate(params, answer):
                 return rule_spec
 
         raise Exception(
@@ -0,0 +1,73 @@
+# coding: utf-8
+#
+# Copyright 2014 The Oppia Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS-IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Long running jobs that operate on explorations."""
+
+from core import jobs
+from core.domain import config_services
+from core.domain import exp_services
+from core.platform import models
+(exp_models,) = models.Registry.import_models([models.NAMES.exploration])
+import feconf
+
+
+class ExplorationSnapshotAutoSummaryBackfillJob(jobs.BaseBatchJob):
+    """Stores the auto-generated summaries of exploration snapshots that were
+    committed before these summaries were computed at commit time.
+    """
+    IS_VALID_JOB_CLASS = True
+
+    def _get_page_of_ids(self, page_size, urlsafe_cursor):
+        return exp_models.ExplorationModel.get_page_of_ids(
+            page_size, urlsafe_cursor)
+
+    def _process_ids(self, ids):
+        num_snapshots = 0
+        for exploration_id in ids:
+            num_snapshots += exp_services.backfill_snapshot_auto_summaries(
+                exploration_id)
+        return num_snapshots
+
+    def _get_output(self, num_ids, num_processed):
+        return 'Updated %s snapshots of %s explorations.' % (
+            num_processed, num_ids)
+
+
+class ExplorationSummaryBackfillJob(jobs.BaseBatchJob):
+    """Creates the summaries of explorations that were last committed before
+    exploration summaries were introduced.
+
+    When this job completes, exploration listings switch from the rights-based
+    queries to the summary models.
+    """
+    IS_VALID_JOB_CLASS = True
+
+    def _get_page_of_ids(self, page_size, urlsafe_cursor):
+        return exp_models.ExplorationModel.get_page_of_ids(
+            page_size, urlsafe_cursor)
+
+    def _process_ids(self, ids):
+        for exploration_id in ids:
+            exp_services.regenerate_exploration_summary(exploration_id)
+        return len(ids)
+
+    def _on_completed(self):
+        config_services.set_property(
+            feconf.ADMIN_COMMITTER_ID,
+            exp_services.EXPLORATION_SUMMARIES_ARE_COMPLETE.name, True)
+
+    def _get_output(self, num_ids, num_processed):
+        return 'Updated the summaries of %s explorations.' % num_processed
@@ -0,0 +1,119 @@
+# coding: utf-8
+#
+# Copyright 2014 The Oppia Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS-IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for long running jobs that operate on explorations."""
+
+from core import jobs
+from core.domain import exp_jobs
+from core.domain import exp_services
+from core.platform import models
+(exp_models,) = models.Registry.import_models([models.NAMES.exploration])
+import test_utils
+
+
+class ExplorationSnapshotAutoSummaryBackfillJobTest(
+        test_utils.GenericTestBase):
+    """Tests for the backfilling of snapshot auto-summaries."""
+
+    EXP_ID = 'exp_id'
+    OWNER_ID = 'owner_id'
+
+    def _get_stored_auto_summary(self, version_number):
+        return exp_models.ExplorationSnapshotMetadataModel.get_by_id(
+            exp_models.ExplorationModel._get_snapshot_id(
+                self.EXP_ID, version_number)).auto_summary
+
+    def test_auto_summaries_are_stored_and_backfilled(self):
+        self.save_new_valid_exploration(self.EXP_ID, self.OWNER_ID)
+        exp_services.update_exploration(
+            self.OWNER_ID, self.EXP_ID, [{
+                'cmd': 'edit_exploration_property',
+                'property_name': 'title',
+                'new_value': 'New title'
+            }], 'Changed title.')
+
+        self.assertEqual(self._get_stored_auto_summary(1), '')
+        self.assertEqual(
+            self._get_stored_auto_summary(2),
+            'edited exploration properties title')
+
+        # Simulate snapshots committed before summaries were stored.
+        exp_models.ExplorationModel.save_snapshot_auto_summaries(
+            self.EXP_ID, {1: None, 2: None})
+        self.assertIsNone(self._get_stored_auto_summary(2))
+
+        snapshots_metadata = exp_services.get_exploration_snapshots_metadata(
+            self.EXP_ID, 2)
+        self.assertEqual(
+            [item['auto_summary'] for item in snapshots_metadata],
+            ['edited exploration properties title', ''])
+        self.assertIsNone(self._get_stored_auto_summary(2))
+
+        exp_jobs.ExplorationSnapshotAutoSummaryBackfillJob().start()
+        self.process_deferred_tasks()
+
+        job = exp_jobs.ExplorationSnapshotAutoSummaryBackfillJob()
+        self.assertEqual(job.status_code, jobs.STATUS_CODE_COMPLETED)
+        self.assertEqual(job.output, 'Updated 2 snapshots of 1 explorations.')
+        self.assertEqual(self._get_stored_auto_summary(1), '')
+        self.assertEqual(
+            self._get_stored_auto_summary(2),
+            'edited exploration properties title')
+
+    def test_auto_summaries_are_stored_for_reverts(self):
+        self.save_new_valid_exploration(self.EXP_ID, self.OWNER_ID)
+        exp_services.update_exploration(
+            self.OWNER_ID, self.EXP_ID, [{
+                'cmd': 'edit_exploration_property',
+                'property_name': 'title',
+                'new_value': 'New title'
+            }], 'Changed title.')
+        exp_services.revert_exploration(self.OWNER_ID, self.EXP_ID, 2, 1)
+
+        self.assertEqual(self._get_stored_auto_summary(3), '')
+
+
+class ExplorationSummaryBackfillJobTest(test_utils.GenericTestBase):
+    """Tests for the backfilling of exploration summaries."""
+
+    def test_missing_summaries_are_created_in_batches(self):
+        for exp_id in ['exp_id_0', 'exp_id_1', 'exp_id_2']:
+            self.save_new_valid_exploration(exp_id, 'owner_id')
+            exp_models.ExplorationSummaryModel.delete_summary(exp_id)
+        self.assertIsNone(
+            exp_models.ExplorationSummaryModel.get_by_id('exp_id_0'))
+        self.assertFalse(exp_services.EXPLORATION_SUMMARIES_ARE_COMPLETE.value)
+
+        original_batch_size = exp_jobs.ExplorationSummaryBackfillJob.BATCH_SIZE
+        exp_jobs.ExplorationSummaryBackfillJob.BATCH_SIZE = 2
+        try:
+            job = exp_jobs.ExplorationSummaryBackfillJob()
+            job.start()
+            self.assertEqual(job.status_code, jobs.STATUS_CODE_QUEUED)
+            self.assertEqual(self.process_deferred_tasks(), 2)
+        finally:
+            exp_jobs.ExplorationSummaryBackfillJob.BATCH_SIZE = (
+                original_batch_size)
+
+        job = exp_jobs.ExplorationSummaryBackfillJob()
+        self.assertEqual(job.status_code, jobs.STATUS_CODE_COMPLETED)
+        self.assertEqual(
+            job.output, 'Updated the summaries of 3 explorations.')
+        summary_model = exp_models.ExplorationSummaryModel.get_by_id(
+            'exp_id_0')
+        self.assertEqual(summary_model.title, 'A title')
+        self.assertEqual(summary_model.owner_ids, ['owner_id'])
+        self.assertTrue(exp_services.EXPLORATION_SUMMARIES_ARE_COMPLETE.value)
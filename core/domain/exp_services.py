@@ -25,16 +25,21 @@ storage model to be changed without affecting this module and others above it.
 __author__ = 'Sean Lip'
 
 import copy
+import json
 import logging
 import os
 import StringIO
 import zipfile
 
+from core.domain import config_domain
 from core.domain import exp_domain
 from core.domain import fs_domain
 from core.domain import rights_manager
+from core.domain import skins_services
+from core.domain import widget_registry
 from core.platform import models
 import feconf
+import jinja_utils
 memcache_services = models.Registry.import_memcache_services()
 (exp_models,) = models.Registry.import_models([models.NAMES.exploration])
 import utils
@@ -47,45 +52,336 @@ CMD_CLONE = 'clone'
 # TODO(sll): Unify this with the SUBMIT_HANDLER_NAMEs in other files.
 SUBMIT_HANDLER_NAME = 'submit'
 
+EXPLORATION_SUMMARIES_ARE_COMPLETE = config_domain.ConfigProperty(
+    'exploration_summaries_are_complete', 'Boolean',
+    'Whether every exploration has a summary model. This is set when '
+    'ExplorationSummaryBackfillJob completes. Until then, exploration '
+    'listings are computed from the exploration rights.', False)
+
+# In-process cache of reader bundles, keyed by (exploration_id, version,
+# content fingerprint).
+_READER_BUNDLE_CACHE = utils.LRUCache(feconf.MAX_READER_BUNDLES_IN_CACHE)
+# In-process cache of historical exploration versions, keyed by
+# (exploration_id, created_on, version).
+_EXPLORATION_VERSION_CACHE = utils.LRUCache(
+    feconf.MAX_EXPLORATION_VERSIONS_IN_CACHE)
+# The latest versions of explorations that have been loaded during the
+# current request, keyed by exploration id. These objects are shared, and
+# must not be modified.
+_REQUEST_EXPLORATION_CACHE = utils.RequestCache()
+
 
 # Repository GET methods.
-def _get_exploration_memcache_key(exploration_id, version=None):
-    """Returns a memcache key for an exploration."""
+def _get_exploration_memcache_key(exploration_id, version=None,
+                                  created_on=None):
+    """Returns a memcache key for an exploration.
+
+    Keys for historical versions include the creation time of the
+    exploration, since an exploration that is deleted and then recreated
+    reuses the same id and version numbers.
+    """
     if version:
-        return 'exploration-version:%s:%s' % (exploration_id, version)
+        return 'exploration-version-dict:%s:%s:%s' % (
+            exploration_id, created_on.isoformat() if created_on else '',
+            version)
     else:
         return 'exploration:%s' % exploration_id
 
 
+def _get_reader_bundle_memcache_key(exploration_id, version, fingerprint):
+    """Returns a memcache key for the reader bundle of an exploration version.
+
+    The key includes the id of the deployed app version, since the bundle
+    contains widget code that may change between deployments.
+    """
+    return 'reader-bundle:%s:%s:%s:%s' % (
+        os.environ.get('CURRENT_VERSION_ID', ''), exploration_id, version,
+        fingerprint)
+
+
 def get_exploration_from_model(exploration_model):
     return exp_domain.Exploration(
         exploration_model.id, exploration_model.title,
         exploration_model.category, exploration_model.default_skin,
         exploration_model.init_state_name, exploration_model.states,
         exploration_model.param_specs, exploration_model.param_changes,
-        exploration_model.version)
+        exploration_model.version, created_on=exploration_model.created_on)
 
 
-def get_exploration_by_id(exploration_id, strict=True, version=None):
-    """Returns a domain object representing an exploration."""
-    exploration_memcache_key = _get_exploration_memcache_key(
-        exploration_id, version=version)
-    memcached_exploration = memcache_services.get_multi(
-        [exploration_memcache_key]).get(exploration_memcache_key)
-
-    if memcached_exploration is not None:
-        return memcached_exploration
-    else:
-        exploration_model = exp_models.ExplorationModel.get(
-            exploration_id, strict=strict, version=version)
-        if exploration_model:
+def _get_exploration_version_dict(exploration_model):
+    """Returns a compact dict representation of an exploration model, from
+    which the exploration can be rebuilt using
+    _get_exploration_from_version_dict().
+    """
+    return {
+        'title': exploration_model.title,
+        'category': exploration_model.category,
+        'default_skin': exploration_model.default_skin,
+        'init_state_name': exploration_model.init_state_name,
+        'states': exploration_model.states,
+        'param_specs': exploration_model.param_specs,
+        'param_changes': exploration_model.param_changes,
+        'version': exploration_model.version,
+    }
+
+
+def _get_exploration_from_version_dict(exploration_id, version_dict):
+    return exp_domain.Exploration(
+        exploration_id, version_dict['title'], version_dict['category'],
+        version_dict['default_skin'], version_dict['init_state_name'],
+        version_dict['states'], version_dict['param_specs'],
+        version_dict['param_changes'], version_dict['version'])
+
+
+def _get_latest_exploration(exploration_id, strict):
+    """Returns the shared domain object representing the latest version of
+    an exploration, or None if it does not exist and strict is False.
+
+    The exploration is looked up in the request cache, then in memcache, and
+    then in the datastore. The returned object must not be modified.
+    """
+    exploration = _REQUEST_EXPLORATION_CACHE.get(exploration_id)
+    if exploration is None:
+        exploration_memcache_key = _get_exploration_memcache_key(
+            exploration_id)
+        exploration = memcache_services.get_multi(
+            [exploration_memcache_key]).get(exploration_memcache_key)
+
+        if exploration is None:
+            exploration_model = exp_models.ExplorationModel.get(
+                exploration_id, strict=strict)
+            if not exploration_model:
+                return None
             exploration = get_exploration_from_model(exploration_model)
             memcache_services.set_multi({
                 exploration_memcache_key: exploration})
-            return exploration
-        else:
+
+        _REQUEST_EXPLORATION_CACHE.set(exploration_id, exploration)
+
+    return exploration
+
+
+def _get_exploration_version(exploration_id, version, strict):
+    """Returns a domain object representing a historical version of an
+    exploration.
+
+    Historical versions never change, so they are cached in process memory
+    and in memcache, keyed by (exploration id, creation time, version),
+    without needing to be invalidated when the exploration is updated. The
+    creation time is that of the latest version, so the cached versions of an
+    exploration that was deleted and then recreated with the same id are
+    never returned. version may be a string, such as the value of a URL
+    parameter; it is converted to an int before the lookup.
+    """
+    def _raise_or_return_none():
+        if strict:
+            raise exp_models.ExplorationModel.EntityNotFoundError(
+                'Version %s of exploration %s not found' %
+                (version, exploration_id))
+        return None
+
+    try:
+        version = int(version)
+    except ValueError:
+        return _raise_or_return_none()
+
+    # The cached versions outlive the deletion of the exploration, so the
+    # (cached) latest version is checked first.
+    latest_exploration = _get_latest_exploration(exploration_id, False)
+    if (latest_exploration is None or version < 1 or
+            version > latest_exploration.version):
+        return _raise_or_return_none()
+
+    created_on = latest_exploration.created_on
+    cache_key = (exploration_id, created_on, version)
+    exploration = _EXPLORATION_VERSION_CACHE.get(cache_key)
+    if exploration is None:
+        memcache_key = _get_exploration_memcache_key(
+            exploration_id, version=version, created_on=created_on)
+        version_dict = memcache_services.get_multi(
+            [memcache_key]).get(memcache_key)
+        if version_dict is None:
+            exploration_model = (
+                exp_models.ExplorationModel.get_multi_versions(
+                    [exploration_id], version)[0])
+            if exploration_model is None:
+                return _raise_or_return_none()
+            version_dict = _get_exploration_version_dict(exploration_model)
+            memcache_services.set_multi({memcache_key: version_dict})
+
+        exploration = _get_exploration_from_version_dict(
+            exploration_id, version_dict)
+        _EXPLORATION_VERSION_CACHE.set(cache_key, exploration)
+
+    # The cached object is shared, so callers get their own copy of it.
+    return copy.deepcopy(exploration)
+
+
+def get_exploration_by_id(exploration_id, strict=True, version=None):
+    """Returns a domain object representing an exploration.
+
+    If version is not given, the latest version is returned.
+    """
+    if version:
+        return _get_exploration_version(exploration_id, version, strict)
+
+    exploration = _get_latest_exploration(exploration_id, strict)
+    if exploration is None:
+        return None
+
+    # The cached object is shared, so callers get their own copy of it.
+    return copy.deepcopy(exploration)
+
+
+def _get_client_outcomes(exploration, state_name, handler_name):
+    """Classifies all possible answers for a state's answer handler.
+
+    Returns a dict mapping each answer (converted to a string, as the
+    frontend does) to the outcome of submitting it. Answers that cannot be
+    enumerated, or that do not match any rule, are left to the server.
+    """
+    state = exploration.states[state_name]
+    widget = widget_registry.Registry.get_widget_by_id(
+        feconf.INTERACTIVE_PREFIX, state.widget.widget_id)
+
+    outcomes = {}
+    for answer in widget.get_possible_answers(
+            handler_name, state.widget.customization_args) or []:
+        params = {'answer': answer}
+        normalized_answer = widget.normalize_answer(answer, handler_name)
+        try:
+            rule_spec = exploration.classify(
+                state_name, handler_name, normalized_answer, params)
+        except Exception:
+            continue
+
+        dest = rule_spec.dest
+        sticky = (
+            dest != feconf.END_DEST and
+            exploration.states[dest].widget.sticky and
+            exploration.states[dest].widget.widget_id == state.widget.widget_id
+        )
+
+        outcomes[unicode(answer)] = {
+            'dest': dest,
+            'feedback_html': [
+                '<div>%s</div>' % jinja_utils.parse_string(feedback, params)
+                for feedback in (rule_spec.feedback or [''])],
+            'reader_response_html': widget.get_reader_response_html(
+                state.widget.customization_args, params, normalized_answer,
+                sticky),
+        }
+
+    return outcomes
+
+
+def _compute_client_state_machine(exploration):
+    """Computes a precompiled state machine for playing an exploration.
+
+    This allows the reader to classify answers in the browser. For each state,
+    it contains the rendered content and interactive widget, and the outcomes
+    of all answers that can be enumerated in advance. All other answers are
+    sent to the server as usual.
+
+    Returns None if the rendered content depends on the reader's parameters
+    or answers, since it then cannot be computed in advance.
+    """
+    if (exploration.param_specs or exploration.param_changes or any([
+            state.param_changes for state in exploration.states.values()])):
+        return None
+
+    for state in exploration.states.values():
+        if (jinja_utils.has_jinja_syntax(
+                [content.value for content in state.content]) or
+                jinja_utils.has_jinja_syntax(
+                    state.widget.customization_args)):
             return None
 
+    states = {}
+    for (state_name, state) in exploration.states.iteritems():
+        widget = widget_registry.Registry.get_widget_by_id(
+            feconf.INTERACTIVE_PREFIX, state.widget.widget_id)
+        states[state_name] = {
+            'content_html': state.content[0].to_html({}),
+            'interactive_html': widget.get_interactive_widget_tag(
+                state.widget.customization_args, {}),
+            'outcomes': {
+                handler.name: _get_client_outcomes(
+                    exploration, state_name, handler.name)
+                for handler in state.widget.handlers},
+            'sticky': state.widget.sticky,
+            'widget_id': state.widget.widget_id,
+        }
+
+    return {
+        'end_dest': feconf.END_DEST,
+        'states': states,
+        'version': exploration.version,
+    }
+
+
+def _compute_reader_bundle(exploration):
+    """Computes the reader bundle for an exploration domain object."""
+    interactive_widget_ids = exploration.get_interactive_widget_ids()
+    return {
+        'skin_html': unicode(
+            skins_services.get_skin_html(exploration.default_skin)),
+        'state_machine': _compute_client_state_machine(exploration),
+        'widget_dependencies': (
+            widget_registry.Registry.get_dependencies_html(
+                interactive_widget_ids)),
+        'widget_js_directives': (
+            widget_registry.Registry.get_noninteractive_widget_js() +
+            widget_registry.Registry.get_interactive_widget_js(
+                interactive_widget_ids)),
+    }
+
+
+def _get_reader_bundle_fingerprint(exploration):
+    """Returns a hash of the parts of an exploration that its reader bundle
+    is computed from.
+
+    An exploration that is deleted and then recreated can reuse an existing
+    id and version number, so the fingerprint is included in the cache keys
+    of reader bundles. This stops an instance from serving a cached bundle
+    for the old content of a recreated exploration.
+    """
+    return utils.convert_to_hash(json.dumps({
+        'default_skin': exploration.default_skin,
+        'init_state_name': exploration.init_state_name,
+        'states': {
+            state_name: state.to_dict()
+            for (state_name, state) in exploration.states.iteritems()},
+        'param_specs': exploration.param_specs_dict,
+        'param_changes': exploration.param_change_dicts,
+    }, sort_keys=True), 28)
+
+
+def get_reader_bundle(exploration):
+    """Returns the precomputed content of the reader page for an exploration.
+
+    The result is a dict with the keys 'skin_html', 'state_machine' (see
+    _compute_client_state_machine()), 'widget_dependencies' and
+    'widget_js_directives'. It is cached in process memory and in memcache for
+    each (exploration id, version, content fingerprint).
+    """
+    fingerprint = _get_reader_bundle_fingerprint(exploration)
+    cache_key = (exploration.id, exploration.version, fingerprint)
+    bundle = _READER_BUNDLE_CACHE.get(cache_key)
+    if bundle is not None:
+        return bundle
+
+    bundle_memcache_key = _get_reader_bundle_memcache_key(
+        exploration.id, exploration.version, fingerprint)
+    bundle = memcache_services.get_multi(
+        [bundle_memcache_key]).get(bundle_memcache_key)
+    if bundle is None:
+        bundle = _compute_reader_bundle(exploration)
+        memcache_services.set_multi({bundle_memcache_key: bundle})
+
+    _READER_BUNDLE_CACHE.set(cache_key, bundle)
+    return bundle
+
 
 def get_new_exploration_id():
     """Returns a new exploration id."""
@@ -93,13 +389,45 @@ def get_new_exploration_id():
 
 
 # Query methods.
-def _get_explorations_summary_dict(exploration_rights):
-    """Returns exploration summaries corresponding to the given rights objects.
+def _get_exploration_summary_dict_from_model(exploration_summary_model):
+    """Returns a dict with the following keys: title, category and rights.
+
+    The value for 'rights' is the rights object, represented as a dict.
+    """
+    return {
+        'title': exploration_summary_model.title,
+        'category': exploration_summary_model.category,
+        'rights': rights_manager.ExplorationRights(
+            exploration_summary_model.id,
+            exploration_summary_model.owner_ids,
+            exploration_summary_model.editor_ids,
+            exploration_summary_model.viewer_ids,
+            community_owned=exploration_summary_model.community_owned,
+            cloned_from=exploration_summary_model.cloned_from,
+            status=exploration_summary_model.status
+        ).to_dict()
+    }
+
+
+def _get_explorations_summary_dict(exploration_summary_models):
+    """Returns exploration summaries corresponding to the given models.
 
     The summary is a dict that is keyed by exploration id. Each value is a dict
     with the following keys: title, category and rights. The value for 'rights'
     is the rights object, represented as a dict.
     """
+    return {
+        model.id: _get_exploration_summary_dict_from_model(model)
+        for model in exploration_summary_models}
+
+
+def _get_explorations_summary_dict_from_rights(exploration_rights):
+    """Returns exploration summaries corresponding to the given rights objects,
+    in the same format as _get_explorations_summary_dict().
+
+    This loads the full exploration models, so it is only used until every
+    exploration has a summary model.
+    """
     exp_ids = [rights.id for rights in exploration_rights]
     explorations = [
         (get_exploration_from_model(e) if e else None)
@@ -165,14 +493,24 @@ def get_exploration_titles(exp_ids):
 
 def get_non_private_explorations_summary_dict():
     """Returns a summary of non-private explorations."""
+    if not EXPLORATION_SUMMARIES_ARE_COMPLETE.value:
+        return _get_explorations_summary_dict_from_rights(
+            rights_manager.get_non_private_exploration_rights())
+
     return _get_explorations_summary_dict(
-        rights_manager.get_non_private_exploration_rights())
+        exp_models.ExplorationSummaryModel.get_non_private(
+            exp_models.QUERY_LIMIT, None)[0])
 
 
 def get_community_owned_explorations_summary_dict():
     """Returns a summary of community-owned explorations."""
+    if not EXPLORATION_SUMMARIES_ARE_COMPLETE.value:
+        return _get_explorations_summary_dict_from_rights(
+            rights_manager.get_community_owned_exploration_rights())
+
     return _get_explorations_summary_dict(
-        rights_manager.get_community_owned_exploration_rights())
+        exp_models.ExplorationSummaryModel.get_community_owned(
+            exp_models.QUERY_LIMIT, None)[0])
 
 
 def get_explicit_viewer_explorations_summary_dict(user_id):
@@ -186,8 +524,13 @@ def get_explicit_viewer_explorations_summary_dict(user_id):
     that he/she owns or is allowed to edit -- that are not returned by this
     query.
     """
+    if not EXPLORATION_SUMMARIES_ARE_COMPLETE.value:
+        return _get_explorations_summary_dict_from_rights(
+            rights_manager.get_viewable_exploration_rights(user_id))
+
     return _get_explorations_summary_dict(
-        rights_manager.get_viewable_exploration_rights(user_id))
+        exp_models.ExplorationSummaryModel.get_viewable(
+            user_id, exp_models.QUERY_LIMIT, None)[0])
 
 
 def get_explicit_editor_explorations_summary_dict(user_id):
@@ -200,8 +543,13 @@ def get_explicit_editor_explorations_summary_dict(user_id):
     There may be other explorations that this user can edit -- namely, those
     that he/she owns -- that are not returned by this query.
     """
+    if not EXPLORATION_SUMMARIES_ARE_COMPLETE.value:
+        return _get_explorations_summary_dict_from_rights(
+            rights_manager.get_editable_exploration_rights(user_id))
+
     return _get_explorations_summary_dict(
-        rights_manager.get_editable_exploration_rights(user_id))
+        exp_models.ExplorationSummaryModel.get_editable(
+            user_id, exp_models.QUERY_LIMIT, None)[0])
 
 
 def get_owned_explorations_summary_dict(user_id):
@@ -209,8 +557,13 @@ def get_owned_explorations_summary_dict(user_id):
 
     Such a user can also view and edit these explorations.
     """
+    if not EXPLORATION_SUMMARIES_ARE_COMPLETE.value:
+        return _get_explorations_summary_dict_from_rights(
+            rights_manager.get_owned_exploration_rights(user_id))
+
     return _get_explorations_summary_dict(
-        rights_manager.get_owned_exploration_rights(user_id))
+        exp_models.ExplorationSummaryModel.get_owned(
+            user_id, exp_models.QUERY_LIMIT, None)[0])
 
 
 def get_editable_explorations_summary_dict(user_id):
@@ -221,6 +574,157 @@ def get_editable_explorations_summary_dict(user_id):
     return result
 
 
+def get_next_page_of_non_private_exploration_summaries(
+        page_size=feconf.DEFAULT_PAGE_SIZE, urlsafe_start_cursor=None):
+    """Returns a page of summaries of non-private explorations, sorted by
+    title.
+
+    The return value is a triple (results, cursor, more) as described in
+    fetch_page() at:
+
+        https://developers.google.com/appengine/docs/python/ndb/queryclass
+
+    Each item in results is a summary dict as described in
+    _get_exploration_summary_dict_from_model(), with an additional 'id' key.
+
+    Until every exploration has a summary model, all non-private explorations
+    are returned in a single page, and cursors are rejected with a ValueError.
+    """
+    if not EXPLORATION_SUMMARIES_ARE_COMPLETE.value:
+        if urlsafe_start_cursor is not None:
+            raise ValueError('Exploration summaries are not yet available.')
+
+        summaries = []
+        for (exp_id, summary) in get_non_private_explorations_summary_dict(
+                ).iteritems():
+            summary['id'] = exp_id
+            summaries.append(summary)
+        summaries.sort(key=lambda summary: (summary['title'], summary['id']))
+        return (summaries, None, False)
+
+    results, new_urlsafe_start_cursor, more = (
+        exp_models.ExplorationSummaryModel.get_non_private(
+            page_size, urlsafe_start_cursor))
+
+    summaries = []
+    for model in results:
+        summary = _get_exploration_summary_dict_from_model(model)
+        summary['id'] = model.id
+        summaries.append(summary)
+    return (summaries, new_urlsafe_start_cursor, more)
+
+
+def _get_learn_gallery_first_page_memcache_key(page_size):
+    """Returns the memcache key for the first page of the learners' gallery."""
+    return 'learn-gallery-first-page:%s' % page_size
+
+
+def get_non_private_exploration_summaries_by_category(
+        category=None, urlsafe_start_cursor=None,
+        page_size=feconf.LEARN_GALLERY_PAGE_SIZE):
+    """Returns pages of summaries of non-private explorations, grouped by
+    category.
+
+    If category is None, the first page of every category is returned, and
+    this result is cached in memcache for
+    feconf.LEARN_GALLERY_FIRST_PAGE_CACHE_TTL_SECS seconds. Otherwise, only the
+    page of the given category that starts at urlsafe_start_cursor is returned.
+
+    Returns:
+      a dict keyed by category. Each value is a dict with two keys:
+        summaries: a list of dicts, sorted by title, each with the keys id,
+          title, category and status.
+        cursor: the urlsafe cursor at which the next page of the category
+          starts, or None if there are no more explorations in the category.
+
+    Until every exploration has a summary model, each category is returned in
+    a single page, and cursors are rejected with a ValueError.
+    """
+    if category is None and urlsafe_start_cursor is not None:
+        raise ValueError('A cursor can only be used with a category.')
+
+    if not EXPLORATION_SUMMARIES_ARE_COMPLETE.value:
+        if urlsafe_start_cursor is not None:
+            raise ValueError('Exploration summaries are not yet available.')
+        return _get_non_private_exploration_summaries_by_category_from_rights(
+            category)
+
+    if category is None:
+        memcache_key = _get_learn_gallery_first_page_memcache_key(page_size)
+        memcached_result = memcache_services.get_multi(
+            [memcache_key]).get(memcache_key)
+        if memcached_result is not None:
+            return memcached_result
+
+        categories = (
+            exp_models.ExplorationSummaryModel.get_non_private_categories())
+    else:
+        categories = [category]
+
+    # The pages of all the categories are fetched in parallel.
+    futures = [
+        exp_models.ExplorationSummaryModel.get_non_private_in_category_async(
+            current_category, page_size, urlsafe_start_cursor)
+        for current_category in categories]
+
+    result = {}
+    for (ind, future) in enumerate(futures):
+        results, new_urlsafe_start_cursor, more = future.get_result()
+        result[categories[ind]] = {
+            'summaries': [{
+                'id': model.id,
+                'title': model.title,
+                'category': model.category,
+                'status': model.status,
+            } for model in results],
+            'cursor': new_urlsafe_start_cursor if more else None,
+        }
+
+    if category is None:
+        memcache_services.set_multi(
+            {memcache_key: result},
+            time=feconf.LEARN_GALLERY_FIRST_PAGE_CACHE_TTL_SECS)
+    return result
+
+
+def _get_non_private_exploration_summaries_by_category_from_rights(
+        category):
+    """Returns the result of get_non_private_exploration_summaries_by_category()
+    computed from the exploration rights, with each category in a single page.
+    """
+    result = {}
+    if category is not None:
+        result[category] = {'summaries': [], 'cursor': None}
+
+    for (exp_id, summary) in (
+            get_non_private_explorations_summary_dict().iteritems()):
+        if category is not None and summary['category'] != category:
+            continue
+        if summary['category'] not in result:
+            result[summary['category']] = {'summaries': [], 'cursor': None}
+        result[summary['category']]['summaries'].append({
+            'id': exp_id,
+            'title': summary['title'],
+            'category': summary['category'],
+            'status': summary['rights']['status'],
+        })
+
+    for category_result in result.values():
+        category_result['summaries'].sort(
+            key=lambda summary: (summary['title'], summary['id']))
+    return result
+
+
+def regenerate_exploration_summary(exploration_id):
+    """Recomputes the summary of an exploration from the datastore.
+
+    Summaries are kept up to date whenever an exploration or its rights are
+    committed, so this is only needed for explorations that were last
+    committed before summaries were introduced.
+    """
+    exp_models.ExplorationSummaryModel.regenerate_summary(exploration_id)
+
+
 def count_explorations():
     """Returns the total number of explorations."""
     return exp_models.ExplorationModel.get_exploration_count()
@@ -239,12 +743,13 @@ def export_to_zip_file(exploration_id, version=None):
         fs = fs_domain.AbstractFileSystem(
             fs_domain.ExplorationFileSystem(exploration_id))
         dir_list = fs.listdir('')
-        for filepath in dir_list:
-            # Currently, the version number of all files is 1, since they are
-            # not modifiable post-upload.
-            # TODO(sll): When allowing editing of files, implement versioning
-            # for them.
-            zf.writestr('assets/%s' % filepath, fs.get(filepath, version=1))
+        # Currently, the version number of all files is 1, since they are not
+        # modifiable post-upload.
+        # TODO(sll): When allowing editing of files, implement versioning for
+        # them.
+        file_contents = fs.get_multi(dir_list, version=1)
+        for (filepath, file_content) in zip(dir_list, file_contents):
+            zf.writestr('assets/%s' % filepath, file_content)
 
     return o.getvalue()
 
@@ -459,6 +964,7 @@ def _save_exploration(
         exploration.id, strict=False)
     if exploration_model is None:
         exploration_model = exp_models.ExplorationModel(id=exploration.id)
+        auto_summary = ''
     else:
         if exploration.version > exploration_model.version:
             raise Exception(
@@ -471,6 +977,12 @@ def _save_exploration(
                 'which is too old. Please reload the page and try again.'
                 % (exploration_model.version, exploration.version))
 
+        # The summary is computed here, while the model still holds the
+        # previous version, so that listing the exploration history does not
+        # need to reconstruct old versions of the exploration.
+        auto_summary = _get_simple_summary_of_change_list(
+            get_exploration_from_model(exploration_model), change_list)
+
     exploration_model.category = exploration.category
     exploration_model.title = exploration.title
     exploration_model.init_state_name = exploration.init_state_name
@@ -482,8 +994,10 @@ def _save_exploration(
     exploration_model.default_skin = exploration.default_skin
 
     exploration_model.commit(
-        committer_id, commit_message, change_list)
+        committer_id, commit_message, change_list, auto_summary=auto_summary)
     memcache_services.delete(_get_exploration_memcache_key(exploration.id))
+    _REQUEST_EXPLORATION_CACHE.set(
+        exploration.id, get_exploration_from_model(exploration_model))
 
     exploration.version += 1
 
@@ -512,7 +1026,8 @@ def _create_exploration(
         param_changes=exploration.param_change_dicts,
         default_skin=exploration.default_skin
     )
-    model.commit(committer_id, commit_message, commit_cmds)
+    model.commit(committer_id, commit_message, commit_cmds, auto_summary='')
+    _REQUEST_EXPLORATION_CACHE.delete(exploration.id)
     exploration.version += 1
 
 
@@ -539,10 +1054,8 @@ def delete_exploration(committer_id, exploration_id, force_deletion=False):
     """
     # TODO(sll): Delete the files too?
 
-    exploration_rights_model = exp_models.ExplorationRightsModel.get(
-        exploration_id)
-    exploration_rights_model.delete(
-        committer_id, '', force_deletion=force_deletion)
+    rights_manager.delete_exploration_rights(
+        committer_id, exploration_id, force_deletion=force_deletion)
 
     exploration_model = exp_models.ExplorationModel.get(exploration_id)
     exploration_model.delete(committer_id, '', force_deletion=force_deletion)
@@ -551,17 +1064,12 @@ def delete_exploration(committer_id, exploration_id, force_deletion=False):
     # key will be reinstated.
     exploration_memcache_key = _get_exploration_memcache_key(exploration_id)
     memcache_services.delete(exploration_memcache_key)
+    _REQUEST_EXPLORATION_CACHE.delete(exploration_id)
 
 
 # Operations on exploration snapshots.
-def _get_simple_changelist_summary(
-        exploration_id, version_number, change_list):
+def _get_simple_summary_of_change_list(base_exploration, change_list):
     """Returns an auto-generated changelist summary for the history logs."""
-    # TODO(sll): Get this from memcache where possible. It won't change, so we
-    # can keep it there indefinitely.
-
-    base_exploration = get_exploration_by_id(
-        exploration_id, version=version_number)
     if (len(change_list) == 1 and change_list[0]['cmd'] in
             ['create_new', 'AUTO_revert_version_number']):
         # An automatic summary is not needed here, because the original commit
@@ -594,6 +1102,23 @@ def _get_simple_changelist_summary(
         return '; '.join(short_summary_fragments)
 
 
+def _get_simple_changelist_summary(
+        exploration_id, version_number, change_list):
+    """Returns the auto-generated summary of a change list that was applied to
+    the given version of an exploration.
+
+    This reconstructs the base version of the exploration, so it should only
+    be used for snapshots whose summary was not stored at commit time.
+    """
+    if (len(change_list) == 1 and change_list[0]['cmd'] in
+            ['create_new', 'AUTO_revert_version_number']):
+        return ''
+
+    base_exploration = get_exploration_by_id(
+        exploration_id, version=version_number)
+    return _get_simple_summary_of_change_list(base_exploration, change_list)
+
+
 def get_exploration_snapshots_metadata(exploration_id, limit):
     """Returns the most recent snapshots for this exploration, as dicts.
 
@@ -604,9 +1129,9 @@ def get_exploration_snapshots_metadata(exploration_id, limit):
     Returns:
         list of dicts, each representing a recent snapshot. Each dict has the
         following keys: committer_id, commit_message, commit_cmds, commit_type,
-        created_on, version_number. The version numbers are consecutive and in
-        descending order. There are max(limit, exploration.version_number)
-        items in the returned list.
+        created_on, version_number, auto_summary. The version numbers are
+        consecutive and in descending order. There are
+        max(limit, exploration.version_number) items in the returned list.
     """
     exploration = get_exploration_by_id(exploration_id)
     oldest_version = max(exploration.version - limit, 0) + 1
@@ -616,13 +1141,41 @@ def get_exploration_snapshots_metadata(exploration_id, limit):
     snapshots_metadata = exp_models.ExplorationModel.get_snapshots_metadata(
         exploration_id, version_nums)
 
-    for ind, item in enumerate(snapshots_metadata):
-        item['auto_summary'] = _get_simple_changelist_summary(
-            exploration_id, item['version_number'] - 1, item['commit_cmds'])
+    for item in snapshots_metadata:
+        # Snapshots committed before summaries were stored at commit time
+        # are filled in by ExplorationSnapshotAutoSummaryBackfillJob; until
+        # then, their summaries are computed on the fly.
+        if item['auto_summary'] is None:
+            item['auto_summary'] = _get_simple_changelist_summary(
+                exploration_id, item['version_number'] - 1,
+                item['commit_cmds'])
 
     return snapshots_metadata
 
 
+def backfill_snapshot_auto_summaries(exploration_id):
+    """Computes and stores the auto-generated summaries of all snapshots of
+    the given exploration that do not have one yet.
+
+    Returns the number of snapshots that were updated.
+    """
+    exploration = get_exploration_by_id(exploration_id)
+    snapshots_metadata = exp_models.ExplorationModel.get_snapshots_metadata(
+        exploration_id, range(1, exploration.version + 1))
+
+    auto_summaries_by_version = {}
+    for item in snapshots_metadata:
+        if item['auto_summary'] is None:
+            auto_summaries_by_version[item['version_number']] = (
+                _get_simple_changelist_summary(
+                    exploration_id, item['version_number'] - 1,
+                    item['commit_cmds']))
+
+    exp_models.ExplorationModel.save_snapshot_auto_summaries(
+        exploration_id, auto_summaries_by_version)
+    return len(auto_summaries_by_version)
+
+
 def update_exploration(
         committer_id, exploration_id, change_list, commit_message):
     """Update an exploration. Commits changes.
@@ -669,6 +1222,7 @@ def revert_exploration(
         committer_id, 'Reverted exploration to version %s' % revert_to_version,
         revert_to_version)
     memcache_services.delete(_get_exploration_memcache_key(exploration_id))
+    _REQUEST_EXPLORATION_CACHE.delete(exploration_id)
 
 
 # Creation and deletion methods.
@@ -700,8 +1254,7 @@ def clone_exploration(committer_id, old_exploration_id):
 
     dir_list = old_fs.listdir('')
     for filepath in dir_list:
-        file_content = old_fs.get(filepath)
-        new_fs.commit(feconf.ADMIN_COMMITTER_ID, filepath, file_content)
+        new_fs.copy_from(feconf.ADMIN_COMMITTER_ID, old_fs, filepath)
 
     return new_exploration_id
 
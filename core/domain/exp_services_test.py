@@ -28,11 +28,13 @@ from core.domain import fs_domain
 from core.domain import param_domain
 from core.domain import rights_manager
 from core.domain import rule_domain
+from core.domain import skins_services
 from core.domain import user_services
 from core.platform import models
-(base_models, exp_models) = models.Registry.import_models([
-    models.NAMES.base_model, models.NAMES.exploration
+(base_models, exp_models, file_models) = models.Registry.import_models([
+    models.NAMES.base_model, models.NAMES.exploration, models.NAMES.file
 ])
+memcache_services = models.Registry.import_memcache_services()
 transaction_services = models.Registry.import_transaction_services()
 import feconf
 import test_utils
@@ -83,18 +85,6 @@ class ExplorationServicesUnitTests(test_utils.GenericTestBase):
         exp_services.save_new_exploration(owner_id, exploration)
         return exploration
 
-    def save_new_valid_exploration(self, exploration_id, owner_id):
-        """Saves a new strictly-validated exploration.
-
-        Returns the exploration domain object.
-        """
-        exploration = exp_domain.Exploration.create_default_exploration(
-            exploration_id, 'A title', 'A category')
-        exploration.states[exploration.init_state_name].widget.handlers[
-            0].rule_specs[0].dest = feconf.END_DEST
-        exp_services.save_new_exploration(owner_id, exploration)
-        return exploration
-
 
 class ExplorationQueriesUnitTests(ExplorationServicesUnitTests):
     """Tests query methods."""
@@ -215,6 +205,136 @@ class ExplorationQueriesUnitTests(ExplorationServicesUnitTests):
             exp_services.get_editable_explorations_summary_dict(
                 self.VIEWER_ID), {})
 
+    def _set_exploration_summaries_are_complete(self):
+        config_services.set_property(
+            feconf.ADMIN_COMMITTER_ID,
+            exp_services.EXPLORATION_SUMMARIES_ARE_COMPLETE.name, True)
+
+    def test_get_next_page_of_non_private_exploration_summaries(self):
+        self._set_exploration_summaries_are_complete()
+        for (exp_id, title) in [('A', 'Title B'), ('B', 'Title A'),
+                                ('C', 'Title C'), ('D', 'Title D')]:
+            self.save_new_default_exploration(exp_id, self.OWNER_ID, title)
+            if exp_id != 'D':
+                rights_manager.publish_exploration(self.OWNER_ID, exp_id)
+
+        summaries, cursor, more = (
+            exp_services.get_next_page_of_non_private_exploration_summaries(
+                page_size=2))
+        self.assertEqual([summary['id'] for summary in summaries], ['B', 'A'])
+        self.assertEqual(summaries[0]['title'], 'Title A')
+        self.assertEqual(
+            summaries[0]['rights']['status'],
+            rights_manager.EXPLORATION_STATUS_PUBLIC)
+        self.assertTrue(more)
+
+        summaries, cursor, more = (
+            exp_services.get_next_page_of_non_private_exploration_summaries(
+                page_size=2, urlsafe_start_cursor=cursor))
+        self.assertEqual([summary['id'] for summary in summaries], ['C'])
+        self.assertFalse(more)
+
+        # Summaries are updated when the exploration changes, and removed
+        # when it is deleted.
+        exp_services.update_exploration(self.OWNER_ID, 'C', [{
+            'cmd': 'edit_exploration_property',
+            'property_name': 'title',
+            'new_value': 'Title 0'
+        }], 'Changed title.')
+        exp_services.delete_exploration(self.OWNER_ID, 'A')
+        summaries, _, _ = (
+            exp_services.get_next_page_of_non_private_exploration_summaries())
+        self.assertEqual([summary['id'] for summary in summaries], ['C', 'B'])
+
+    def test_get_non_private_exploration_summaries_by_category(self):
+        self._set_exploration_summaries_are_complete()
+        for (exp_id, title, category) in [
+                ('A', 'Title Y', 'Category A'), ('B', 'Title X', 'Category A'),
+                ('C', 'Title Z', 'Category B')]:
+            exploration = exp_domain.Exploration.create_default_exploration(
+                exp_id, title, category)
+            exp_services.save_new_exploration(self.OWNER_ID, exploration)
+            rights_manager.publish_exploration(self.OWNER_ID, exp_id)
+
+        first_page = (
+            exp_services.get_non_private_exploration_summaries_by_category(
+                page_size=1))
+        self.assertEqual(
+            sorted(first_page.keys()), ['Category A', 'Category B'])
+        self.assertEqual(first_page['Category A']['summaries'], [{
+            'id': 'B',
+            'title': 'Title X',
+            'category': 'Category A',
+            'status': rights_manager.EXPLORATION_STATUS_PUBLIC,
+        }])
+        self.assertIsNotNone(first_page['Category A']['cursor'])
+        self.assertEqual(
+            [summary['id'] for summary in
+             first_page['Category B']['summaries']], ['C'])
+        self.assertIsNone(first_page['Category B']['cursor'])
+
+        next_page = (
+            exp_services.get_non_private_exploration_summaries_by_category(
+                category='Category A',
+                urlsafe_start_cursor=first_page['Category A']['cursor'],
+                page_size=1))
+        self.assertEqual(next_page.keys(), ['Category A'])
+        self.assertEqual(
+            [summary['id'] for summary in
+             next_page['Category A']['summaries']], ['A'])
+        self.assertIsNone(next_page['Category A']['cursor'])
+
+        # The first page is served from memcache until it expires.
+        exp_services.delete_exploration(self.OWNER_ID, 'C')
+        self.assertEqual(
+            exp_services.get_non_private_exploration_summaries_by_category(
+                page_size=1),
+            first_page)
+        self.assertEqual(
+            exp_services.get_non_private_exploration_summaries_by_category(
+                category='Category B', page_size=1),
+            {'Category B': {'summaries': [], 'cursor': None}})
+
+    def test_listings_use_rights_until_summaries_are_complete(self):
+        for (exp_id, title) in [('A', 'Title B'), ('B', 'Title A')]:
+            self.save_new_default_exploration(exp_id, self.OWNER_ID, title)
+            rights_manager.publish_exploration(self.OWNER_ID, exp_id)
+        # Simulate an exploration committed before summaries were introduced.
+        exp_models.ExplorationSummaryModel.delete_summary('A')
+
+        summaries, cursor, more = (
+            exp_services.get_next_page_of_non_private_exploration_summaries(
+                page_size=1))
+        self.assertEqual([summary['id'] for summary in summaries], ['B', 'A'])
+        self.assertIsNone(cursor)
+        self.assertFalse(more)
+
+        self.assertEqual(
+            exp_services.get_non_private_exploration_summaries_by_category(
+                page_size=1),
+            {'A category': {
+                'summaries': [{
+                    'id': 'B',
+                    'title': 'Title A',
+                    'category': 'A category',
+                    'status': rights_manager.EXPLORATION_STATUS_PUBLIC,
+                }, {
+                    'id': 'A',
+                    'title': 'Title B',
+                    'category': 'A category',
+                    'status': rights_manager.EXPLORATION_STATUS_PUBLIC,
+                }],
+                'cursor': None,
+            }})
+        with self.assertRaises(ValueError):
+            exp_services.get_non_private_exploration_summaries_by_category(
+                category='A category', urlsafe_start_cursor='abc')
+
+        self._set_exploration_summaries_are_complete()
+        summaries, _, _ = (
+            exp_services.get_next_page_of_non_private_exploration_summaries())
+        self.assertEqual([summary['id'] for summary in summaries], ['B'])
+
     def test_count_explorations(self):
         """Test count_explorations()."""
 
@@ -260,6 +380,41 @@ class ExplorationCreateAndDeleteUnitTests(ExplorationServicesUnitTests):
         with self.assertRaises(Exception):
             exp_services.get_exploration_by_id('fake_exploration')
 
+    def test_explorations_are_cached_during_a_request(self):
+        """Test that explorations are only cached during a request."""
+        self.save_new_default_exploration(self.EXP_ID, self.OWNER_ID)
+
+        def _change_title_in_datastore(new_title):
+            exploration_model = exp_models.ExplorationModel.get(self.EXP_ID)
+            exploration_model.title = new_title
+            exploration_model.commit(self.OWNER_ID, 'Changed title.', [])
+            memcache_services.delete(
+                exp_services._get_exploration_memcache_key(self.EXP_ID))
+
+        utils.RequestCache.start_request()
+        exploration = exp_services.get_exploration_by_id(self.EXP_ID)
+        exploration.title = 'Modified locally'
+        self.assertEqual(
+            exp_services.get_exploration_by_id(self.EXP_ID).title, 'A title')
+
+        # Saving the exploration updates the cached copy.
+        exp_services.update_exploration(
+            self.OWNER_ID, self.EXP_ID, [{
+                'cmd': 'edit_exploration_property',
+                'property_name': 'title',
+                'new_value': 'New title'
+            }], 'Changed title.')
+        _change_title_in_datastore('Changed in datastore')
+        exploration = exp_services.get_exploration_by_id(self.EXP_ID)
+        self.assertEqual(exploration.title, 'New title')
+        self.assertEqual(exploration.version, 2)
+        utils.RequestCache.end_request()
+
+        # Outside a request, explorations are not cached.
+        exploration = exp_services.get_exploration_by_id(self.EXP_ID)
+        self.assertEqual(exploration.title, 'Changed in datastore')
+        self.assertEqual(exploration.version, 3)
+
     def test_soft_deletion_of_explorations(self):
         """Test that soft deletion of explorations works correctly."""
         # TODO(sll): Add tests for deletion of states and version snapshots.
@@ -325,6 +480,10 @@ class ExplorationCreateAndDeleteUnitTests(ExplorationServicesUnitTests):
         self.assertEqual(new_exploration.category, 'A category')
         self.assertEqual(new_fs.get('abc.png'), raw_image)
 
+        # The content of the asset is shared, not copied.
+        self.assertEqual(file_models.FileChunkModel.query().count(), 1)
+        self.assertEqual(file_models.FileContentModel.query().count(), 1)
+
     def test_create_new_exploration_error_cases(self):
         exploration = exp_domain.Exploration.create_default_exploration(
             self.EXP_ID, '', '')
@@ -352,6 +511,100 @@ class ExplorationCreateAndDeleteUnitTests(ExplorationServicesUnitTests):
             retrieved_exploration.param_specs.keys()[0], 'theParameter')
 
 
+class ReaderBundleUnitTests(ExplorationServicesUnitTests):
+    """Test the precomputed reader bundle for an exploration."""
+
+    def test_reader_bundle_is_cached_per_version(self):
+        exploration = self.save_new_default_exploration(
+            self.EXP_ID, self.OWNER_ID)
+
+        bundle = exp_services.get_reader_bundle(exploration)
+        self.assertIn('oppiaInteractiveTextInput',
+                      bundle['widget_js_directives'])
+        self.assertNotIn('oppiaInteractiveNumericInput',
+                         bundle['widget_js_directives'])
+        self.assertEqual(
+            bundle['skin_html'],
+            skins_services.get_skin_html(exploration.default_skin))
+        self.assertIs(exp_services.get_reader_bundle(exploration), bundle)
+
+    def test_reader_bundle_is_invalidated_when_version_is_rewritten(self):
+        exploration = self.save_new_default_exploration(
+            self.EXP_ID, self.OWNER_ID)
+        exp_services.get_reader_bundle(exploration)
+        exp_services.delete_exploration(
+            self.OWNER_ID, self.EXP_ID, force_deletion=True)
+
+        exploration = exp_domain.Exploration.create_default_exploration(
+            self.EXP_ID, 'A title', 'A category')
+        exploration.states[
+            exploration.init_state_name].widget.widget_id = 'NumericInput'
+        exp_services.save_new_exploration(self.OWNER_ID, exploration)
+
+        bundle = exp_services.get_reader_bundle(exploration)
+        self.assertIn('oppiaInteractiveNumericInput',
+                      bundle['widget_js_directives'])
+        self.assertNotIn('oppiaInteractiveTextInput',
+                         bundle['widget_js_directives'])
+
+    def test_reader_bundle_is_keyed_by_exploration_content(self):
+        exploration = self.save_new_default_exploration(
+            self.EXP_ID, self.OWNER_ID)
+        exp_services.get_reader_bundle(exploration)
+
+        # Another instance, whose caches were not cleared, sees a recreated
+        # exploration with the same id and version but different content.
+        other_exploration = exp_domain.Exploration.create_default_exploration(
+            self.EXP_ID, 'A title', 'A category')
+        other_exploration.states[
+            other_exploration.init_state_name].widget.widget_id = 'NumericInput'
+        other_exploration.version = exploration.version
+
+        bundle = exp_services.get_reader_bundle(other_exploration)
+        self.assertIn('oppiaInteractiveNumericInput',
+                      bundle['widget_js_directives'])
+        self.assertNotIn('oppiaInteractiveTextInput',
+                         bundle['widget_js_directives'])
+
+    def test_client_state_machine(self):
+        exploration = exp_domain.Exploration.create_default_exploration(
+            self.EXP_ID, 'A title', 'A category')
+        init_state_name = exploration.init_state_name
+        exploration.states[init_state_name].widget.widget_id = 'Continue'
+        exploration.states[init_state_name].widget.handlers[
+            0].rule_specs[0].feedback = ['Well done']
+        exp_services.save_new_exploration(self.OWNER_ID, exploration)
+
+        state_machine = exp_services.get_reader_bundle(
+            exploration)['state_machine']
+        self.assertEqual(state_machine['end_dest'], feconf.END_DEST)
+        self.assertEqual(state_machine['version'], exploration.version)
+
+        state_dict = state_machine['states'][init_state_name]
+        self.assertEqual(state_dict['content_html'], '<div></div>')
+        self.assertIn('oppia-interactive-continue',
+                      state_dict['interactive_html'])
+        self.assertEqual(state_dict['outcomes'], {
+            'submit': {
+                '': {
+                    'dest': init_state_name,
+                    'feedback_html': ['<div>Well done</div>'],
+                    'reader_response_html': '',
+                }
+            }
+        })
+
+    def test_no_client_state_machine_for_parameterized_explorations(self):
+        exploration = exp_domain.Exploration.create_default_exploration(
+            self.EXP_ID, 'A title', 'A category')
+        exploration.states[exploration.init_state_name].content[0].value = (
+            'Hello {{name}}')
+        exp_services.save_new_exploration(self.OWNER_ID, exploration)
+
+        self.assertIsNone(
+            exp_services.get_reader_bundle(exploration)['state_machine'])
+
+
 class LoadingAndDeletionOfDemosTest(ExplorationServicesUnitTests):
 
     TAGS = [test_utils.TestTags.SLOW_TEST]
@@ -1156,6 +1409,110 @@ class ExplorationSnapshotUnitTests(ExplorationServicesUnitTests):
             snapshots_metadata[0]['created_on'],
             snapshots_metadata[1]['created_on'])
 
+    def test_historical_versions_are_cached(self):
+        exploration = self.save_new_valid_exploration(
+            self.EXP_ID, self.OWNER_ID)
+        exploration.title = 'New title'
+        exp_services._save_exploration(
+            self.OWNER_ID, exploration, 'Changed title.', [])
+
+        old_exploration = exp_services.get_exploration_by_id(
+            self.EXP_ID, version=1)
+        self.assertEqual(old_exploration.title, 'A title')
+        self.assertEqual(old_exploration.version, 1)
+
+        # Changes to the returned object do not affect the cached copy.
+        old_exploration.title = 'Changed title'
+        # The cached copy is used even if the snapshot is no longer readable.
+        exp_models.ExplorationSnapshotContentModel.get(
+            '%s-1' % self.EXP_ID).delete()
+        self.assertEqual(
+            exp_services.get_exploration_by_id(self.EXP_ID, version=1).title,
+            'A title')
+
+        with self.assertRaisesRegexp(Exception, 'Version 3 of exploration'):
+            exp_services.get_exploration_by_id(self.EXP_ID, version=3)
+        self.assertIsNone(exp_services.get_exploration_by_id(
+            self.EXP_ID, strict=False, version=3))
+
+        # Versions given as strings, such as URL parameters, use the same
+        # cached copy.
+        self.assertEqual(
+            exp_services.get_exploration_by_id(self.EXP_ID, version='1').title,
+            'A title')
+        with self.assertRaisesRegexp(Exception, 'Version abc of exploration'):
+            exp_services.get_exploration_by_id(self.EXP_ID, version='abc')
+
+        # The cached copy is not returned once the exploration is deleted.
+        exp_services.delete_exploration(self.OWNER_ID, self.EXP_ID)
+        self.assertIsNone(exp_services.get_exploration_by_id(
+            self.EXP_ID, strict=False, version=1))
+
+    def test_cached_versions_of_recreated_explorations_are_not_used(self):
+        exploration = self.save_new_valid_exploration(
+            self.EXP_ID, self.OWNER_ID)
+        exploration.title = 'New title'
+        exp_services._save_exploration(
+            self.OWNER_ID, exploration, 'Changed title.', [])
+        self.assertEqual(
+            exp_services.get_exploration_by_id(self.EXP_ID, version=1).title,
+            'A title')
+
+        exp_services.delete_exploration(
+            self.OWNER_ID, self.EXP_ID, force_deletion=True)
+        exploration = exp_domain.Exploration.create_default_exploration(
+            self.EXP_ID, 'Another title', 'A category')
+        exploration.states[exploration.init_state_name].widget.handlers[
+            0].rule_specs[0].dest = feconf.END_DEST
+        exp_services.save_new_exploration(self.OWNER_ID, exploration)
+        exploration.title = 'Another new title'
+        exp_services._save_exploration(
+            self.OWNER_ID, exploration, 'Changed title.', [])
+
+        # No cached versions are deleted when the exploration is recreated,
+        # as on other instances, but the cached versions of the old
+        # exploration are not returned.
+        self.assertEqual(
+            exp_services.get_exploration_by_id(self.EXP_ID, version=1).title,
+            'Another title')
+
+    def test_snapshots_are_stored_relative_to_keyframes(self):
+        exploration = self.save_new_valid_exploration(
+            self.EXP_ID, self.OWNER_ID)
+        for version in range(2, 13):
+            exploration.title = 'Title %s' % version
+            exp_services._save_exploration(
+                self.OWNER_ID, exploration, 'Changed title.', [])
+
+        keyframe_interval = (
+            exp_models.ExplorationModel.SNAPSHOT_KEYFRAME_INTERVAL)
+        for version in range(1, 13):
+            snapshot_model = exp_models.ExplorationSnapshotContentModel.get(
+                '%s-%s' % (self.EXP_ID, version))
+            if version % keyframe_interval == 1:
+                self.assertIsNone(snapshot_model.keyframe_version)
+            else:
+                self.assertEqual(
+                    snapshot_model.keyframe_version,
+                    version - (version - 1) % keyframe_interval)
+
+            historical_exploration = exp_services.get_exploration_by_id(
+                self.EXP_ID, version=version)
+            self.assertEqual(
+                historical_exploration.title,
+                'A title' if version == 1 else 'Title %s' % version)
+            self.assertEqual(
+                historical_exploration.states.keys(),
+                exploration.states.keys())
+
+        # Reverting to a version that is stored as a difference works.
+        exp_services.revert_exploration(self.OWNER_ID, self.EXP_ID, 12, 5)
+        self.assertEqual(
+            exp_services.get_exploration_by_id(self.EXP_ID).title, 'Title 5')
+        self.assertEqual(
+            exp_services.get_exploration_by_id(self.EXP_ID, version=13).title,
+            'Title 5')
+
 
 class ExplorationCommitLogUnitTests(ExplorationServicesUnitTests):
     """Test methods relating to the exploration commit log."""
@@ -25,6 +25,7 @@ from core.platform import models
 (file_models,) = models.Registry.import_models([
     models.NAMES.file
 ])
+memcache_services = models.Registry.import_memcache_services()
 import feconf
 import utils
 
@@ -45,17 +46,43 @@ class FileStreamWithMetadata(object):
     """A class that wraps a file stream, but adds extra attributes to it."""
 
     def __init__(self, content, version, metadata):
-        """The args are a file content blob and a metadata model object."""
+        """The args are a file content blob and a metadata model object.
+
+        If content is None, the content is read from the file chunks that the
+        metadata model refers to, as it is needed.
+        """
         self._content = content
         self._version = version
         self._metadata = FileMetadata(metadata)
+        self._content_hash = (
+            metadata.content_hash if (metadata is not None) else None)
+        if self._content_hash is None:
+            self._content_hash = (
+                file_models.FileContentModel.get_content_hash(content))
 
     def read(self):
         """Emulates stream.read(). Returns all bytes and emulates EOF."""
+        if self._content is None:
+            self._content = ''.join(self.iter_chunks())
         content = self._content
         self._content = ''
         return content
 
+    def iter_chunks(self, start=0, stop=None):
+        """Yields the bytes of the file in the range [start, stop), a chunk at
+        a time. If stop is None, the bytes up to the end of the file are
+        returned.
+
+        Only a few chunks are fetched from the datastore at once, but callers
+        that collect the yielded bytes will still hold the whole range.
+        """
+        if self._content is not None:
+            yield self._content[start:stop]
+        else:
+            for chunk in file_models.FileChunkModel.iter_content(
+                    self._content_hash, self._metadata.size, start, stop):
+                yield chunk
+
     @property
     def metadata(self):
         return self._metadata
@@ -64,6 +91,11 @@ class FileStreamWithMetadata(object):
     def version(self):
         return self._version
 
+    @property
+    def content_hash(self):
+        """A hash of the content of the file."""
+        return self._content_hash
+
 
 class ExplorationFileSystem(object):
     """A datastore-backed read-write file system for a single exploration.
@@ -92,8 +124,9 @@ class ExplorationFileSystem(object):
     def exploration_id(self):
         return self._exploration_id
 
-    def _get_file_metadata(self, filepath, version):
-        """Return the desired file metadata.
+    def get_file_metadata(self, filepath, version=None):
+        """Returns the metadata model for the given version of a file. If
+        version is None, the latest version is used.
 
         Returns None if the file does not exist.
         """
@@ -116,25 +149,53 @@ class ExplorationFileSystem(object):
             return file_models.FileModel.get_version(
                 self._exploration_id, 'assets/%s' % filepath, version)
 
+    def _get_memcache_key(self, filepath, version):
+        """Returns the memcache key for a version of a file.
+
+        If version is None, the key refers to the latest version of the file.
+        """
+        return 'file:%s:%s:%s' % (
+            self._exploration_id, version if version else 'latest',
+            filepath)
+
+    def _delete_memcached_file(self, filepath, version):
+        """Removes the latest version, and the given version, of a file from
+        memcache.
+
+        The given version is removed too, since version numbers are reused if
+        a file is deleted and then created again. Both keys are locked for a
+        while, so that a request that read the file before it changed cannot
+        put the old content back; see get_multi().
+        """
+        memcache_services.delete_multi([
+            self._get_memcache_key(filepath, None),
+            self._get_memcache_key(filepath, version)
+        ], seconds=feconf.MEMCACHE_DELETE_LOCK_SECS)
+
     def _save_file(self, user_id, filepath, raw_bytes):
         """Create or update a file."""
         if len(raw_bytes) > feconf.MAX_FILE_SIZE_BYTES:
-            raise Exception('The maximum allowed file size is 1 MB.')
+            raise Exception(
+                'The maximum allowed file size is %s MB.' %
+                (feconf.MAX_FILE_SIZE_BYTES // (1024 * 1024)))
+
+        self._save_file_metadata(
+            user_id, filepath, len(raw_bytes),
+            file_models.FileContentModel.save_content(raw_bytes))
 
-        metadata = self._get_file_metadata(filepath, None)
+    def _save_file_metadata(self, user_id, filepath, size, content_hash):
+        """Create or update the metadata of a file whose content has been
+        stored with the given hash.
+        """
+        metadata = self.get_file_metadata(filepath, None)
         if not metadata:
             metadata = file_models.FileMetadataModel.create(
                 self._exploration_id, 'assets/%s' % filepath)
-        metadata.size = len(raw_bytes)
-
-        data = self._get_file_data(filepath, None)
-        if not data:
-            data = file_models.FileModel.create(
-                self._exploration_id, 'assets/%s' % filepath)
-        data.content = raw_bytes
+        metadata.size = size
+        metadata.content_hash = content_hash
 
-        data.commit(user_id, CHANGE_LIST_SAVE)
         metadata.commit(user_id, CHANGE_LIST_SAVE)
+        self._delete_memcached_file(filepath, metadata.version)
 
     def get(self, filepath, version=None):
         """Gets a file as an unencoded stream of raw bytes.
@@ -142,31 +203,126 @@ class ExplorationFileSystem(object):
         If `version` is not supplied, the latest version is retrieved. If the
         file does not exist, None is returned.
         """
-        metadata = self._get_file_metadata(filepath, version)
-        if metadata:
-            data = self._get_file_data(filepath, version)
-            if data:
-                if version is None:
-                    version = data.version
-                return FileStreamWithMetadata(data.content, version, metadata)
+        return self.get_multi([filepath], version=version)[0]
+
+    def get_multi(self, filepaths, version=None):
+        """Gets several files as unencoded streams of raw bytes.
+
+        The files are read together in a few batches, rather than one at a
+        time. If `version` is not supplied, the latest version of each file is
+        retrieved. None is returned in place of each file that does not exist.
+
+        Files that are small enough are cached in memcache. The content of
+        larger files is read from the datastore as their streams are consumed.
+        Cached files are only added if they are not cached already, and they
+        expire, so that a concurrent change is not overwritten indefinitely.
+        """
+        memcache_keys = [
+            self._get_memcache_key(filepath, version) for filepath in filepaths]
+        memcached_files = memcache_services.get_multi(memcache_keys)
+
+        file_streams = [None] * len(filepaths)
+        uncached_indexes = []
+        for (ind, memcache_key) in enumerate(memcache_keys):
+            memcached_file = memcached_files.get(memcache_key)
+            if memcached_file is not None:
+                file_streams[ind] = FileStreamWithMetadata(
+                    memcached_file['content'], memcached_file['version'],
+                    memcached_file['metadata'])
             else:
-                logging.error(
-                    'Metadata and data for file %s (version %s) are out of '
-                    'sync.' % (filepath, version))
-                return None
-        else:
-            return None
+                uncached_indexes.append(ind)
+        if not uncached_indexes:
+            return file_streams
+
+        metadata_by_index = dict(zip(
+            uncached_indexes, file_models.FileMetadataModel.get_models(
+                self._exploration_id,
+                ['assets/%s' % filepaths[ind] for ind in uncached_indexes],
+                version_number=version)))
+
+        # The content of small files is read in full. The content of files
+        # saved before file contents were stored in chunks is read from their
+        # FileModels.
+        chunked_indexes = []
+        legacy_indexes = []
+        for (ind, metadata) in metadata_by_index.iteritems():
+            if metadata is None:
+                continue
+            elif metadata.content_hash is None:
+                legacy_indexes.append(ind)
+            elif metadata.size <= feconf.MAX_MEMCACHED_FILE_SIZE_BYTES:
+                chunked_indexes.append(ind)
+            else:
+                file_streams[ind] = FileStreamWithMetadata(
+                    None, metadata.version, metadata)
+
+        contents_by_index = dict(zip(
+            chunked_indexes, file_models.FileChunkModel.get_contents([
+                (metadata_by_index[ind].content_hash,
+                 metadata_by_index[ind].size)
+                for ind in chunked_indexes])))
+        if legacy_indexes:
+            data_models = file_models.FileModel.get_models(
+                self._exploration_id,
+                ['assets/%s' % filepaths[ind] for ind in legacy_indexes],
+                version_number=version)
+            for (ind, data) in zip(legacy_indexes, data_models):
+                if data is None:
+                    logging.error(
+                        'Metadata and data for file %s (version %s) are out '
+                        'of sync.' % (filepaths[ind], version))
+                else:
+                    contents_by_index[ind] = data.content
+
+        memcache_mapping = {}
+        for (ind, content) in contents_by_index.iteritems():
+            metadata = metadata_by_index[ind]
+            file_streams[ind] = FileStreamWithMetadata(
+                content, metadata.version, metadata)
+            if len(content) <= feconf.MAX_MEMCACHED_FILE_SIZE_BYTES:
+                memcache_mapping[memcache_keys[ind]] = {
+                    'content': content,
+                    'version': metadata.version,
+                    'metadata': metadata,
+                }
+        if memcache_mapping:
+            memcache_services.add_multi(
+                memcache_mapping, time=feconf.FILE_CACHE_TTL_SECS)
+
+        return file_streams
 
     def commit(self, user_id, filepath, raw_bytes):
         """Saves a raw bytestring as a file in the database."""
         self._save_file(user_id, filepath, raw_bytes)
 
+    def copy_from(self, user_id, source_fs, filepath):
+        """Copies the latest version of a file from another exploration's
+        file system.
+
+        The content of the file is not copied; the new file refers to the
+        same stored content as the original one.
+        """
+        metadata = source_fs.get_file_metadata(filepath)
+        if not metadata:
+            raise IOError('File %s not found.' % filepath)
+
+        if metadata.content_hash is None:
+            # The file was saved before file contents were stored separately
+            # from the files that refer to them, so its content is stored
+            # afresh.
+            self._save_file(
+                user_id, filepath, source_fs.get(filepath).read())
+        else:
+            self._save_file_metadata(
+                user_id, filepath, metadata.size, metadata.content_hash)
+
     def delete(self, user_id, filepath):
         """Marks the current version of a file as deleted."""
 
-        metadata = self._get_file_metadata(filepath, None)
+        metadata = self.get_file_metadata(filepath, None)
         if metadata:
             metadata.delete(user_id, '')
+            self._delete_memcached_file(filepath, metadata.version)
 
         data = self._get_file_data(filepath, None)
         if data:
@@ -174,7 +330,7 @@ class ExplorationFileSystem(object):
 
     def isfile(self, filepath):
         """Checks the existence of a file."""
-        metadata = self._get_file_metadata(filepath, None)
+        metadata = self.get_file_metadata(filepath, None)
         return bool(metadata)
 
     def listdir(self, dir_name):
@@ -188,20 +344,11 @@ class ExplorationFileSystem(object):
             List of str. This is a lexicographically-sorted list of filenames,
             each of which is prefixed with dir_name.
         """
-        # The trailing slash is necessary to prevent non-identical directory
-        # names with the same prefix from matching, e.g. /abcd/123.png should
-        # not match a query for files under /abc/.
-        prefix = '%s' % os.path.join(
-            '/', self._exploration_id, 'assets', dir_name)
-        if not prefix.endswith('/'):
-            prefix += '/'
-
         result = set()
-        metadata_models = file_models.FileMetadataModel.get_undeleted()
+        metadata_models = file_models.FileMetadataModel.get_undeleted_in_dir(
+            self._exploration_id, 'assets/%s' % dir_name)
         for metadata_model in metadata_models:
-            filepath = metadata_model.id
-            if filepath.startswith(prefix):
-                result.add('/'.join(filepath.split('/')[3:]))
+            result.add('/'.join(metadata_model.id.split('/')[3:]))
         return sorted(list(result))
 
 
@@ -234,9 +381,15 @@ class DiskBackedFileSystem(object):
             os.path.join(self._root, filepath), raw_bytes=True)
         return FileStreamWithMetadata(content, None, None)
 
+    def get_multi(self, filepaths, version=None):
+        return [self.get(filepath, version=version) for filepath in filepaths]
+
     def commit(self, user_id, filepath, raw_bytes):
         raise NotImplementedError
 
+    def copy_from(self, user_id, source_fs, filepath):
+        raise NotImplementedError
+
     def delete(self, user_id, filepath):
         raise NotImplementedError
 
@@ -283,12 +436,35 @@ class AbstractFileSystem(object):
                 % (filepath, version if version else 'latest'))
         return file_stream.read()
 
+    def get_multi(self, filepaths, version=None):
+        """Returns a list of bytestrings with the contents of the given files,
+        which are read together in a few batches.
+        """
+        for filepath in filepaths:
+            self._check_filepath(filepath)
+        file_streams = self._impl.get_multi(filepaths, version=version)
+
+        for (filepath, file_stream) in zip(filepaths, file_streams):
+            if file_stream is None:
+                raise IOError(
+                    'File %s (version %s) not found.'
+                    % (filepath, version if version else 'latest'))
+        return [file_stream.read() for file_stream in file_streams]
+
     def commit(self, user_id, filepath, raw_bytes):
         """Replaces the contents of the file with the given bytestring."""
         raw_bytes = str(raw_bytes)
         self._check_filepath(filepath)
         self._impl.commit(user_id, filepath, raw_bytes)
 
+    def copy_from(self, user_id, source_fs, filepath):
+        """Copies a file from another file system, replacing any existing file
+        with the same path.
+        """
+        self._check_filepath(filepath)
+        source_fs._check_filepath(filepath)
+        self._impl.copy_from(user_id, source_fs.impl, filepath)
+
     def delete(self, user_id, filepath):
         """Deletes a file and the metadata associated with it."""
         self._check_filepath(filepath)
@@ -19,6 +19,9 @@
 __author__ = 'Sean Lip'
 
 from core.domain import fs_domain
+from core.platform import models
+(file_models,) = models.Registry.import_models([models.NAMES.file])
+memcache_services = models.Registry.import_memcache_services()
 import test_utils
 
 
@@ -74,6 +77,20 @@ class ExplorationFileSystemUnitTests(test_utils.GenericTestBase):
             fs_domain.ExplorationFileSystem('eid2'))
         self.assertEqual(new_fs.listdir('assets'), [])
 
+    def test_listdir_only_reads_undeleted_files_of_exploration(self):
+        fs = fs_domain.AbstractFileSystem(
+            fs_domain.ExplorationFileSystem('eid'))
+        fs.commit(self.user_id, 'abc.png', 'file_contents')
+        fs.commit(self.user_id, 'def.png', 'file_contents_2')
+        fs.delete(self.user_id, 'def.png')
+
+        other_fs = fs_domain.AbstractFileSystem(
+            fs_domain.ExplorationFileSystem('eid2'))
+        other_fs.commit(self.user_id, 'abc.png', 'file_contents_3')
+
+        self.assertEqual(fs.listdir(''), ['abc.png'])
+        self.assertEqual(other_fs.listdir(''), ['abc.png'])
+
     def test_versioning(self):
         fs = fs_domain.AbstractFileSystem(
             fs_domain.ExplorationFileSystem('eid'))
@@ -95,6 +112,64 @@ class ExplorationFileSystemUnitTests(test_utils.GenericTestBase):
         self.assertEqual(old_file_stream.version, 1)
         self.assertEqual(old_file_stream.metadata.size, len('file_contents'))
 
+    def test_large_files_are_stored_in_chunks(self):
+        fs = fs_domain.AbstractFileSystem(
+            fs_domain.ExplorationFileSystem('eid'))
+        chunk_size = file_models.FileChunkModel.CHUNK_SIZE_BYTES
+        raw_bytes = ''.join(
+            chr(ind % 251) for ind in range(chunk_size * 2 + 100))
+        fs.commit(self.user_id, 'abc.png', raw_bytes)
+
+        self.assertEqual(file_models.FileChunkModel.query().count(), 3)
+
+        file_stream = fs.open('abc.png')
+        self.assertEqual(file_stream.metadata.size, len(raw_bytes))
+        self.assertEqual(
+            ''.join(file_stream.iter_chunks(chunk_size - 5, chunk_size + 5)),
+            raw_bytes[chunk_size - 5: chunk_size + 5])
+        self.assertEqual(
+            ''.join(file_stream.iter_chunks(chunk_size * 2 + 50)),
+            raw_bytes[chunk_size * 2 + 50:])
+        self.assertEqual(file_stream.read(), raw_bytes)
+        self.assertEqual(fs.get('abc.png'), raw_bytes)
+
+    def test_get_multi(self):
+        fs = fs_domain.AbstractFileSystem(
+            fs_domain.ExplorationFileSystem('eid'))
+        fs.commit(self.user_id, 'abc.png', 'file_contents')
+        fs.commit(self.user_id, 'def.png', 'file_contents_2')
+        fs.commit(self.user_id, 'def.png', 'file_contents_3')
+
+        self.assertEqual(
+            fs.get_multi(['def.png', 'abc.png']),
+            ['file_contents_3', 'file_contents'])
+        self.assertEqual(
+            fs.get_multi(['abc.png', 'def.png'], version=1),
+            ['file_contents', 'file_contents_2'])
+        self.assertEqual(fs.get_multi([]), [])
+
+        with self.assertRaisesRegexp(IOError, r'File ghi\.png .* not found'):
+            fs.get_multi(['abc.png', 'ghi.png'])
+
+    def test_stale_files_are_not_written_back_to_memcache(self):
+        exploration_fs = fs_domain.ExplorationFileSystem('eid')
+        fs = fs_domain.AbstractFileSystem(exploration_fs)
+        fs.commit(self.user_id, 'abc.png', 'file_contents')
+        stale_metadata = exploration_fs.get_file_metadata('abc.png')
+
+        fs.commit(self.user_id, 'abc.png', 'new_file_contents')
+
+        # A request that read the file before it was changed tries to cache
+        # it after the change.
+        memcache_key = exploration_fs._get_memcache_key('abc.png', None)
+        memcache_services.add_multi({memcache_key: {
+            'content': 'file_contents',
+            'version': stale_metadata.version,
+            'metadata': stale_metadata,
+        }})
+        self.assertEqual(memcache_services.get_multi([memcache_key]), {})
+        self.assertEqual(fs.get('abc.png'), 'new_file_contents')
+
     def test_independence_of_file_systems(self):
         fs = fs_domain.AbstractFileSystem(
             fs_domain.ExplorationFileSystem('eid'))
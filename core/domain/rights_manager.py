@@ -19,6 +19,7 @@
 __author__ = 'Sean Lip'
 
 
+import copy
 import logging
 
 from core.domain import config_domain
@@ -26,7 +27,9 @@ from core.domain import exp_domain
 from core.domain import user_services
 from core.platform import models
 current_user_services = models.Registry.import_current_user_services()
+memcache_services = models.Registry.import_memcache_services()
 (exp_models,) = models.Registry.import_models([models.NAMES.exploration])
+import feconf
 import utils
 
 
@@ -49,6 +52,18 @@ ROLE_NONE = 'none'
 ROLE_ADMIN = 'admin'
 ROLE_MODERATOR = 'moderator'
 
+# The capabilities returned by get_permissions(), each of which is the name of
+# a method of Actor.
+PERMISSION_NAMES = [
+    'can_clone', 'can_delete', 'can_edit', 'can_modify_roles',
+    'can_publicize', 'can_publish', 'can_release_ownership',
+    'can_unpublicize', 'can_unpublish', 'can_view']
+
+# Rights domain objects that have been loaded during the current request,
+# keyed by exploration id. The value is None if the exploration does not
+# exist. These objects are shared, and must not be modified.
+_REQUEST_RIGHTS_CACHE = utils.RequestCache()
+
 
 class ExplorationRights(object):
     """Domain object for the rights/publication status of an exploration."""
@@ -155,6 +170,7 @@ def _save_exploration_rights(
     model.status = exploration_rights.status
 
     model.commit(committer_id, commit_message, commit_cmds)
+    _delete_cached_exploration_rights(exploration_rights.id)
 
 
 def create_new_exploration_rights(exploration_id, committer_id, cloned_from):
@@ -171,14 +187,115 @@ def create_new_exploration_rights(exploration_id, committer_id, cloned_from):
         status=exploration_rights.status
     )
     model.commit(committer_id, 'Created new exploration', commit_cmds)
+    _delete_cached_exploration_rights(exploration_id)
+
+
+def delete_exploration_rights(
+        committer_id, exploration_id, force_deletion=False):
+    """Deletes the rights for this exploration.
+
+    See exp_services.delete_exploration() for the meaning of force_deletion.
+    """
+    exploration_rights_model = exp_models.ExplorationRightsModel.get(
+        exploration_id)
+    exploration_rights_model.delete(
+        committer_id, '', force_deletion=force_deletion)
+    _delete_cached_exploration_rights(exploration_id)
+
+
+def _get_exploration_rights_memcache_key(exploration_id):
+    """Returns a memcache key for the rights of an exploration."""
+    return 'exploration-rights:%s' % exploration_id
+
+
+def _delete_cached_exploration_rights(exploration_id):
+    _REQUEST_RIGHTS_CACHE.delete(exploration_id)
+    # Readers that loaded the old rights before this change may not put them
+    # back into memcache for a while; see _get_multi_shared_exploration_rights.
+    memcache_services.delete(
+        _get_exploration_rights_memcache_key(exploration_id),
+        seconds=feconf.MEMCACHE_DELETE_LOCK_SECS)
+
+
+def _get_multi_shared_exploration_rights(exploration_ids):
+    """Returns a dict mapping each of the given exploration ids to its rights
+    domain object, or to None if the exploration does not exist.
+
+    The request cache is consulted first, then memcache, and then the
+    datastore, using a single batched call for each. The returned objects are
+    shared, and must not be modified.
+
+    Rights loaded from the datastore are only added to memcache if they are
+    not there already, and not shortly after they were changed, so a stale
+    value is not written back after a concurrent change. They also expire,
+    which bounds the effect of any remaining race.
+    """
+    result = {}
+    uncached_ids = []
+    for exploration_id in set(exploration_ids):
+        if exploration_id in _REQUEST_RIGHTS_CACHE:
+            result[exploration_id] = _REQUEST_RIGHTS_CACHE.get(exploration_id)
+        else:
+            uncached_ids.append(exploration_id)
+
+    if uncached_ids:
+        memcache_keys = [
+            _get_exploration_rights_memcache_key(exploration_id)
+            for exploration_id in uncached_ids]
+        memcached_rights = memcache_services.get_multi(memcache_keys)
+
+        missing_ids = []
+        for (ind, exploration_id) in enumerate(uncached_ids):
+            if memcache_keys[ind] in memcached_rights:
+                result[exploration_id] = memcached_rights[memcache_keys[ind]]
+            else:
+                missing_ids.append(exploration_id)
+
+        if missing_ids:
+            rights_to_memcache = {}
+            rights_models = exp_models.ExplorationRightsModel.get_multi(
+                missing_ids)
+            for (ind, exploration_id) in enumerate(missing_ids):
+                model = rights_models[ind]
+                if model is None or model.deleted:
+                    result[exploration_id] = None
+                else:
+                    exploration_rights = _get_exploration_rights_from_model(
+                        model)
+                    result[exploration_id] = exploration_rights
+                    rights_to_memcache[
+                        _get_exploration_rights_memcache_key(
+                            exploration_id)] = exploration_rights
+            if rights_to_memcache:
+                memcache_services.add_multi(
+                    rights_to_memcache,
+                    time=feconf.EXPLORATION_RIGHTS_CACHE_TTL_SECS)
+
+        for exploration_id in uncached_ids:
+            _REQUEST_RIGHTS_CACHE.set(exploration_id, result[exploration_id])
+
+    return {
+        exploration_id: result[exploration_id]
+        for exploration_id in exploration_ids}
+
+
+def _get_shared_exploration_rights(exploration_id, strict=True):
+    """Returns the shared rights domain object for this exploration.
+
+    If strict is False, returns None if the exploration does not exist.
+    """
+    exploration_rights = _get_multi_shared_exploration_rights(
+        [exploration_id])[exploration_id]
+    if strict and exploration_rights is None:
+        raise exp_models.ExplorationRightsModel.EntityNotFoundError(
+            'Entity for class ExplorationRightsModel with id %s not found' %
+            exploration_id)
+    return exploration_rights
 
 
 def get_exploration_rights(exploration_id):
-    """Retrieves the rights for this exploration from the datastore."""
-    model = exp_models.ExplorationRightsModel.get(exploration_id)
-    if model is None:
-        raise Exception('This exploration does not exist.')
-    return _get_exploration_rights_from_model(model)
+    """Retrieves the rights for this exploration."""
+    return copy.deepcopy(_get_shared_exploration_rights(exploration_id))
 
 
 def get_non_private_exploration_rights():
@@ -232,17 +349,17 @@ def get_owned_exploration_rights(user_id):
 
 
 def is_exploration_private(exploration_id):
-    exploration_rights = get_exploration_rights(exploration_id)
+    exploration_rights = _get_shared_exploration_rights(exploration_id)
     return exploration_rights.status == EXPLORATION_STATUS_PRIVATE
 
 
 def is_exploration_public(exploration_id):
-    exploration_rights = get_exploration_rights(exploration_id)
+    exploration_rights = _get_shared_exploration_rights(exploration_id)
     return exploration_rights.status == EXPLORATION_STATUS_PUBLIC
 
 
 def is_exploration_cloned(exploration_id):
-    exploration_rights = get_exploration_rights(exploration_id)
+    exploration_rights = _get_shared_exploration_rights(exploration_id)
     return bool(exploration_rights.cloned_from)
 
 
@@ -251,6 +368,11 @@ class Actor(object):
 
     Due to GAE limitations, this class should only ever be invoked with a
     user_id that is equal to the user_id of the current request.
+
+    Each public method that takes an exploration_id delegates to a private
+    method that takes the exploration's rights object (or None, if the
+    exploration does not exist) instead, so that get_permissions() can
+    evaluate many explorations using a single batch of rights lookups.
     """
 
     def __init__(self, user_id):
@@ -258,36 +380,29 @@ class Actor(object):
         self.user_id = user_id
 
     def is_admin(self):
-        return self.user_id in config_domain.ADMIN_IDS.value
+        return config_domain.ADMIN_IDS.contains(self.user_id)
 
     def is_moderator(self):
         return (self.is_admin() or
-                self.user_id in config_domain.MODERATOR_IDS.value)
+                config_domain.MODERATOR_IDS.contains(self.user_id))
 
-    def is_owner(self, exploration_id):
-        try:
-            exp_rights = get_exploration_rights(exploration_id)
-        except Exception:
+    def _is_owner(self, exp_rights):
+        if exp_rights is None:
             return False
 
         return (
             exp_rights.community_owned or self.user_id in exp_rights.owner_ids)
 
-    def has_explicit_editing_rights(self, exploration_id):
-        """Whether this user is in the owner/editor list of the exploration."""
-        try:
-            exp_rights = get_exploration_rights(exploration_id)
-        except Exception:
+    def _has_explicit_editing_rights(self, exp_rights):
+        if exp_rights is None:
             return False
 
         return (exp_rights.community_owned or
                 self.user_id in exp_rights.editor_ids or
                 self.user_id in exp_rights.owner_ids)
 
-    def has_explicit_viewing_rights(self, exploration_id):
-        try:
-            exp_rights = get_exploration_rights(exploration_id)
-        except Exception:
+    def _has_explicit_viewing_rights(self, exp_rights):
+        if exp_rights is None:
             return False
 
         return (exp_rights.status != EXPLORATION_STATUS_PRIVATE or
@@ -295,47 +410,44 @@ class Actor(object):
                 self.user_id in exp_rights.editor_ids or
                 self.user_id in exp_rights.owner_ids)
 
-    def can_view(self, exploration_id):
-        try:
-            exp_rights = get_exploration_rights(exploration_id)
-        except Exception:
+    def _can_view(self, exp_rights):
+        if exp_rights is None:
             return False
 
         if exp_rights.status == EXPLORATION_STATUS_PRIVATE:
-            return (self.has_explicit_viewing_rights(exploration_id)
+            return (self._has_explicit_viewing_rights(exp_rights)
                     or self.is_moderator())
         else:
             return True
 
-    def can_clone(self, exploration_id):
-        exp_rights = get_exploration_rights(exploration_id)
+    def _can_clone(self, exp_rights):
+        if exp_rights is None:
+            return False
+
         if exp_rights.cloned_from:
             return False
         if exp_rights.status == EXPLORATION_STATUS_PRIVATE:
             return False
-        return self.user_id and self.can_view(exploration_id)
+        return bool(self.user_id) and self._can_view(exp_rights)
+
+    def _can_edit(self, exp_rights):
+        if exp_rights is None:
+            return False
 
-    def can_edit(self, exploration_id):
-        exp_rights = get_exploration_rights(exploration_id)
         return (
-            self.has_explicit_editing_rights(exploration_id) or (
+            self._has_explicit_editing_rights(exp_rights) or (
                 self.is_moderator() and
                 exp_rights.status != EXPLORATION_STATUS_PRIVATE
             )
         )
 
-    def can_accept_submitted_change(self, exploration_id):
-        return self.can_edit(exploration_id)
-
-    def can_delete(self, exploration_id):
-        try:
-            exp_rights = get_exploration_rights(exploration_id)
-        except Exception:
+    def _can_delete(self, exp_rights):
+        if exp_rights is None:
             return False
 
         is_deleting_own_private_exploration = (
             exp_rights.status == EXPLORATION_STATUS_PRIVATE and
-            self.is_owner(exploration_id)
+            self._is_owner(exp_rights)
         )
 
         is_moderator_deleting_public_exploration = (
@@ -347,14 +459,8 @@ class Actor(object):
             is_deleting_own_private_exploration or
             is_moderator_deleting_public_exploration)
 
-    def can_publish(self, exploration_id):
-        if exp_domain.Exploration.is_demo_exploration_id(exploration_id):
-            # Demo explorations are public by default.
-            return True
-
-        try:
-            exp_rights = get_exploration_rights(exploration_id)
-        except Exception:
+    def _can_publish(self, exp_rights):
+        if exp_rights is None:
             return False
 
         if exp_rights.status != EXPLORATION_STATUS_PRIVATE:
@@ -362,12 +468,10 @@ class Actor(object):
         if exp_rights.cloned_from:
             return False
 
-        return self.is_owner(exploration_id) or self.is_admin()
+        return self._is_owner(exp_rights) or self.is_admin()
 
-    def can_unpublish(self, exploration_id):
-        try:
-            exp_rights = get_exploration_rights(exploration_id)
-        except Exception:
+    def _can_unpublish(self, exp_rights):
+        if exp_rights is None:
             return False
 
         if exp_rights.status != EXPLORATION_STATUS_PUBLIC:
@@ -376,62 +480,140 @@ class Actor(object):
             return False
         return self.is_moderator()
 
-    def can_modify_roles(self, exploration_id):
-        try:
-            exp_rights = get_exploration_rights(exploration_id)
-        except Exception:
+    def _can_modify_roles(self, exp_rights):
+        if exp_rights is None:
             return False
 
         if exp_rights.community_owned or exp_rights.cloned_from:
             return False
-        return self.is_admin() or self.is_owner(exploration_id)
+        return self.is_admin() or self._is_owner(exp_rights)
 
-    def can_release_ownership(self, exploration_id):
-        try:
-            exp_rights = get_exploration_rights(exploration_id)
-        except Exception:
+    def _can_release_ownership(self, exp_rights):
+        if exp_rights is None:
             return False
 
         if exp_rights.status == EXPLORATION_STATUS_PRIVATE:
             return False
-        return self.can_modify_roles(exploration_id)
+        return self._can_modify_roles(exp_rights)
 
-    def can_submit_change_for_review(self, exploration_id):
-        try:
-            exp_rights = get_exploration_rights(exploration_id)
-        except Exception:
+    def _can_submit_change_for_review(self, exp_rights):
+        if exp_rights is None:
             return False
 
         if exp_rights.status == EXPLORATION_STATUS_PRIVATE:
-            return self.can_edit(exploration_id)
-        return True
-
-    def can_make_minor_edit(self, exploration_id):
-        return self.can_submit_change_for_review(exploration_id)
-
-    def can_send_feedback(self, exploration_id):
+            return self._can_edit(exp_rights)
         return True
 
-    def can_publicize(self, exploration_id):
-        try:
-            exp_rights = get_exploration_rights(exploration_id)
-        except Exception:
+    def _can_publicize(self, exp_rights):
+        if exp_rights is None:
             return False
 
         if exp_rights.status != EXPLORATION_STATUS_PUBLIC:
             return False
         return self.is_moderator()
 
-    def can_unpublicize(self, exploration_id):
-        try:
-            exp_rights = get_exploration_rights(exploration_id)
-        except Exception:
+    def _can_unpublicize(self, exp_rights):
+        if exp_rights is None:
             return False
 
         if exp_rights.status != EXPLORATION_STATUS_PUBLICIZED:
             return False
         return self.is_moderator()
 
+    def is_owner(self, exploration_id):
+        return self._is_owner(
+            _get_shared_exploration_rights(exploration_id, strict=False))
+
+    def has_explicit_editing_rights(self, exploration_id):
+        """Whether this user is in the owner/editor list of the exploration."""
+        return self._has_explicit_editing_rights(
+            _get_shared_exploration_rights(exploration_id, strict=False))
+
+    def has_explicit_viewing_rights(self, exploration_id):
+        return self._has_explicit_viewing_rights(
+            _get_shared_exploration_rights(exploration_id, strict=False))
+
+    def can_view(self, exploration_id):
+        return self._can_view(
+            _get_shared_exploration_rights(exploration_id, strict=False))
+
+    def can_clone(self, exploration_id):
+        return self._can_clone(_get_shared_exploration_rights(exploration_id))
+
+    def can_edit(self, exploration_id):
+        return self._can_edit(_get_shared_exploration_rights(exploration_id))
+
+    def can_accept_submitted_change(self, exploration_id):
+        return self.can_edit(exploration_id)
+
+    def can_delete(self, exploration_id):
+        return self._can_delete(
+            _get_shared_exploration_rights(exploration_id, strict=False))
+
+    def can_publish(self, exploration_id):
+        if exp_domain.Exploration.is_demo_exploration_id(exploration_id):
+            # Demo explorations are public by default.
+            return True
+
+        return self._can_publish(
+            _get_shared_exploration_rights(exploration_id, strict=False))
+
+    def can_unpublish(self, exploration_id):
+        return self._can_unpublish(
+            _get_shared_exploration_rights(exploration_id, strict=False))
+
+    def can_modify_roles(self, exploration_id):
+        return self._can_modify_roles(
+            _get_shared_exploration_rights(exploration_id, strict=False))
+
+    def can_release_ownership(self, exploration_id):
+        return self._can_release_ownership(
+            _get_shared_exploration_rights(exploration_id, strict=False))
+
+    def can_submit_change_for_review(self, exploration_id):
+        return self._can_submit_change_for_review(
+            _get_shared_exploration_rights(exploration_id, strict=False))
+
+    def can_make_minor_edit(self, exploration_id):
+        return self.can_submit_change_for_review(exploration_id)
+
+    def can_send_feedback(self, exploration_id):
+        return True
+
+    def can_publicize(self, exploration_id):
+        return self._can_publicize(
+            _get_shared_exploration_rights(exploration_id, strict=False))
+
+    def can_unpublicize(self, exploration_id):
+        return self._can_unpublicize(
+            _get_shared_exploration_rights(exploration_id, strict=False))
+
+
+def get_permissions(user_id, exploration_ids):
+    """Evaluates the capabilities of a user for several explorations at once.
+
+    Returns:
+      a dict whose keys are the given exploration ids. Each value is a dict
+      whose keys are the names in PERMISSION_NAMES, and whose values are
+      booleans giving the results of the corresponding Actor methods. All
+      capabilities are False for explorations that do not exist.
+    """
+    actor = Actor(user_id)
+    exp_rights_dict = _get_multi_shared_exploration_rights(exploration_ids)
+
+    permissions = {}
+    for exploration_id in exploration_ids:
+        exp_rights = exp_rights_dict[exploration_id]
+        permissions[exploration_id] = {
+            permission_name: bool(
+                getattr(actor, '_%s' % permission_name)(exp_rights))
+            for permission_name in PERMISSION_NAMES}
+        if exp_domain.Exploration.is_demo_exploration_id(exploration_id):
+            # Demo explorations are public by default.
+            permissions[exploration_id]['can_publish'] = True
+
+    return permissions
+
 
 def assign_role(committer_id, exploration_id, assignee_id, new_role):
     """Assign `assignee_id` to the given role.
@@ -20,6 +20,8 @@ from core.domain import config_services
 from core.domain import exp_domain
 from core.domain import exp_services
 from core.domain import rights_manager
+from core.platform import models
+memcache_services = models.Registry.import_memcache_services()
 import feconf
 import test_utils
 import unittest
@@ -279,6 +281,49 @@ class ExplorationRightsTests(test_utils.GenericTestBase):
             rights_manager.Actor(self.user_id_admin).can_publicize(
                 self.EXP_ID))
 
+    def test_get_permissions(self):
+        exp = exp_domain.Exploration.create_default_exploration(
+            self.EXP_ID, 'A title', 'A category')
+        exp_services.save_new_exploration(self.user_id_a, exp)
+        exp_ids = [self.EXP_ID, 'nonexistent_exp_id']
+
+        for user_id in [self.user_id_a, self.user_id_b, self.user_id_admin]:
+            actor = rights_manager.Actor(user_id)
+            permissions = rights_manager.get_permissions(user_id, exp_ids)
+            self.assertEqual(permissions[self.EXP_ID], {
+                permission_name: bool(
+                    getattr(actor, permission_name)(self.EXP_ID))
+                for permission_name in rights_manager.PERMISSION_NAMES})
+            self.assertFalse(any(permissions['nonexistent_exp_id'].values()))
+
+        self.assertTrue(rights_manager.get_permissions(
+            self.user_id_a, exp_ids)[self.EXP_ID]['can_publish'])
+
+        # Changes to the rights are reflected in later permission checks.
+        rights_manager.publish_exploration(self.user_id_a, self.EXP_ID)
+        permissions = rights_manager.get_permissions(
+            self.user_id_b, exp_ids)[self.EXP_ID]
+        self.assertTrue(permissions['can_view'])
+        self.assertTrue(permissions['can_clone'])
+        self.assertFalse(permissions['can_edit'])
+        self.assertTrue(rights_manager.is_exploration_public(self.EXP_ID))
+
+    def test_stale_rights_are_not_written_back_to_memcache(self):
+        exp = exp_domain.Exploration.create_default_exploration(
+            self.EXP_ID, 'A title', 'A category')
+        exp_services.save_new_exploration(self.user_id_a, exp)
+        stale_rights = rights_manager.get_exploration_rights(self.EXP_ID)
+
+        rights_manager.publish_exploration(self.user_id_a, self.EXP_ID)
+
+        # A request that loaded the rights before they were changed tries to
+        # cache them after the change.
+        memcache_key = rights_manager._get_exploration_rights_memcache_key(
+            self.EXP_ID)
+        memcache_services.add_multi({memcache_key: stale_rights})
+        self.assertEqual(memcache_services.get_multi([memcache_key]), {})
+        self.assertTrue(rights_manager.is_exploration_public(self.EXP_ID))
+
 
 class PageRightsTest(test_utils.GenericTestBase):
     """Test which pages can be viewed by different users."""
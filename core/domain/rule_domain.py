@@ -18,12 +18,8 @@
 
 __author__ = 'Sean Lip'
 
-import inspect
-import os
-import pkgutil
-
+from core.domain import rule_registry
 from extensions.objects.models import objects
-import feconf
 import jinja_utils
 
 
@@ -53,29 +49,16 @@ def get_rules_for_obj_type(obj_type):
     Args:
         obj_type: str. The name of the object type.
     """
-    rule_dir = os.path.join(os.getcwd(), feconf.RULES_DIR)
-    rule_class_name = '%sRule' % obj_type
-    results = []
-
-    for loader, name, _ in pkgutil.iter_modules(path=[rule_dir]):
-        if name.endswith('_test'):
-            continue
-        module = loader.find_module(name).load_module(name)
-        for name, clazz in inspect.getmembers(module, inspect.isclass):
-            ancestors = clazz.__bases__
-            ancestor_class_names = [c.__name__ for c in ancestors]
-            if rule_class_name in ancestor_class_names:
-                results.append(clazz)
-
-    return results
+    return rule_registry.Registry.get_rules_for_obj_type(obj_type)
 
 
 def is_generic(obj_type, rule_name):
     """Checks whether this rule is labelled generic"""
-    rule_list = get_rules_for_obj_type(obj_type)
-    for rule_type in rule_list:
-        if rule_type.__name__ == rule_name:
-            return rule_type.is_generic
+    try:
+        return rule_registry.Registry.get_rule_class(
+            obj_type, rule_name).is_generic
+    except KeyError:
+        return None
 
 
 def get_param_list(description):
@@ -217,11 +200,8 @@ def get_rule_description(definition, param_specs, answer_type):
         else:
             subject_type = param_specs[definition['subject']].obj_type
 
-        all_rule_classes = get_rules_for_obj_type(subject_type)
-
-        rule = next(r for r in all_rule_classes
-                    if r.__name__ == definition['name'])
-        return rule.description
+        return rule_registry.Registry.get_rule_class(
+            subject_type, definition['name']).description
 
     elif definition['rule_type'] == AND_RULE_TYPE:
         return ' and '.join([
@@ -247,67 +227,127 @@ def get_rule_description(definition, param_specs, answer_type):
         raise Exception('Unrecognized rule type %s' % definition['rule_type'])
 
 
-def evaluate_rule(definition, param_specs, answer_type, context_params, answer,
-                  fs):
-    """Evaluates a rule definition using context_params. Returns a boolean."""
+class CompiledRule(object):
+    """A rule definition that has been resolved ahead of evaluation.
 
-    if 'rule_type' not in definition:
-        raise Exception('No rule type specified when constructing rule.')
+    Compiling a rule definition looks up the rule classes it refers to and
+    normalizes all of its constant inputs once. Only inputs that are Jinja
+    templates (and therefore depend on the reader's parameters) are evaluated
+    and normalized each time the rule is evaluated.
+    """
 
-    elif definition['rule_type'] == DEFAULT_RULE_TYPE:
-        return True
+    def __init__(self, definition, param_specs, answer_type, fs):
+        """Compiles a rule definition.
 
-    elif definition['rule_type'] == ATOMIC_RULE_TYPE:
-        subject_name = definition['subject']
+        Args:
+            definition: dict. A rule-spec definition dict; see
+                get_rule_description() for its format.
+            param_specs: dict. The param specifications for the exploration.
+            answer_type: str. The obj_type of the reader's answer.
+            fs: AbstractFileSystem. The file system to attach to the rules.
+        """
+        if 'rule_type' not in definition:
+            raise Exception('No rule type specified when constructing rule.')
+
+        self.rule_type = definition['rule_type']
+
+        if self.rule_type == DEFAULT_RULE_TYPE:
+            pass
+
+        elif self.rule_type == ATOMIC_RULE_TYPE:
+            self._subject_name = definition['subject']
+            if self._subject_name == 'answer':
+                subject_type = answer_type
+            else:
+                subject_type = param_specs[self._subject_name].obj_type
+
+            self._rule_class = rule_registry.Registry.get_rule_class(
+                subject_type, definition['name'])
+            self._fs = fs
+
+            # A list of (obj_class, value, is_template) triples for the rule
+            # inputs, in the order given by the rule description. The value is
+            # already normalized unless it is a Jinja template.
+            self._inputs = []
+            for (param_name, obj_cls) in get_param_list(
+                    self._rule_class.description):
+                raw_param = definition['inputs'][param_name]
+                if isinstance(raw_param, basestring) and '{{' in raw_param:
+                    self._inputs.append((obj_cls, raw_param, True))
+                else:
+                    self._inputs.append(
+                        (obj_cls, obj_cls.normalize(raw_param), False))
+
+            # Rules with constant inputs are constructed once and reused.
+            self._constructed_rule = None
+            if not any([is_template for (_, _, is_template) in self._inputs]):
+                self._constructed_rule = self._rule_class(*[
+                    value for (_, value, _) in self._inputs]).set_fs(fs)
+
+        elif self.rule_type in [AND_RULE_TYPE, OR_RULE_TYPE]:
+            self._children = [
+                CompiledRule(child_dict, param_specs, answer_type, fs)
+                for child_dict in definition['children']]
+
+        elif self.rule_type == NOT_RULE_TYPE:
+            self._child = CompiledRule(
+                definition['child'], param_specs, answer_type, fs)
 
-        if subject_name == 'answer':
-            subject_type = answer_type
         else:
-            subject_type = param_specs[subject_name].obj_type
-
-        all_rule_classes = get_rules_for_obj_type(subject_type)
-        rule = next(r for r in all_rule_classes
-                    if r.__name__ == definition['name'])
+            raise Exception('Unrecognized rule type %s' % self.rule_type)
 
+    def _construct_rule(self, context_params):
+        """Constructs the atomic rule, evaluating any templated inputs."""
         param_list = []
-        param_defns = get_param_list(rule.description)
-        for (param_name, obj_cls) in param_defns:
-            parsed_param = definition['inputs'][param_name]
-            if (isinstance(parsed_param, basestring) and '{{' in parsed_param):
-                parsed_param = jinja_utils.parse_string(
-                    parsed_param, context_params, autoescape=False)
-            normalized_param = obj_cls.normalize(parsed_param)
-            param_list.append(normalized_param)
-
-        if subject_name == 'answer':
-            subject = answer
-        else:
-            subject = context_params[subject_name]
+        for (obj_cls, value, is_template) in self._inputs:
+            if is_template:
+                value = obj_cls.normalize(jinja_utils.parse_string(
+                    value, context_params, autoescape=False))
+            param_list.append(value)
 
-        constructed_rule = rule(*param_list)
-        constructed_rule.set_fs(fs)
-        return constructed_rule.eval(subject)
+        return self._rule_class(*param_list).set_fs(self._fs)
 
-    elif definition['rule_type'] == AND_RULE_TYPE:
-        for child_dict in definition['children']:
-            if not evaluate_rule(
-                    child_dict, param_specs, answer_type, context_params,
-                    answer):
-                return False
-        return True
+    def evaluate(self, context_params, answer):
+        """Evaluates the compiled rule using context_params.
 
-    elif definition['rule_type'] == OR_RULE_TYPE:
-        for child_dict in definition['children']:
-            if evaluate_rule(
-                    child_dict, param_specs, answer_type, context_params,
-                    answer):
-                return True
-        return False
+        Returns a boolean.
+        """
+        if self.rule_type == DEFAULT_RULE_TYPE:
+            return True
 
-    elif definition['rule_type'] == NOT_RULE_TYPE:
-        return (not evaluate_rule(
-            definition['child'], param_specs, answer_type, context_params,
-            answer))
+        elif self.rule_type == ATOMIC_RULE_TYPE:
+            if self._subject_name == 'answer':
+                subject = answer
+            else:
+                subject = context_params[self._subject_name]
 
-    else:
-        raise Exception('Unrecognized rule type %s' % definition['rule_type'])
+            if self._constructed_rule is not None:
+                return self._constructed_rule.eval(subject)
+            else:
+                return self._construct_rule(context_params).eval(subject)
+
+        elif self.rule_type == AND_RULE_TYPE:
+            for child in self._children:
+                if not child.evaluate(context_params, answer):
+                    return False
+            return True
+
+        elif self.rule_type == OR_RULE_TYPE:
+            for child in self._children:
+                if child.evaluate(context_params, answer):
+                    return True
+            return False
+
+        elif self.rule_type == NOT_RULE_TYPE:
+            return not self._child.evaluate(context_params, answer)
+
+
+def evaluate_rule(definition, param_specs, answer_type, context_params, answer,
+                  fs):
+    """Evaluates a rule definition using context_params. Returns a boolean.
+
+    Callers that evaluate the same definition repeatedly should construct a
+    CompiledRule once and call its evaluate() method instead.
+    """
+    return CompiledRule(definition, param_specs, answer_type, fs).evaluate(
+        context_params, answer)
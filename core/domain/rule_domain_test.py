@@ -71,6 +71,36 @@ class RuleDomainUnitTests(test_utils.GenericTestBase):
             [('x', objects.Number), ('y', objects.UnicodeString)]
         )
 
+    def test_compiled_rule_evaluation(self):
+        compiled_rule = rule_domain.CompiledRule({
+            'rule_type': rule_domain.AND_RULE_TYPE,
+            'children': [{
+                'rule_type': rule_domain.ATOMIC_RULE_TYPE,
+                'name': 'IsGreaterThan',
+                'subject': 'answer',
+                'inputs': {'x': 2},
+            }, {
+                'rule_type': rule_domain.NOT_RULE_TYPE,
+                'child': {
+                    'rule_type': rule_domain.ATOMIC_RULE_TYPE,
+                    'name': 'Equals',
+                    'subject': 'answer',
+                    'inputs': {'x': '{{forbidden}}'},
+                },
+            }],
+        }, {}, 'Real', None)
+
+        self.assertTrue(compiled_rule.evaluate({'forbidden': 4}, 3))
+        self.assertFalse(compiled_rule.evaluate({'forbidden': 3}, 3))
+        self.assertFalse(compiled_rule.evaluate({'forbidden': 4}, 1))
+
+        self.assertTrue(rule_domain.CompiledRule(
+            {'rule_type': rule_domain.DEFAULT_RULE_TYPE}, {}, 'Real', None
+        ).evaluate({}, 'any answer'))
+
+        with self.assertRaisesRegexp(Exception, 'No rule type specified'):
+            rule_domain.CompiledRule({}, {}, 'Real', None)
+
     def test_rule_is_generic(self):
         self.assertTrue(rule_domain.is_generic('Real', 'IsGreaterThan'))
         self.assertFalse(rule_domain.is_generic('UnicodeString', 'Equals'))
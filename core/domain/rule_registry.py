@@ -0,0 +1,88 @@
+# coding: utf-8
+#
+# Copyright 2014 The Oppia Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS-IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Rule registry class."""
+
+import inspect
+import os
+import pkgutil
+
+import feconf
+
+
+class Registry(object):
+    """Registry of all rule classes, indexed by obj_type and rule name."""
+
+    # Dict mapping obj_types to lists of the corresponding rule classes.
+    _rules_by_obj_type = {}
+    # Dict mapping obj_types to dicts that map rule names to rule classes.
+    _rules_by_obj_type_and_name = {}
+
+    @classmethod
+    def refresh(cls):
+        """Repopulate the registry by loading all modules in RULES_DIR.
+
+        A rule class for an obj_type [OBJ_TYPE] is any class that has a direct
+        ancestor named [OBJ_TYPE]Rule.
+        """
+        cls._rules_by_obj_type.clear()
+        cls._rules_by_obj_type_and_name.clear()
+
+        rule_dir = os.path.join(os.getcwd(), feconf.RULES_DIR)
+        for loader, name, _ in pkgutil.iter_modules(path=[rule_dir]):
+            if name.endswith('_test'):
+                continue
+            module = loader.find_module(name).load_module(name)
+            for name, clazz in inspect.getmembers(module, inspect.isclass):
+                for ancestor in clazz.__bases__:
+                    ancestor_name = ancestor.__name__
+                    if (not ancestor_name.endswith('Rule') or
+                            ancestor_name == 'Rule'):
+                        continue
+
+                    obj_type = ancestor_name[:-len('Rule')]
+                    rules_by_name = cls._rules_by_obj_type_and_name.setdefault(
+                        obj_type, {})
+                    if clazz.__name__ in rules_by_name:
+                        raise Exception(
+                            'Duplicate rule name %s for obj_type %s' %
+                            (clazz.__name__, obj_type))
+
+                    rules_by_name[clazz.__name__] = clazz
+                    cls._rules_by_obj_type.setdefault(
+                        obj_type, []).append(clazz)
+
+    @classmethod
+    def _refresh_if_empty(cls):
+        if not cls._rules_by_obj_type:
+            cls.refresh()
+
+    @classmethod
+    def get_rules_for_obj_type(cls, obj_type):
+        """Gets a list of all rule classes for the given obj_type."""
+        cls._refresh_if_empty()
+        return list(cls._rules_by_obj_type.get(obj_type, []))
+
+    @classmethod
+    def get_rule_class(cls, obj_type, rule_name):
+        """Gets a rule class by its obj_type and name.
+
+        Refreshes once if the rule is not found; subsequently, throws a
+        KeyError."""
+        cls._refresh_if_empty()
+        if rule_name not in cls._rules_by_obj_type_and_name.get(obj_type, {}):
+            cls.refresh()
+        return cls._rules_by_obj_type_and_name.get(obj_type, {})[rule_name]
@@ -0,0 +1,51 @@
+# coding: utf-8
+#
+# Copyright 2014 The Oppia Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS-IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for methods in the rule registry."""
+
+from core.domain import rule_registry
+import test_utils
+
+
+class RuleRegistryTests(test_utils.GenericTestBase):
+    """Tests for the rule registry."""
+
+    def test_get_rule_class(self):
+        rule_class = rule_registry.Registry.get_rule_class(
+            'Real', 'IsGreaterThan')
+        self.assertEqual(rule_class.__name__, 'IsGreaterThan')
+        self.assertIn(
+            rule_class,
+            rule_registry.Registry.get_rules_for_obj_type('Real'))
+
+        with self.assertRaises(KeyError):
+            rule_registry.Registry.get_rule_class('Real', 'FakeRuleName')
+        with self.assertRaises(KeyError):
+            rule_registry.Registry.get_rule_class('FakeObjType', 'Equals')
+
+    def test_refresh(self):
+        rule_class = rule_registry.Registry.get_rule_class('Real', 'Equals')
+        # Without an explicit refresh, the same class object is returned.
+        self.assertIs(
+            rule_registry.Registry.get_rule_class('Real', 'Equals'),
+            rule_class)
+
+        rule_registry.Registry.refresh()
+        self.assertEqual(
+            rule_registry.Registry.get_rule_class('Real', 'Equals').__name__,
+            'Equals')
+        self.assertEqual(
+            len(rule_registry.Registry.get_rules_for_obj_type('Real')), 7)
@@ -23,7 +23,13 @@ import operator
 import re
 
 from core.platform import models
+memcache_services = models.Registry.import_memcache_services()
 (stats_models,) = models.Registry.import_models([models.NAMES.statistics])
+import feconf
+
+# The maximum number of answers to fetch for each state rule, in decreasing
+# order of frequency.
+MAX_ANSWERS_PER_RULE_LOG = 100
 
 
 class StateCounter(object):
@@ -50,17 +56,50 @@ class StateCounter(object):
         return (self.first_entry_count + self.subsequent_entries_count
                 - self.resolved_answer_count - self.active_answer_count)
 
+    @classmethod
+    def _get_memcache_key(cls, exploration_id, state_name):
+        return 'state-counter:%s:%s' % (exploration_id, state_name)
+
     @classmethod
     def get(cls, exploration_id, state_name):
-        state_counter_model = stats_models.StateCounterModel.get_or_create(
-            exploration_id, state_name)
+        """Returns the counts for a state.
+
+        The counts are summed over the shards of the state counter, and the
+        result is cached in memcache until the counts next change. A sum that
+        was computed just before the counts changed may be put in memcache
+        after the cached counts are deleted, so the cached sum also expires
+        after a while.
+        """
+        memcache_key = cls._get_memcache_key(exploration_id, state_name)
+        counts = memcache_services.get_multi([memcache_key]).get(memcache_key)
+        if counts is None:
+            counts = stats_models.StateCounterModel.get_counts(
+                exploration_id, state_name)
+            memcache_services.add_multi(
+                {memcache_key: counts},
+                time=feconf.STATE_COUNTER_CACHE_TTL_SECS)
+
         return cls(
-            state_counter_model.first_entry_count,
-            state_counter_model.subsequent_entries_count,
-            state_counter_model.resolved_answer_count,
-            state_counter_model.active_answer_count
+            counts['first_entry_count'],
+            counts['subsequent_entries_count'],
+            counts['resolved_answer_count'],
+            counts['active_answer_count']
         )
 
+    @classmethod
+    def delete_cached_counts(cls, state_keys):
+        """Removes cached counts for the given states from memcache.
+
+        This should be called whenever the counts for these states change.
+
+        Args:
+            state_keys: a list of (exploration_id, state_name) tuples.
+        """
+        if state_keys:
+            memcache_services.delete_multi([
+                cls._get_memcache_key(exploration_id, state_name)
+                for (exploration_id, state_name) in state_keys])
+
 
 class StateRuleAnswerLog(object):
     """Domain object that stores answers which match different state rules.
@@ -68,21 +107,16 @@ class StateRuleAnswerLog(object):
     All methods and properties in this file should be independent of the
     specific storage model used.
     """
-    def __init__(self, answers):
-        # This dict represents a log of answers that hit this rule and that
-        # have not been resolved. The keys of this dict are the answers encoded
-        # as HTML strings, and the values are integer counts representing how
-        # many times the answer has been entered.
+    def __init__(self, answers, total_answer_count):
+        # This dict represents the most frequent answers that hit this rule and
+        # that have not been resolved. It contains at most
+        # MAX_ANSWERS_PER_RULE_LOG answers. The keys of this dict are the
+        # answers encoded as HTML strings, and the values are integer counts
+        # representing how many times the answer has been entered.
         self.answers = copy.deepcopy(answers)
-
-    @property
-    def total_answer_count(self):
-        """Total count of answers for this rule that have not been resolved."""
-        # TODO(sll): Cache this computed property.
-        total_count = 0
-        for answer, count in self.answers.iteritems():
-            total_count += count
-        return total_count
+        # Total count of answers for this rule that have not been resolved,
+        # including answers that are not in self.answers.
+        self.total_answer_count = total_answer_count
 
     @classmethod
     def get_multi(cls, exploration_id, rule_data):
@@ -94,11 +128,10 @@ class StateRuleAnswerLog(object):
                 (state_name, handler_name, rule_str).
         """
         # TODO(sll): Should each rule_str be unicode instead?
-        answer_log_models = (
-            stats_models.StateRuleAnswerLogModel.get_or_create_multi(
-                exploration_id, rule_data))
-        return [cls(answer_log_model.answers)
-                for answer_log_model in answer_log_models]
+        answer_log_summaries = stats_models.get_answer_log_summaries(
+            exploration_id, rule_data, MAX_ANSWERS_PER_RULE_LOG)
+        return [cls(answers, total_answer_count)
+                for (answers, total_answer_count) in answer_log_summaries]
 
     @classmethod
     def get(cls, exploration_id, state_name, handler_name, rule_str):
@@ -22,6 +22,8 @@ from core.domain import exp_domain
 from core.domain import exp_services
 from core.domain import stats_domain
 from core.domain import stats_services
+from core.platform import models
+(stats_models,) = models.Registry.import_models([models.NAMES.statistics])
 
 
 class StateCounterUnitTests(test_utils.GenericTestBase):
@@ -73,6 +75,23 @@ class StateCounterUnitTests(test_utils.GenericTestBase):
         self.assertEquals(state2_counter.active_answer_count, 0)
         self.assertEquals(state2_counter.no_answer_count, 2)
 
+    def test_counts_are_summed_over_shards(self):
+        # A counter stored before sharding was introduced.
+        stats_models.StateCounterModel(
+            id='eid.sname', first_entry_count=5).put()
+        self.assertEquals(
+            stats_domain.StateCounter.get('eid', 'sname').first_entry_count,
+            5)
+
+        for _ in range(50):
+            stats_services.EventHandler.record_state_hit('eid', 'sname', True)
+
+        self.assertGreater(
+            stats_models.StateCounterModel.query().count(), 1)
+        self.assertEquals(
+            stats_domain.StateCounter.get('eid', 'sname').first_entry_count,
+            55)
+
 
 class StateRuleAnswerLogUnitTests(test_utils.GenericTestBase):
     """Test the state rule answer log domain object."""
@@ -211,6 +230,34 @@ class StateRuleAnswerLogUnitTests(test_utils.GenericTestBase):
         self.assertEquals(answer_log.answers, {'answer2': 1})
         self.assertEquals(answer_log.total_answer_count, 1)
 
+    def test_legacy_answers_are_merged_and_resolved(self):
+        # An answer log stored before answers were stored individually.
+        answer_log_id = stats_models.StateRuleAnswerLogModel.get_entity_id(
+            'eid', 'sname', self.SUBMIT_HANDLER, self.DEFAULT_RULESPEC_STR)
+        stats_models.StateRuleAnswerLogModel(
+            id=answer_log_id, answers={'answer1': 2, 'answer2': 4}).put()
+
+        stats_services.EventHandler.record_answer_submitted(
+            'eid', 1, 'sname', self.SUBMIT_HANDLER,
+            self.DEFAULT_RULESPEC, 'answer3')
+
+        answer_log = stats_domain.StateRuleAnswerLog.get(
+            'eid', 'sname', self.SUBMIT_HANDLER, self.DEFAULT_RULESPEC_STR)
+        self.assertEquals(
+            answer_log.answers, {'answer1': 2, 'answer2': 4, 'answer3': 1})
+        self.assertEquals(answer_log.total_answer_count, 7)
+
+        stats_services.EventHandler.resolve_answers_for_default_rule(
+            'eid', 'sname', self.SUBMIT_HANDLER, ['answer2', 'answer3'])
+
+        answer_log = stats_domain.StateRuleAnswerLog.get(
+            'eid', 'sname', self.SUBMIT_HANDLER, self.DEFAULT_RULESPEC_STR)
+        self.assertEquals(answer_log.answers, {'answer1': 2})
+        self.assertEquals(answer_log.total_answer_count, 2)
+        self.assertEquals(
+            stats_domain.StateCounter.get(
+                'eid', 'sname').resolved_answer_count, 5)
+
 
 class FeedbackItemUnitTests(test_utils.GenericTestBase):
     """Test feedback item access."""
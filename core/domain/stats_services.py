@@ -18,12 +18,15 @@
 
 __author__ = 'Sean Lip'
 
+import logging
+
 import feconf
 from core.domain import exp_domain
 from core.domain import exp_services
 from core.domain import stats_domain
 from core.platform import models
 (stats_models,) = models.Registry.import_models([models.NAMES.statistics])
+taskqueue_services = models.Registry.import_taskqueue_services()
 
 
 IMPROVE_TYPE_DEFAULT = 'default'
@@ -34,24 +37,116 @@ STATUS_FIXED = 'fixed'
 STATUS_WILL_NOT_FIX = 'will_not_fix'
 
 
+def _apply_update_batch(update_batch, state_keys):
+    """Retries a batch of statistics updates that could not be applied when
+    its events were recorded. This needs to be a module-level function so that
+    it can be deferred to the task queue.
+
+    The batch is applied in a single transaction, so if this raises, none of
+    it has been applied, and the task queue can safely run it again.
+
+    Args:
+        update_batch: a batch of updates returned by
+            stats_models.apply_stats_deltas().
+        state_keys: the (exploration_id, state_name) tuples of the states
+            whose cached counts may be changed by the batch.
+    """
+    stats_models.apply_update_batch(update_batch)
+    stats_domain.StateCounter.delete_cached_counts(state_keys)
+
+
+class EventBatch(object):
+    """Buffers reader events so that they can be recorded together.
+
+    The counts for the events are aggregated per storage entity, so flushing
+    the batch takes a single batched read and write, regardless of the number
+    of events in it.
+    """
+
+    def __init__(self):
+        # Maps (exploration_id, state_name) to a dict of counter deltas.
+        self._state_counter_deltas = {}
+        # Maps (exploration_id, state_name, handler_name, rule_str) to a dict
+        # of answer counts.
+        self._answer_log_deltas = {}
+
+    def _inc_state_counter(self, exploration_id, state_name, prop_name):
+        counter_deltas = self._state_counter_deltas.setdefault(
+            (exploration_id, state_name), {})
+        counter_deltas[prop_name] = counter_deltas.get(prop_name, 0) + 1
+
+    def record_state_hit(self, exploration_id, state_name, first_time):
+        """Record an event when a state is encountered by the reader."""
+        self._inc_state_counter(
+            exploration_id, state_name,
+            'first_entry_count' if first_time else 'subsequent_entries_count')
+
+    def record_answer_submitted(
+            self, exploration_id, exploration_version, state_name,
+            handler_name, rule, answer):
+        """Records an event when an answer triggers a rule."""
+        # TODO(sll): Escape these args?
+        answer_counts = self._answer_log_deltas.setdefault(
+            (exploration_id, state_name, handler_name, str(rule)), {})
+        answer_counts[answer] = answer_counts.get(answer, 0) + 1
+        self._inc_state_counter(
+            exploration_id, state_name, 'active_answer_count')
+
+    def flush(self):
+        """Records all buffered events, and empties the batch.
+
+        The counts are written in several batches. If some of these batches
+        cannot be written now (for example, because of datastore contention),
+        each of them is retried later by its own task queue task, so that the
+        batches which were written are not counted again. This means that
+        request handlers can flush events after preparing their response.
+        """
+        state_counter_deltas = self._state_counter_deltas
+        answer_log_deltas = self._answer_log_deltas
+        self._state_counter_deltas = {}
+        self._answer_log_deltas = {}
+
+        if not state_counter_deltas and not answer_log_deltas:
+            return
+
+        failed_batches = stats_models.apply_stats_deltas(
+            state_counter_deltas, answer_log_deltas)
+        state_keys = state_counter_deltas.keys()
+        stats_domain.StateCounter.delete_cached_counts(state_keys)
+
+        if failed_batches:
+            logging.error(
+                'Could not record %s batches of statistics events; deferring '
+                'them.' % len(failed_batches))
+        for update_batch in failed_batches:
+            taskqueue_services.defer(
+                _apply_update_batch, update_batch, state_keys)
+
+
 class EventHandler(object):
-    """Records events."""
+    """Records events.
+
+    Each event is recorded immediately. To record several events at once, use
+    an EventBatch instead.
+    """
 
     @classmethod
     def record_state_hit(cls, exploration_id, state_name, first_time):
         """Record an event when a state is encountered by the reader."""
-        stats_models.StateCounterModel.inc(
-            exploration_id, state_name, first_time)
+        event_batch = EventBatch()
+        event_batch.record_state_hit(exploration_id, state_name, first_time)
+        event_batch.flush()
 
     @classmethod
     def record_answer_submitted(
             cls, exploration_id, exploration_version, state_name,
             handler_name, rule, answer):
         """Records an event when an answer triggers a rule."""
-        # TODO(sll): Escape these args?
-        stats_models.process_submitted_answer(
-            exploration_id, exploration_version, state_name,
-            handler_name, rule, answer)
+        event_batch = EventBatch()
+        event_batch.record_answer_submitted(
+            exploration_id, exploration_version, state_name, handler_name,
+            rule, answer)
+        event_batch.flush()
 
     @classmethod
     def resolve_answers_for_default_rule(
@@ -61,6 +156,8 @@ class EventHandler(object):
         stats_models.resolve_answers(
             exploration_id, state_name, handler_name,
             exp_domain.DEFAULT_RULESPEC_STR, answers)
+        stats_domain.StateCounter.delete_cached_counts(
+            [(exploration_id, state_name)])
 
     @classmethod
     def record_state_feedback_from_reader(
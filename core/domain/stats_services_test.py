@@ -21,6 +21,8 @@ from core.domain import exp_services
 from core.domain import rule_domain
 from core.domain import stats_domain
 from core.domain import stats_services
+from core.platform import models
+(stats_models,) = models.Registry.import_models([models.NAMES.statistics])
 
 import feconf
 import test_utils
@@ -113,6 +115,134 @@ class EventHandlerUnitTests(test_utils.GenericTestBase):
             'eid', 'sname', self.SUBMIT_HANDLER, self.DEFAULT_RULESPEC_STR)
         self.assertEquals(answer_log.answers, {'answer': 2})
 
+    def test_record_event_batch(self):
+        event_batch = stats_services.EventBatch()
+        event_batch.record_state_hit('eid', 'sname', True)
+        event_batch.record_state_hit('eid', 'sname', False)
+        event_batch.record_state_hit('eid', 'sname2', True)
+        event_batch.record_answer_submitted(
+            'eid', 1, 'sname', self.SUBMIT_HANDLER, self.DEFAULT_RULESPEC,
+            'answer')
+        event_batch.record_answer_submitted(
+            'eid', 1, 'sname', self.SUBMIT_HANDLER, self.DEFAULT_RULESPEC,
+            'answer')
+
+        # Nothing is recorded until the batch is flushed.
+        counter = stats_domain.StateCounter.get('eid', 'sname')
+        self.assertEquals(counter.total_entry_count, 0)
+
+        event_batch.flush()
+
+        counter = stats_domain.StateCounter.get('eid', 'sname')
+        self.assertEquals(counter.first_entry_count, 1)
+        self.assertEquals(counter.subsequent_entries_count, 1)
+        self.assertEquals(counter.active_answer_count, 2)
+        counter = stats_domain.StateCounter.get('eid', 'sname2')
+        self.assertEquals(counter.first_entry_count, 1)
+        self.assertEquals(counter.active_answer_count, 0)
+
+        answer_log = stats_domain.StateRuleAnswerLog.get(
+            'eid', 'sname', self.SUBMIT_HANDLER, self.DEFAULT_RULESPEC_STR)
+        self.assertEquals(answer_log.answers, {'answer': 2})
+
+        # Flushing the batch empties it.
+        event_batch.flush()
+        counter = stats_domain.StateCounter.get('eid', 'sname')
+        self.assertEquals(counter.total_entry_count, 2)
+
+    def test_answer_counts_are_deferred_if_they_fail(self):
+        def _fail_to_put(unused_self):
+            raise Exception('Too much contention on these datastore entities.')
+
+        original_pre_put_hook = stats_models.StateRuleAnswerModel._pre_put_hook
+        stats_models.StateRuleAnswerModel._pre_put_hook = _fail_to_put
+        try:
+            stats_services.EventHandler.record_answer_submitted(
+                'eid', 1, 'sname', self.SUBMIT_HANDLER,
+                self.DEFAULT_RULESPEC, 'answer')
+        finally:
+            stats_models.StateRuleAnswerModel._pre_put_hook = (
+                original_pre_put_hook)
+
+        # The counters are recorded, but the answer count is not.
+        counter = stats_domain.StateCounter.get('eid', 'sname')
+        self.assertEquals(counter.active_answer_count, 1)
+        answer_log = stats_domain.StateRuleAnswerLog.get(
+            'eid', 'sname', self.SUBMIT_HANDLER, self.DEFAULT_RULESPEC_STR)
+        self.assertEquals(answer_log.answers, {})
+        self.assertEquals(answer_log.total_answer_count, 1)
+
+        # The answer count is recorded by a deferred task, without counting
+        # the other events again.
+        self.assertEquals(self.process_deferred_tasks(), 1)
+        counter = stats_domain.StateCounter.get('eid', 'sname')
+        self.assertEquals(counter.active_answer_count, 1)
+        answer_log = stats_domain.StateRuleAnswerLog.get(
+            'eid', 'sname', self.SUBMIT_HANDLER, self.DEFAULT_RULESPEC_STR)
+        self.assertEquals(answer_log.answers, {'answer': 1})
+        self.assertEquals(answer_log.total_answer_count, 1)
+
+    def test_failed_event_batches_can_be_deferred(self):
+        def _fail_to_put(unused_self):
+            raise Exception('Too much contention on these datastore entities.')
+
+        event_batch = stats_services.EventBatch()
+        event_batch.record_state_hit('eid', 'sname', True)
+
+        original_pre_put_hook = stats_models.StateCounterModel._pre_put_hook
+        stats_models.StateCounterModel._pre_put_hook = _fail_to_put
+        try:
+            event_batch.flush()
+        finally:
+            stats_models.StateCounterModel._pre_put_hook = (
+                original_pre_put_hook)
+
+        self.assertEquals(
+            stats_domain.StateCounter.get('eid', 'sname').first_entry_count, 0)
+
+        self.assertEquals(self.process_deferred_tasks(), 1)
+        self.assertEquals(
+            stats_domain.StateCounter.get('eid', 'sname').first_entry_count, 1)
+
+    def test_only_failed_update_batches_are_deferred(self):
+        # There are more states than fit into a single update batch.
+        state_names = [
+            'sname%s' % ind for ind in range(
+                stats_models.MAX_ENTITIES_PER_TRANSACTION + 5)]
+        event_batch = stats_services.EventBatch()
+        for state_name in state_names:
+            event_batch.record_state_hit('eid', state_name, True)
+
+        original_run_in_transaction = (
+            stats_models.transaction_services.run_in_transaction)
+        transaction_calls = []
+
+        def _fail_second_transaction(fn, *args, **kwargs):
+            transaction_calls.append(fn)
+            if len(transaction_calls) == 2:
+                raise Exception('Too much contention on these entities.')
+            return original_run_in_transaction(fn, *args, **kwargs)
+
+        stats_models.transaction_services.run_in_transaction = (
+            _fail_second_transaction)
+        try:
+            event_batch.flush()
+        finally:
+            stats_models.transaction_services.run_in_transaction = (
+                original_run_in_transaction)
+
+        self.assertEquals(len(transaction_calls), 2)
+        self.assertLess(sum([
+            stats_domain.StateCounter.get('eid', state_name).first_entry_count
+            for state_name in state_names]), len(state_names))
+
+        # Only the batch that failed is retried, so each event is counted
+        # exactly once.
+        self.assertEquals(self.process_deferred_tasks(), 1)
+        for state_name in state_names:
+            self.assertEquals(stats_domain.StateCounter.get(
+                'eid', state_name).first_entry_count, 1)
+
     def test_resolve_answers_for_default_rule(self):
         stats_services.EventHandler.record_state_hit('eid', 'sname', True)
 
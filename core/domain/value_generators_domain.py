@@ -67,6 +67,16 @@ class BaseValueGenerator(object):
         """
         raise NotImplementedError
 
+    def generates_constant_value(self, **kwargs):
+        """Whether generate_value() is a fixed function of the given args.
+
+        Returns True only if generate_value(), called with these customization
+        args, always produces the same value regardless of the context params,
+        so that the value can be computed once and reused. Generators that
+        use randomness or the context params should return False.
+        """
+        return False
+
 
 class Registry(object):
     """Registry of all value generators."""
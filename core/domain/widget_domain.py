@@ -28,8 +28,15 @@ import feconf
 import jinja_utils
 import utils
 
+import jinja2
 import json
 
+# An in-process cache of the precomputed parts of interactive widget tags. Each
+# key is a (widget_id, cache_key) tuple, where cache_key is supplied by the
+# caller of BaseWidget.get_interactive_widget_tag(); each value is a 2-tuple
+# containing the customization args and the corresponding tag segments.
+_WIDGET_TAG_SEGMENTS_CACHE = utils.LRUCache(feconf.MAX_WIDGET_TAGS_IN_CACHE)
+
 
 class AnswerHandler(object):
     """Value object for an answer event stream (e.g. submit, click, drag)."""
@@ -133,6 +140,87 @@ class BaseWidget(object):
             (self.name, handler_name))
         return answer
 
+    # A dict containing the contents of this widget's templates and JS code,
+    # and a dict mapping the paths of the underlying files to their
+    # modification times when they were loaded. These are populated by
+    # load_file_contents().
+    _file_contents = None
+    _file_mtimes = None
+
+    def _get_dir(self):
+        return os.path.join(feconf.WIDGETS_DIR, self.type, self.id)
+
+    def _get_file_mtimes(self):
+        """Returns a dict mapping this widget's file paths to their mtimes.
+
+        The value for a file that does not exist is None.
+        """
+        filenames = ['%s.js' % self.id, '%s.html' % self.id]
+        if self.is_interactive:
+            filenames += ['response.html', 'stats_response.html']
+
+        result = {}
+        for filename in filenames:
+            filepath = os.path.join(self._get_dir(), filename)
+            result[filepath] = (
+                os.path.getmtime(filepath) if os.path.exists(filepath)
+                else None)
+        return result
+
+    def load_file_contents(self):
+        """Reads this widget's templates and JS code into memory.
+
+        This is called when the widget registry is refreshed, so that the
+        files do not need to be read from disk while serving requests.
+        """
+        self._file_mtimes = self._get_file_mtimes()
+
+        js_directives = utils.get_file_contents(os.path.join(
+            self._get_dir(), '%s.js' % self.id))
+
+        html_template = utils.get_file_contents(os.path.join(
+            self._get_dir(), '%s.html' % self.id))
+        if '<script>' in html_template or '</script>' in html_template:
+            raise Exception(
+                'Unexpected script tag in HTML template for widget ' % self.id)
+
+        widget_type = (
+            'interactiveWidget' if self.is_interactive
+            else 'noninteractiveWidget')
+        js_template = ("""
+            <script type="text/ng-template" id="%s/%s">
+              %s
+            </script>""" % (widget_type, self.id, html_template))
+
+        file_contents = {
+            'js_code': '<script>%s</script>\n%s' % (
+                js_directives, js_template),
+        }
+
+        if self.is_interactive:
+            file_contents['response_template'] = utils.get_file_contents(
+                os.path.join(self._get_dir(), 'response.html'))
+            try:
+                file_contents['stats_log_template'] = (
+                    utils.get_file_contents(os.path.join(
+                        self._get_dir(), 'stats_response.html')))
+            except IOError:
+                file_contents['stats_log_template'] = '{{answer}}'
+
+        self._file_contents = file_contents
+
+    def _get_file_contents(self, key):
+        """Returns the in-memory contents corresponding to the given key.
+
+        In development mode, the files are reloaded if they have changed on
+        disk since they were last loaded.
+        """
+        if self._file_contents is None or (
+                feconf.DEV_MODE and
+                self._get_file_mtimes() != self._file_mtimes):
+            self.load_file_contents()
+        return self._file_contents[key]
+
     @property
     def _response_template(self):
         """The template that generates the html to display reader responses."""
@@ -140,9 +228,7 @@ class BaseWidget(object):
             raise Exception(
                 'This method should only be called for interactive widgets.')
 
-        return utils.get_file_contents(os.path.join(
-            feconf.WIDGETS_DIR, feconf.INTERACTIVE_PREFIX,
-            self.id, 'response.html'))
+        return self._get_file_contents('response_template')
 
     @property
     def _stats_log_template(self):
@@ -151,34 +237,45 @@ class BaseWidget(object):
             raise Exception(
                 'This method should only be called for interactive widgets.')
 
-        try:
-            return utils.get_file_contents(os.path.join(
-                feconf.WIDGETS_DIR, feconf.INTERACTIVE_PREFIX, self.id,
-                'stats_response.html'))
-        except IOError:
-            return '{{answer}}'
+        return self._get_file_contents('stats_log_template')
 
     @property
     def js_code(self):
         """The JS code containing directives and templates for the widget."""
-        js_directives = utils.get_file_contents(os.path.join(
-            feconf.WIDGETS_DIR, self.type, self.id, '%s.js' % self.id))
+        return self._get_file_contents('js_code')
 
-        html_template = utils.get_file_contents(os.path.join(
-            feconf.WIDGETS_DIR, self.type, self.id, '%s.html' % self.id))
-        if '<script>' in html_template or '</script>' in html_template:
-            raise Exception(
-                'Unexpected script tag in HTML template for widget ' % self.id)
+    def _get_param_customization_args(self, param, state_customization_args):
+        """Returns the customization args to use for a widget parameter."""
+        # Use the given customization args. If they do not exist, use the
+        # default customization args for the parameter.
+        return (
+            state_customization_args[param.name]
+            if param.name in state_customization_args
+            else param.customization_args
+        )
 
-        widget_type = (
-            'interactiveWidget' if self.is_interactive
-            else 'noninteractiveWidget')
-        js_template = ("""
-            <script type="text/ng-template" id="%s/%s">
-              %s
-            </script>""" % (widget_type, self.id, html_template))
+    def _generate_param_value(self, param, state_customization_args,
+                              context_params, preview_mode):
+        """Generates the normalized value of a widget parameter.
+
+        See _get_widget_param_instances() for a description of the args.
+        """
+        value_generator = param.generator(**param.init_args)
+        args_to_use = self._get_param_customization_args(
+            param, state_customization_args)
 
-        return '<script>%s</script>\n%s' % (js_directives, js_template)
+        try:
+            generated_value = value_generator.generate_value(
+                context_params, **args_to_use)
+        except Exception:
+            if preview_mode:
+                generated_value = value_generator.default_value
+            else:
+                raise
+
+        # Normalize the generated values to the correct obj_type.
+        return obj_services.Registry.get_object_class_by_type(
+            param.obj_type).normalize(generated_value)
 
     def _get_widget_param_instances(self, state_customization_args,
                                     context_params, preview_mode=False):
@@ -208,78 +305,100 @@ class BaseWidget(object):
             state_customization_args = {}
 
         parameters = {}
+        for param in self.params:
+            parameters[param.name] = self._generate_param_value(
+                param, state_customization_args, context_params,
+                preview_mode)
+
+        return parameters
+
+    def _get_param_attr_strings(self, param, param_value):
+        """Returns the tag attribute strings for a widget parameter value."""
+        escaped_value = jinja2.utils.escape(json.dumps(param_value))
+
+        prefix = '%s-with-' % utils.camelcase_to_hyphenated(param.name)
+        return [
+            u'%s="%s"' % (
+                jinja2.utils.escape('%s%s' % (
+                    prefix, utils.camelcase_to_hyphenated(arg))),
+                escaped_value)
+            for arg in param.customization_args]
+
+    def _get_interactive_widget_tag_segments(self, state_customization_args):
+        """Splits an interactive widget tag into precomputed and dynamic parts.
+
+        Returns a list with one element per widget parameter. If the value of
+        the parameter does not depend on the context params, the element is
+        the list of its (already rendered) tag attribute strings. Otherwise,
+        the element is the WidgetParamSpec itself, and its attributes must be
+        rendered for each set of context params.
+        """
+        segments = []
         for param in self.params:
             value_generator = param.generator(**param.init_args)
-            # Use the given customization args. If they do not exist, use the
-            # default customization args for the parameter.
-            args_to_use = (
-                state_customization_args[param.name]
-                if param.name in state_customization_args
-                else param.customization_args
-            )
+            args_to_use = self._get_param_customization_args(
+                param, state_customization_args)
 
             try:
-                generated_value = value_generator.generate_value(
-                    context_params, **args_to_use)
+                if value_generator.generates_constant_value(**args_to_use):
+                    segments.append(self._get_param_attr_strings(
+                        param, self._generate_param_value(
+                            param, state_customization_args, None, False)))
+                    continue
             except Exception:
-                if preview_mode:
-                    generated_value = value_generator.default_value
-                else:
-                    raise
+                # Any errors will surface when the tag is rendered.
+                pass
 
-            # Normalize the generated values to the correct obj_type.
-            parameters[param.name] = (
-                obj_services.Registry.get_object_class_by_type(
-                    param.obj_type).normalize(generated_value))
+            segments.append(param)
 
-        return parameters
+        return segments
 
     def get_interactive_widget_tag(self, state_customization_args,
-                                   context_params, preview_mode=False):
-        """Gets the widgetParams attribute value for an interactive widget."""
+                                   context_params, preview_mode=False,
+                                   cache_key=None):
+        """Gets the widgetParams attribute value for an interactive widget.
+
+        If cache_key is given, the parts of the tag that do not depend on the
+        context params are computed once and cached in-process. The cache key
+        should identify where the customization args come from, e.g. a tuple
+        (exploration_id, exploration_version, state_name). A cached entry is
+        only reused if the customization args are unchanged.
+        """
         if state_customization_args is None:
             state_customization_args = {}
 
         tag_name = ('oppia-interactive-%s' %
                     utils.camelcase_to_hyphenated(self.id))
 
-        attr_strings = []
-        for param in self.params:
-            value_generator = param.generator(**param.init_args)
-            # Use the given customization args. If they do not exist, use the
-            # default customization args for the parameter.
-            args_to_use = (
-                state_customization_args[param.name]
-                if param.name in state_customization_args
-                else param.customization_args
-            )
+        segments = None
+        if cache_key is not None:
+            full_cache_key = (self.id, cache_key)
+            cached_entry = _WIDGET_TAG_SEGMENTS_CACHE.get(full_cache_key)
+            if (cached_entry is not None and
+                    cached_entry[0] == state_customization_args):
+                segments = cached_entry[1]
+            else:
+                segments = self._get_interactive_widget_tag_segments(
+                    state_customization_args)
+                _WIDGET_TAG_SEGMENTS_CACHE.set(full_cache_key, (
+                    copy.deepcopy(state_customization_args), segments))
 
-            try:
-                generated_value = value_generator.generate_value(
-                    context_params, **args_to_use)
-            except Exception:
-                if preview_mode:
-                    generated_value = value_generator.default_value
+        attr_strings = []
+        if segments is None:
+            for param in self.params:
+                attr_strings += self._get_param_attr_strings(
+                    param, self._generate_param_value(
+                        param, state_customization_args, context_params,
+                        preview_mode))
+        else:
+            for segment in segments:
+                if isinstance(segment, list):
+                    attr_strings += segment
                 else:
-                    raise
-
-            # Normalize the generated values to the correct obj_type.
-            param_value = (
-                obj_services.Registry.get_object_class_by_type(
-                    param.obj_type).normalize(generated_value))
-
-            prefix = '%s-with-' % utils.camelcase_to_hyphenated(param.name)
-            for arg in param.customization_args:
-                arg_name = '%s%s' % (
-                    prefix, utils.camelcase_to_hyphenated(arg))
-                attr_strings.append(
-                    jinja_utils.parse_string(
-                        '{{arg_name}}="{{arg_value}}"', {
-                            'arg_name': arg_name,
-                            'arg_value': json.dumps(param_value),
-                        }
-                    )
-                )
+                    attr_strings += self._get_param_attr_strings(
+                        segment, self._generate_param_value(
+                            segment, state_customization_args,
+                            context_params, preview_mode))
 
         return '<%s %s></%s>' % (tag_name, ' '.join(attr_strings), tag_name)
 
@@ -317,6 +436,15 @@ class BaseWidget(object):
         return jinja_utils.parse_string(
             self._stats_log_template, parameters, autoescape=False)
 
+    def get_possible_answers(self, handler_name, state_customization_args):
+        """Returns a list of all answers a reader can submit to a handler.
+
+        The answers are given in the form in which the frontend submits them.
+        Widgets whose answers cannot be enumerated (e.g. free-text inputs)
+        return None. Overridden in subclasses.
+        """
+        return None
+
     def get_widget_instance_dict(self, customization_args, context_params,
                                  preview_mode=True):
         """Gets a dict representing a parameterized widget.
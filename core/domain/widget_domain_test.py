@@ -111,6 +111,54 @@ class WidgetUnitTests(test_utils.GenericTestBase):
             }
         }, parameterized_widget_dict['customization_args'])
 
+    def test_cached_interactive_widget_tag(self):
+        """Test that cached widget tags respect params and changed args."""
+        widget = widget_registry.Registry.get_widget_by_id(
+            feconf.INTERACTIVE_PREFIX, 'TextInput')
+        cache_key = ('exp_id', 1, 'state_name')
+
+        customization_args = {
+            'placeholder': {'value': '{{ntg}}', 'parse_with_jinja': True}}
+        for ntg in ['F4', 'G4']:
+            self.assertEqual(
+                widget.get_interactive_widget_tag(
+                    customization_args, {'ntg': ntg}, cache_key=cache_key),
+                widget.get_interactive_widget_tag(
+                    customization_args, {'ntg': ntg}))
+
+        # Changing the customization args invalidates the cached entry.
+        tag = widget.get_interactive_widget_tag(
+            {'placeholder': {'value': 'F4'}, 'rows': {'value': 2}}, {},
+            cache_key=cache_key)
+        self.assertEqual(
+            '<oppia-interactive-text-input '
+            'placeholder-with-value="&#34;F4&#34;" rows-with-value="2" '
+            'columns-with-value="60"></oppia-interactive-text-input>', tag)
+
+    def test_widget_files_are_loaded_on_refresh(self):
+        """Test that widget templates and JS are held in memory."""
+        widget_registry.Registry.refresh()
+        widget = widget_registry.Registry.get_widget_by_id(
+            feconf.INTERACTIVE_PREFIX, 'TextInput')
+        js_directives = utils.get_file_contents(os.path.join(
+            feconf.INTERACTIVE_WIDGETS_DIR, 'TextInput', 'TextInput.js'))
+
+        def _fail_to_read_file(filepath, raw_bytes=False):
+            raise Exception('Unexpected read of %s.' % filepath)
+
+        # Serving the widget does not read any of its files from disk.
+        original_get_file_contents = utils.get_file_contents
+        utils.get_file_contents = _fail_to_read_file
+        try:
+            self.assertIn(js_directives, widget.js_code)
+            self.assertIn(
+                'oppia-reader-response',
+                widget.get_reader_response_html({}, {}, 'abc', False))
+            # TextInput has no stats_response.html file.
+            self.assertEqual(widget.get_stats_log_html({}, {}, 'abc'), 'abc')
+        finally:
+            utils.get_file_contents = original_get_file_contents
+
 
 class WidgetDataUnitTests(test_utils.GenericTestBase):
     """Tests that all the default widgets are valid."""
@@ -65,7 +65,9 @@ class Registry(object):
             ancestor_names = [
                 base_class.__name__ for base_class in clazz.__bases__]
             if 'BaseWidget' in ancestor_names:
-                registry_dict[clazz.__name__] = clazz()
+                widget = clazz()
+                widget.load_file_contents()
+                registry_dict[clazz.__name__] = widget
 
     @classmethod
     def refresh(cls):
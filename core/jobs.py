@@ -18,9 +18,12 @@
 
 __author__ = 'Sean Lip'
 
+import logging
+import time
 
 from core.platform import models
 (job_models,) = models.Registry.import_models([models.NAMES.job])
+taskqueue_services = models.Registry.import_taskqueue_services()
 transaction_services = models.Registry.import_transaction_services()
 
 
@@ -135,3 +138,88 @@ class BaseJob(object):
     def is_active(self):
         self._reload_from_datastore()
         return self.status_code in [STATUS_CODE_QUEUED, STATUS_CODE_STARTED]
+
+
+def _run_job_batch(job_class, urlsafe_cursor, num_ids, num_processed,
+                   start_time):
+    """Deferred task entry point for BaseBatchJob. This needs to be a
+    module-level function so that it can be pickled.
+    """
+    job_class().run_batch(urlsafe_cursor, num_ids, num_processed, start_time)
+
+
+class BaseBatchJob(BaseJob):
+    """A job that processes a list of entity ids one page at a time. Each page
+    is processed in its own task queue task, so that no single request has to
+    iterate over the whole datastore.
+
+    Subclasses should implement _get_page_of_ids(), _process_ids() and
+    _get_output().
+    """
+    # The number of ids processed by each task.
+    BATCH_SIZE = 100
+
+    def _get_page_of_ids(self, page_size, urlsafe_cursor):
+        """Returns a triple (ids, urlsafe_cursor, more) for the next page of
+        ids to process.
+        """
+        raise NotImplementedError
+
+    def _process_ids(self, ids):
+        """Processes a page of ids, and returns the number of items that were
+        updated.
+        """
+        raise NotImplementedError
+
+    def _get_output(self, num_ids, num_processed):
+        """Returns the output of a completed job, given the total number of
+        ids seen and the total number of items updated.
+        """
+        raise NotImplementedError
+
+    def _on_completed(self):
+        """Called after the last page of ids has been processed."""
+        pass
+
+    def start(self):
+        """Queues the job and adds a task for processing its first page."""
+        self.mark_queued()
+        taskqueue_services.defer(
+            _run_job_batch, self.__class__, None, 0, 0, time.time())
+
+    def run_batch(self, urlsafe_cursor, num_ids, num_processed, start_time):
+        """Processes a single page of ids, then either adds a task for the
+        next page or marks the job as completed.
+
+        Errors mark the job as failed and are not re-raised, since the task
+        queue would otherwise retry the task indefinitely.
+        """
+        if self.status_code == STATUS_CODE_QUEUED:
+            self.mark_started()
+        elif self.status_code != STATUS_CODE_STARTED:
+            logging.error(
+                'Skipping batch for job %s with status %s.' %
+                (self._job_id, self.status_code))
+            return
+
+        try:
+            ids, urlsafe_cursor, more = self._get_page_of_ids(
+                self.BATCH_SIZE, urlsafe_cursor)
+            num_processed += self._process_ids(ids)
+            num_ids += len(ids)
+
+            if more and urlsafe_cursor:
+                taskqueue_services.defer(
+                    _run_job_batch, self.__class__, urlsafe_cursor, num_ids,
+                    num_processed, start_time)
+                return
+
+            self._on_completed()
+        except Exception as e:
+            logging.error('Job %s failed: %s' % (self._job_id, e))
+            self.mark_failed(int(time.time() - start_time), unicode(e))
+            return
+
+        self.mark_completed(
+            int(time.time() - start_time),
+            self._get_output(num_ids, num_processed))
@@ -0,0 +1,35 @@
+# coding: utf-8
+#
+# Copyright 2014 The Oppia Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS-IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Registry of the long running jobs that can be started by an admin."""
+
+from core.domain import exp_jobs
+
+
+# The job classes that can be started from the admin page. Each of these must
+# be a subclass of jobs.BaseBatchJob.
+BATCH_JOB_CLASSES = [
+    exp_jobs.ExplorationSnapshotAutoSummaryBackfillJob,
+    exp_jobs.ExplorationSummaryBackfillJob,
+]
+
+
+def get_batch_job_class_by_name(job_class_name):
+    """Returns the registered job class with the given name, or None."""
+    for job_class in BATCH_JOB_CLASSES:
+        if job_class.__name__ == job_class_name:
+            return job_class
+    return None
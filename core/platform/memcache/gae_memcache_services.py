@@ -44,7 +44,7 @@ def get_multi(keys):
     return result
 
 
-def set_multi(key_value_mapping):
+def set_multi(key_value_mapping, time=0):
     """Sets multiple keys' values at once.
 
     Args:
@@ -52,12 +52,14 @@ def set_multi(key_value_mapping):
           and the value is anything that is serializable using the Python
           pickle module. The combined size of each key and value must be
           < 1 MB. The total size of key_value_mapping should be at most 32 MB.
+      - time: the number of seconds after which the values expire, or 0 if
+          they should not expire.
 
     Returns:
       A list of the keys whose values were NOT set.
     """
     assert isinstance(key_value_mapping, dict)
-    unset_keys = memcache.set_multi(key_value_mapping)
+    unset_keys = memcache.set_multi(key_value_mapping, time=time)
 
     if unset_keys:
         counters.MEMCACHE_SET_FAILURE.inc()
@@ -67,18 +69,44 @@ def set_multi(key_value_mapping):
     return unset_keys
 
 
-def delete(key):
+def add_multi(key_value_mapping, time=0):
+    """Sets multiple keys' values, but only for keys that are not already
+    in memcache, and that are not locked by a recent call to delete().
+
+    Args:
+      - key_value_mapping: a dict of {key: value} pairs, as for set_multi().
+      - time: the number of seconds after which the values expire, or 0 if
+          they should not expire.
+
+    Returns:
+      A list of the keys whose values were NOT set.
+    """
+    assert isinstance(key_value_mapping, dict)
+    unset_keys = memcache.add_multi(key_value_mapping, time=time)
+
+    if unset_keys:
+        counters.MEMCACHE_SET_FAILURE.inc()
+    else:
+        counters.MEMCACHE_SET_SUCCESS.inc()
+
+    return unset_keys
+
+
+def delete(key, seconds=0):
     """Deletes a key in memcache.
 
     Args:
       - key: a key (string) to delete.
+      - seconds: the number of seconds for which add_multi() will not set
+          the key again. This prevents a reader that loaded a value before
+          it was changed from putting the stale value back into memcache.
 
     Returns:
       0 on network failure, 1 if the item does not exist, and 2 for a
       successful delete.
     """
     assert isinstance(key, basestring)
-    return_code = memcache.delete(key)
+    return_code = memcache.delete(key, seconds=seconds)
 
     if return_code == 0:
         counters.MEMCACHE_DELETE_FAILURE.inc()
@@ -90,18 +118,20 @@ def delete(key):
     return return_code
 
 
-def delete_multi(keys):
+def delete_multi(keys, seconds=0):
     """Deletes multiple keys in memcache.
 
     Args:
       - keys: the keys (strings) to delete.
+      - seconds: the number of seconds for which add_multi() will not set
+          these keys again, as for delete().
 
     Returns:
       True if all operations complete successfully; False otherwise.
     """
     for key in keys:
         assert isinstance(key, basestring)
-    return_value = memcache.delete_multi(keys)
+    return_value = memcache.delete_multi(keys, seconds=seconds)
 
     if return_value is True:
         counters.MEMCACHE_DELETE_SUCCESS.inc()
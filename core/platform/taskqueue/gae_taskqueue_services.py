@@ -0,0 +1,27 @@
+# coding: utf-8
+#
+# Copyright 2014 The Oppia Authors. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS-IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Provides a seam for task queue services."""
+
+from google.appengine.ext import deferred
+
+
+def defer(fn, *args, **kwargs):
+    """Adds a task to the default queue that calls fn(*args, **kwargs).
+
+    fn must be a module-level function, and the arguments must be picklable.
+    """
+    deferred.defer(fn, *args, **kwargs)
@@ -16,11 +16,14 @@
 
 __author__ = 'Sean Lip'
 
+import copy
+
 import feconf
 import utils
 
 from core.platform import models
 transaction_services = models.Registry.import_transaction_services()
+from google.appengine.datastore import datastore_query
 from google.appengine.ext import ndb
 
 
@@ -105,6 +108,27 @@ class BaseModel(ndb.Model):
             query = query.filter(cls.deleted == False)
         return query
 
+    @classmethod
+    def get_page_of_ids(cls, page_size, urlsafe_start_cursor):
+        """Returns a triple (ids, urlsafe_cursor, more) for a page of the ids
+        of entities of this class that are not marked deleted, in key order.
+
+        See get_all() and fetch_page() at:
+
+            https://developers.google.com/appengine/docs/python/ndb/queryclass
+        """
+        if urlsafe_start_cursor:
+            start_cursor = datastore_query.Cursor(urlsafe=urlsafe_start_cursor)
+        else:
+            start_cursor = None
+
+        keys, cursor, more = cls.get_all().fetch_page(
+            page_size, start_cursor=start_cursor, keys_only=True)
+        return (
+            [key.id() for key in keys],
+            (cursor.urlsafe() if cursor else None),
+            more)
+
     @classmethod
     def get_new_id(cls, entity_name):
         """Gets a new id for an entity, based on its name.
@@ -162,6 +186,13 @@ class VersionedModel(BaseModel):
     SNAPSHOT_CONTENT_CLASS = None
     # Whether reverting is allowed. Default is False.
     ALLOW_REVERT = False
+    # The number of consecutive versions that share a keyframe snapshot. The
+    # snapshot of the first version in each group of versions (the keyframe)
+    # stores the full snapshot dict, and the snapshots of the other versions
+    # store only the differences from it. If this is 1, all snapshots are
+    # stored in full. Only models whose snapshots are dicts may set this to a
+    # value greater than 1.
+    SNAPSHOT_KEYFRAME_INTERVAL = 1
 
     ### IMPORTANT: Subclasses should only overwrite things above this line. ###
 
@@ -206,16 +237,89 @@ class VersionedModel(BaseModel):
     def _reconstitute_from_snapshot_id(self, snapshot_id):
         """Makes this instance into a reconstitution of the given snapshot."""
         snapshot_model = self.SNAPSHOT_CONTENT_CLASS.get(snapshot_id)
-        snapshot_dict = snapshot_model.content
-        return self._reconstitute(snapshot_dict)
+        return self._reconstitute(
+            self._get_snapshot_contents([snapshot_model])[0])
 
     @classmethod
     def _get_snapshot_id(cls, instance_id, version_number):
         return '%s%s%s' % (
             instance_id, cls._VERSION_DELIMITER, version_number)
 
+    @classmethod
+    def _get_keyframe_version(cls, version_number):
+        """Returns the version number of the keyframe for the given version."""
+        return version_number - (
+            (version_number - 1) % cls.SNAPSHOT_KEYFRAME_INTERVAL)
+
+    @classmethod
+    def _get_snapshot_contents(cls, snapshot_models):
+        """Returns the full snapshot contents of the given snapshot models.
+
+        The keyframes of snapshots that are stored as differences from their
+        keyframe are fetched in a single batch.
+        """
+        keyframe_ids = [
+            cls._get_snapshot_id(
+                model.id[:model.id.rfind(cls._VERSION_DELIMITER)],
+                model.keyframe_version)
+            for model in snapshot_models if model.keyframe_version]
+        keyframe_models = dict(zip(keyframe_ids, ndb.get_multi([
+            ndb.Key(cls.SNAPSHOT_CONTENT_CLASS, keyframe_id)
+            for keyframe_id in keyframe_ids])))
+
+        contents = []
+        for model in snapshot_models:
+            if not model.keyframe_version:
+                contents.append(model.content)
+            else:
+                keyframe_id = cls._get_snapshot_id(
+                    model.id[:model.id.rfind(cls._VERSION_DELIMITER)],
+                    model.keyframe_version)
+                contents.append(utils.apply_dict_diff(
+                    copy.deepcopy(keyframe_models[keyframe_id].content),
+                    model.content))
+        return contents
+
+    def _create_snapshot_content_model(self, snapshot_id, snapshot):
+        """Returns a snapshot content model for the current version.
+
+        If the current version is not a keyframe, and its keyframe snapshot is
+        available, the returned model stores only the differences between the
+        snapshot and the keyframe snapshot.
+        """
+        keyframe_version = self._get_keyframe_version(self.version)
+        if keyframe_version != self.version:
+            keyframe_model = self.SNAPSHOT_CONTENT_CLASS.get_by_id(
+                self._get_snapshot_id(self.id, keyframe_version))
+            if (keyframe_model is not None and
+                    not keyframe_model.keyframe_version):
+                return self.SNAPSHOT_CONTENT_CLASS(
+                    id=snapshot_id, keyframe_version=keyframe_version,
+                    content=utils.get_dict_diff(
+                        keyframe_model.content, snapshot))
+
+        return self.SNAPSHOT_CONTENT_CLASS(id=snapshot_id, content=snapshot)
+
+    def _create_snapshot_metadata_model(
+            self, snapshot_id, committer_id, commit_type, commit_message,
+            commit_cmds, **kwargs):
+        """Returns a snapshot metadata model for the current version.
+
+        Any additional keyword arguments are set as properties of the
+        snapshot metadata model.
+        """
+        return self.SNAPSHOT_METADATA_CLASS(
+            id=snapshot_id, committer_id=committer_id, commit_type=commit_type,
+            commit_message=commit_message, commit_cmds=commit_cmds, **kwargs)
+
     def _trusted_commit(
-            self, committer_id, commit_type, commit_message, commit_cmds):
+            self, committer_id, commit_type, commit_message, commit_cmds,
+            **kwargs):
+        """Saves a snapshot of the next version, and the model itself.
+
+        Any additional keyword arguments are set as properties of the
+        snapshot metadata model.
+        """
         if self.SNAPSHOT_METADATA_CLASS is None:
             raise Exception('No snapshot metadata class defined.')
         if self.SNAPSHOT_CONTENT_CLASS is None:
@@ -235,11 +339,11 @@ class VersionedModel(BaseModel):
         snapshot = self._compute_snapshot()
         snapshot_id = self._get_snapshot_id(self.id, self.version)
 
-        snapshot_metadata_instance = self.SNAPSHOT_METADATA_CLASS(
-            id=snapshot_id, committer_id=committer_id, commit_type=commit_type,
-            commit_message=commit_message, commit_cmds=commit_cmds)
-        snapshot_content_instance = self.SNAPSHOT_CONTENT_CLASS(
-            id=snapshot_id, content=snapshot)
+        snapshot_metadata_instance = self._create_snapshot_metadata_model(
+            snapshot_id, committer_id, commit_type, commit_message,
+            commit_cmds, **kwargs)
+        snapshot_content_instance = self._create_snapshot_content_model(
+            snapshot_id, snapshot)
 
         transaction_services.run_in_transaction(
             ndb.put_multi,
@@ -282,11 +386,12 @@ class VersionedModel(BaseModel):
         """For VersionedModels, this method is replaced with commit()."""
         raise NotImplementedError
 
-    def commit(self, committer_id, commit_message, commit_cmds):
+    def commit(self, committer_id, commit_message, commit_cmds, **kwargs):
         """Saves a version snapshot and updates the model.
 
         commit_cmds should give sufficient information to reconstruct the
-        commit.
+        commit. Any additional keyword arguments are set as properties of the
+        snapshot metadata model.
         """
         self._require_not_marked_deleted()
 
@@ -304,9 +409,14 @@ class VersionedModel(BaseModel):
             self._COMMIT_TYPE_EDIT)
 
         self._trusted_commit(
-            committer_id, commit_type, commit_message, commit_cmds)
+            committer_id, commit_type, commit_message, commit_cmds, **kwargs)
 
-    def revert(self, committer_id, commit_message, version_number):
+    def revert(self, committer_id, commit_message, version_number, **kwargs):
+        """Reverts the model to the given version, as a new commit.
+
+        Any additional keyword arguments are set as properties of the
+        snapshot metadata model.
+        """
         self._require_not_marked_deleted()
 
         if not self.ALLOW_REVERT:
@@ -330,7 +440,7 @@ class VersionedModel(BaseModel):
 
         self._trusted_commit(
             committer_id, self._COMMIT_TYPE_REVERT, commit_message,
-            commit_cmds)
+            commit_cmds, **kwargs)
 
     @classmethod
     def get_version(cls, model_instance_id, version_number):
@@ -345,6 +455,54 @@ class VersionedModel(BaseModel):
         return cls(id=model_instance_id)._reconstitute_from_snapshot_id(
             snapshot_id)
 
+    @classmethod
+    def get_multi_versions(cls, model_instance_ids, version_number):
+        """Returns model instances representing the given version of each of
+        the given model instances.
+
+        The instances and their snapshots are fetched in a single batch. None
+        is returned in place of instances that do not exist, that have been
+        marked deleted, or that do not have the given version.
+        """
+        instance_keys = [
+            ndb.Key(cls, model_instance_id)
+            for model_instance_id in model_instance_ids]
+        snapshot_keys = [
+            ndb.Key(cls.SNAPSHOT_CONTENT_CLASS, cls._get_snapshot_id(
+                model_instance_id, version_number))
+            for model_instance_id in model_instance_ids]
+        entities = ndb.get_multi(instance_keys + snapshot_keys)
+        instances = entities[:len(instance_keys)]
+        snapshots = entities[len(instance_keys):]
+
+        found_indexes = [
+            ind for ind in range(len(model_instance_ids))
+            if (instances[ind] is not None and not instances[ind].deleted and
+                snapshots[ind] is not None)]
+        snapshot_contents = dict(zip(
+            found_indexes, cls._get_snapshot_contents(
+                [snapshots[ind] for ind in found_indexes])))
+
+        return [
+            cls(id=model_instance_id)._reconstitute(snapshot_contents[ind])
+            if ind in snapshot_contents else None
+            for (ind, model_instance_id) in enumerate(model_instance_ids)]
+
+    @classmethod
+    def get_models(cls, model_instance_ids, version_number=None):
+        """Returns the model instances with the given ids, fetched in a single
+        batch.
+
+        If version_number is None, the latest version of each instance is
+        returned. None is returned in place of instances that do not exist, or
+        that have been marked deleted.
+        """
+        if version_number is not None:
+            return cls.get_multi_versions(model_instance_ids, version_number)
+        return [
+            model if (model is not None and not model.deleted) else None
+            for model in cls.get_multi(model_instance_ids)]
+
     @classmethod
     def get(cls, entity_id, strict=True, version=None):
         """Gets an entity by id. Fails noisily if strict == True."""
@@ -377,15 +535,23 @@ class VersionedModel(BaseModel):
                     'Invalid version number %s for model %s with id %s'
                     % (version_numbers[ind], cls.__name__, model_instance_id))
 
-        return [{
-            'committer_id': model.committer_id,
-            'commit_message': model.commit_message,
-            'commit_cmds': model.commit_cmds,
-            'commit_type': model.commit_type,
-            'version_number': version_numbers[ind],
-            'created_on': model.created_on.strftime(
+        return [
+            cls._get_snapshot_metadata_dict(model, version_numbers[ind])
+            for (ind, model) in enumerate(returned_models)]
+
+    @classmethod
+    def _get_snapshot_metadata_dict(
+            cls, snapshot_metadata_model, version_number):
+        """Returns a dict representing the given snapshot metadata model."""
+        return {
+            'committer_id': snapshot_metadata_model.committer_id,
+            'commit_message': snapshot_metadata_model.commit_message,
+            'commit_cmds': snapshot_metadata_model.commit_cmds,
+            'commit_type': snapshot_metadata_model.commit_type,
+            'version_number': version_number,
+            'created_on': snapshot_metadata_model.created_on.strftime(
                 feconf.HUMAN_READABLE_DATETIME_FORMAT),
-        } for (ind, model) in enumerate(returned_models)]
+        }
 
 
 class BaseSnapshotMetadataModel(BaseModel):
@@ -412,5 +578,10 @@ class BaseSnapshotContentModel(BaseModel):
     The id of this model is computed using VersionedModel.get_snapshot_id().
     """
 
-    # The snapshot content, as a JSON blob.
+    # The snapshot content, as a JSON blob. If keyframe_version is set, this
+    # is instead a list of differences from the snapshot content of that
+    # version, as returned by utils.get_dict_diff().
     content = ndb.JsonProperty(indexed=False)
+    # The version number of the keyframe snapshot that this snapshot is
+    # stored relative to, or None if this snapshot is stored in full.
+    keyframe_version = ndb.IntegerProperty(indexed=False)
@@ -21,6 +21,9 @@ __author__ = 'Sean Lip'
 import core.storage.base_model.gae_models as base_models
 import core.storage.user.gae_models as user_models
 
+from core.platform import models
+transaction_services = models.Registry.import_transaction_services()
+from google.appengine.api import datastore_errors
 from google.appengine.datastore import datastore_query
 from google.appengine.ext import ndb
 
@@ -34,7 +37,11 @@ EXPLORATION_STATUS_PUBLICIZED = 'publicized'
 
 class ExplorationSnapshotMetadataModel(base_models.BaseSnapshotMetadataModel):
     """Storage model for the metadata for an exploration snapshot."""
-    pass
+
+    # A short, automatically-generated summary of the changes made in this
+    # commit, for display in the exploration history. This is None for
+    # snapshots whose summary has not been computed yet.
+    auto_summary = ndb.TextProperty(indexed=False)
 
 
 class ExplorationSnapshotContentModel(base_models.BaseSnapshotContentModel):
@@ -51,6 +58,7 @@ class ExplorationModel(base_models.VersionedModel):
     SNAPSHOT_METADATA_CLASS = ExplorationSnapshotMetadataModel
     SNAPSHOT_CONTENT_CLASS = ExplorationSnapshotContentModel
     ALLOW_REVERT = True
+    SNAPSHOT_KEYFRAME_INTERVAL = 10
 
     # What this exploration is called.
     title = ndb.StringProperty(required=True)
@@ -83,19 +91,71 @@ class ExplorationModel(base_models.VersionedModel):
         """Returns the total number of explorations."""
         return cls.get_all().count()
 
-    def commit(self, committer_id, commit_message, commit_cmds):
-        """Updates the exploration using the properties dict, then saves it."""
+    def commit(
+            self, committer_id, commit_message, commit_cmds,
+            auto_summary=None):
+        """Updates the exploration using the properties dict, then saves it.
+
+        If auto_summary is given, it is stored with the snapshot metadata for
+        the new version.
+        """
         super(ExplorationModel, self).commit(
-            committer_id, commit_message, commit_cmds)
+            committer_id, commit_message, commit_cmds,
+            auto_summary=auto_summary)
+
+    def revert(self, committer_id, commit_message, version_number):
+        """Reverts the exploration to the given version.
+
+        Reverts are described by their commit message, so an empty
+        auto-generated summary is stored for them.
+        """
+        super(ExplorationModel, self).revert(
+            committer_id, commit_message, version_number, auto_summary='')
+
+    @classmethod
+    def _get_snapshot_metadata_dict(
+            cls, snapshot_metadata_model, version_number):
+        """Adds the auto-generated summary to the snapshot metadata dict.
+
+        Note that this extends the superclass method.
+        """
+        snapshot_metadata_dict = super(
+            ExplorationModel, cls)._get_snapshot_metadata_dict(
+                snapshot_metadata_model, version_number)
+        snapshot_metadata_dict['auto_summary'] = (
+            snapshot_metadata_model.auto_summary)
+        return snapshot_metadata_dict
+
+    @classmethod
+    def save_snapshot_auto_summaries(
+            cls, exploration_id, auto_summaries_by_version):
+        """Stores auto-generated summaries on existing snapshot metadata.
+
+        auto_summaries_by_version is a dict whose keys are version numbers and
+        whose values are the corresponding summaries.
+        """
+        version_numbers = auto_summaries_by_version.keys()
+        snapshot_metadata_models = cls.SNAPSHOT_METADATA_CLASS.get_multi([
+            cls._get_snapshot_id(exploration_id, version_number)
+            for version_number in version_numbers])
+
+        models_to_put = []
+        for (ind, model) in enumerate(snapshot_metadata_models):
+            if model is not None:
+                model.auto_summary = (
+                    auto_summaries_by_version[version_numbers[ind]])
+                models_to_put.append(model)
+        cls.SNAPSHOT_METADATA_CLASS.put_multi(models_to_put)
 
     def _trusted_commit(
-            self, committer_id, commit_type, commit_message, commit_cmds):
+            self, committer_id, commit_type, commit_message, commit_cmds,
+            **kwargs):
         """Record the event to the commit log after the model commit.
 
         Note that this extends the superclass method.
         """
         super(ExplorationModel, self)._trusted_commit(
-            committer_id, commit_type, commit_message, commit_cmds)
+            committer_id, commit_type, commit_message, commit_cmds, **kwargs)
 
         committer_user_settings_model = (
             user_models.UserSettingsModel.get_by_id(committer_id))
@@ -120,6 +180,17 @@ class ExplorationModel(base_models.VersionedModel):
                 exp_rights.status == EXPLORATION_STATUS_PRIVATE)
         ).put_async()
 
+        ExplorationSummaryModel.regenerate_summary(self.id)
+
+    def delete(self, committer_id, commit_message, force_deletion=False):
+        """Deletes the exploration and its summary.
+
+        Note that this extends the superclass method.
+        """
+        super(ExplorationModel, self).delete(
+            committer_id, commit_message, force_deletion=force_deletion)
+        ExplorationSummaryModel.delete_summary(self.id)
+
 
 class ExplorationRightsSnapshotMetadataModel(
         base_models.BaseSnapshotMetadataModel):
@@ -257,6 +328,180 @@ class ExplorationRightsModel(base_models.VersionedModel):
                     self.status == EXPLORATION_STATUS_PRIVATE)
             ).put_async()
 
+        # When an exploration is created, its rights are committed before the
+        # exploration itself, whose commit creates the summary.
+        if commit_type != 'create':
+            ExplorationSummaryModel.regenerate_summary(self.id)
+
+
+class ExplorationSummaryModel(base_models.BaseModel):
+    """Denormalized summary of an exploration and its rights, for listings.
+
+    The id of each instance is the id of the corresponding exploration. An
+    instance is kept in sync with the ExplorationModel and
+    ExplorationRightsModel of the exploration whenever either of them is
+    committed, and is deleted when the exploration is deleted. This allows
+    galleries to be listed without loading the states of each exploration.
+    """
+    # Update superclass model to make this property indexed.
+    last_updated = ndb.DateTimeProperty(auto_now=True, indexed=True)
+
+    # The title of the exploration.
+    title = ndb.StringProperty(required=True, indexed=True)
+    # The category of the exploration.
+    category = ndb.StringProperty(required=True, indexed=True)
+
+    # The user_ids of owners of this exploration.
+    owner_ids = ndb.StringProperty(indexed=True, repeated=True)
+    # The user_ids of users who are allowed to edit this exploration.
+    editor_ids = ndb.StringProperty(indexed=True, repeated=True)
+    # The user_ids of users who are allowed to view this exploration.
+    viewer_ids = ndb.StringProperty(indexed=True, repeated=True)
+    # Whether this exploration is owned by the community.
+    community_owned = ndb.BooleanProperty(indexed=True, default=False)
+    # The exploration id which this exploration was cloned from, or None.
+    cloned_from = ndb.StringProperty(indexed=False)
+    # The publication status of this exploration.
+    status = ndb.StringProperty(indexed=True, required=True)
+    # Whether the exploration is private. Having a separate field for this
+    # allows non-private explorations to be paged through with an equality
+    # filter, since cursors are not supported for IN queries.
+    is_private = ndb.BooleanProperty(indexed=True, required=True)
+
+    @classmethod
+    def update_summary(cls, exploration_model, exploration_rights_model):
+        """Recomputes the summary from the given models and saves it.
+
+        If either model is marked as deleted, the summary is deleted instead.
+        """
+        if exploration_model.deleted or exploration_rights_model.deleted:
+            cls.delete_summary(exploration_model.id)
+            return
+
+        cls(
+            id=exploration_model.id,
+            title=exploration_model.title,
+            category=exploration_model.category,
+            owner_ids=exploration_rights_model.owner_ids,
+            editor_ids=exploration_rights_model.editor_ids,
+            viewer_ids=exploration_rights_model.viewer_ids,
+            community_owned=exploration_rights_model.community_owned,
+            cloned_from=exploration_rights_model.cloned_from,
+            status=exploration_rights_model.status,
+            is_private=(
+                exploration_rights_model.status == EXPLORATION_STATUS_PRIVATE)
+        ).put()
+
+    @classmethod
+    def regenerate_summary(cls, exploration_id):
+        """Recomputes the summary of an exploration from the datastore.
+
+        The exploration and its rights are read and the summary is written in
+        a single transaction. This ensures that concurrent commits to the
+        exploration and to its rights cannot leave a stale summary behind,
+        since whichever regeneration commits last sees both of the latest
+        models.
+        """
+        def _regenerate_summary_in_transaction():
+            exploration_model, exploration_rights_model = ndb.get_multi([
+                ndb.Key(ExplorationModel, exploration_id),
+                ndb.Key(ExplorationRightsModel, exploration_id)])
+            if exploration_model is None or exploration_rights_model is None:
+                cls.delete_summary(exploration_id)
+            else:
+                cls.update_summary(exploration_model, exploration_rights_model)
+
+        transaction_services.run_in_transaction(
+            _regenerate_summary_in_transaction)
+
+    @classmethod
+    def delete_summary(cls, exploration_id):
+        ndb.Key(cls, exploration_id).delete()
+
+    @classmethod
+    @ndb.tasklet
+    def _fetch_page_sorted_by_title_async(
+            cls, query, page_size, urlsafe_start_cursor):
+        """Returns a future for a triple (results, urlsafe_cursor, more) for a
+        page of the given query, as described in fetch_page().
+
+        The results are sorted by title, and then by id so that the order is
+        stable across pages. Raises ValueError if urlsafe_start_cursor is
+        malformed, or was not produced by the same query.
+        """
+        try:
+            if urlsafe_start_cursor:
+                start_cursor = datastore_query.Cursor(
+                    urlsafe=urlsafe_start_cursor)
+            else:
+                start_cursor = None
+
+            result = yield query.order(cls.title, cls.key).fetch_page_async(
+                page_size, start_cursor=start_cursor)
+        except (datastore_errors.BadValueError,
+                datastore_errors.BadRequestError) as e:
+            raise ValueError('Invalid cursor: %s' % e)
+        raise ndb.Return((
+            result[0],
+            (result[1].urlsafe() if result[1] else None),
+            result[2]))
+
+    @classmethod
+    def _fetch_page_sorted_by_title(
+            cls, query, page_size, urlsafe_start_cursor):
+        return cls._fetch_page_sorted_by_title_async(
+            query, page_size, urlsafe_start_cursor).get_result()
+
+    @classmethod
+    def get_non_private(cls, page_size, urlsafe_start_cursor):
+        return cls._fetch_page_sorted_by_title(
+            cls.query(cls.is_private == False),
+            page_size, urlsafe_start_cursor)
+
+    @classmethod
+    def get_non_private_categories(cls):
+        """Returns a sorted list of the categories of non-private
+        explorations.
+        """
+        return sorted(set(
+            model.category for model in cls.query(
+                cls.is_private == False, projection=[cls.category],
+                distinct=True)))
+
+    @classmethod
+    def get_non_private_in_category_async(
+            cls, category, page_size, urlsafe_start_cursor):
+        """Returns a future for a page of non-private explorations in the
+        given category.
+        """
+        return cls._fetch_page_sorted_by_title_async(
+            cls.query(cls.is_private == False, cls.category == category),
+            page_size, urlsafe_start_cursor)
+
+    @classmethod
+    def get_community_owned(cls, page_size, urlsafe_start_cursor):
+        return cls._fetch_page_sorted_by_title(
+            cls.query(cls.community_owned == True),
+            page_size, urlsafe_start_cursor)
+
+    @classmethod
+    def get_viewable(cls, user_id, page_size, urlsafe_start_cursor):
+        return cls._fetch_page_sorted_by_title(
+            cls.query(cls.viewer_ids == user_id),
+            page_size, urlsafe_start_cursor)
+
+    @classmethod
+    def get_editable(cls, user_id, page_size, urlsafe_start_cursor):
+        return cls._fetch_page_sorted_by_title(
+            cls.query(cls.editor_ids == user_id),
+            page_size, urlsafe_start_cursor)
+
+    @classmethod
+    def get_owned(cls, user_id, page_size, urlsafe_start_cursor):
+        return cls._fetch_page_sorted_by_title(
+            cls.query(cls.owner_ids == user_id),
+            page_size, urlsafe_start_cursor)
+
 
 class ExplorationCommitLogEntryModel(base_models.BaseModel):
     """Log of commits to explorations.
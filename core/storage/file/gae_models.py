@@ -21,10 +21,12 @@ __author__ = 'Sean Lip'
 import os
 
 import core.storage.base_model.gae_models as base_models
+import utils
 
 from google.appengine.ext import ndb
 
-QUERY_LIMIT = 1000
+# The maximum number of file chunks to read or write in a single batch.
+MAX_CHUNKS_PER_BATCH = 4
 
 
 class FileMetadataSnapshotMetadataModel(base_models.BaseSnapshotMetadataModel):
@@ -44,18 +46,46 @@ class FileMetadataModel(base_models.VersionedModel):
 
     # The size of the file.
     size = ndb.IntegerProperty(indexed=False)
+    # The hash of the content of the file, which is the id of the
+    # FileContentModel for the content. If this is None, the content is stored
+    # in the corresponding FileModel instead.
+    content_hash = ndb.StringProperty(indexed=False)
 
     def get_new_id(cls, entity_name):
         raise NotImplementedError
 
-    @classmethod
-    def get_undeleted(cls):
-        return cls.get_all().filter(cls.deleted == False).fetch(QUERY_LIMIT)
-
     @classmethod
     def _construct_id(cls, exploration_id, filepath):
         return os.path.join('/', exploration_id, filepath)
 
+    @classmethod
+    def get_undeleted_in_dir(cls, exploration_id, dir_path):
+        """Returns the undeleted metadata models for files under a directory.
+
+        The ids of the models in the directory share a common prefix, so they
+        are fetched with a single key-range query which only reads the models
+        for the given exploration.
+
+        Args:
+            exploration_id: the exploration id.
+            dir_path: the path of the directory, relative to the root of the
+                exploration's file system.
+        """
+        # The trailing slash is necessary to prevent non-identical directory
+        # names with the same prefix from matching, e.g. /abcd/123.png should
+        # not match a query for files under /abc/.
+        prefix = cls._construct_id(exploration_id, dir_path)
+        if not prefix.endswith('/'):
+            prefix += '/'
+        # '0' is the character that immediately follows '/', so every id that
+        # starts with the prefix is less than this upper bound.
+        upper_bound = '%s0' % prefix[:-1]
+
+        return [model for model in cls.query(
+            cls.key >= ndb.Key(cls, prefix),
+            cls.key < ndb.Key(cls, upper_bound)
+        ) if not model.deleted]
+
     @classmethod
     def create(cls, exploration_id, filepath):
         model_id = cls._construct_id(exploration_id, filepath)
@@ -66,6 +96,14 @@ class FileMetadataModel(base_models.VersionedModel):
         model_id = cls._construct_id(exploration_id, filepath)
         return super(FileMetadataModel, cls).get(model_id, strict=strict)
 
+    @classmethod
+    def get_models(cls, exploration_id, filepaths, version_number=None):
+        model_ids = [
+            cls._construct_id(exploration_id, filepath)
+            for filepath in filepaths]
+        return super(FileMetadataModel, cls).get_models(
+            model_ids, version_number)
+
     @classmethod
     def get_version(cls, exploration_id, filepath, version_number):
         model_id = cls._construct_id(exploration_id, filepath)
@@ -77,6 +115,148 @@ class FileMetadataModel(base_models.VersionedModel):
             committer_id, '', commit_cmds)
 
 
+class FileChunkModel(base_models.BaseModel):
+    """A chunk of the content of a file.
+
+    The content of a file is identified by its hash, and is split into chunks
+    of CHUNK_SIZE_BYTES bytes (the last chunk may be shorter), so that files
+    larger than the maximum size of an entity can be stored.
+
+    The id/key of instances of this class has the form
+        [CONTENT_HASH]:[CHUNK_INDEX].
+    """
+    # The size of each chunk, in bytes. This must not be changed, since it
+    # determines the layout of existing content.
+    CHUNK_SIZE_BYTES = 921600
+
+    # Chunks are large, and are read one batch at a time, so they are not
+    # kept in the per-request context cache or in memcache.
+    _use_cache = False
+    _use_memcache = False
+
+    # The bytes in this chunk.
+    content = ndb.BlobProperty(indexed=False)
+
+    @classmethod
+    def _get_chunk_id(cls, content_hash, chunk_index):
+        return '%s:%s' % (content_hash, chunk_index)
+
+    @classmethod
+    def save_chunks(cls, content_hash, raw_bytes):
+        """Stores the given content, which has the given hash, in chunks."""
+        chunks = [cls(
+            id=cls._get_chunk_id(content_hash, chunk_index),
+            content=raw_bytes[start: start + cls.CHUNK_SIZE_BYTES]
+        ) for (chunk_index, start) in enumerate(
+            range(0, len(raw_bytes), cls.CHUNK_SIZE_BYTES))]
+
+        for ind in range(0, len(chunks), MAX_CHUNKS_PER_BATCH):
+            ndb.put_multi(chunks[ind: ind + MAX_CHUNKS_PER_BATCH])
+
+    @classmethod
+    def get_contents(cls, content_hashes_and_sizes):
+        """Returns the contents with the given hashes and sizes.
+
+        All the chunks are read in a single batch, so this should only be used
+        for small contents.
+
+        Args:
+            content_hashes_and_sizes: a list of (content_hash, size) tuples.
+        """
+        chunk_ids = [[
+            cls._get_chunk_id(content_hash, chunk_index)
+            for chunk_index in range(
+                (size + cls.CHUNK_SIZE_BYTES - 1) // cls.CHUNK_SIZE_BYTES)
+        ] for (content_hash, size) in content_hashes_and_sizes]
+        chunks = ndb.get_multi([
+            ndb.Key(cls, chunk_id)
+            for content_chunk_ids in chunk_ids
+            for chunk_id in content_chunk_ids])
+
+        contents = []
+        for content_chunk_ids in chunk_ids:
+            content_chunks = chunks[:len(content_chunk_ids)]
+            chunks = chunks[len(content_chunk_ids):]
+            for (chunk_id, chunk) in zip(content_chunk_ids, content_chunks):
+                if chunk is None:
+                    raise Exception('Chunk %s not found.' % chunk_id)
+            contents.append(''.join(chunk.content for chunk in content_chunks))
+        return contents
+
+    @classmethod
+    def iter_content(cls, content_hash, size, start=0, stop=None):
+        """Yields the bytes of the given content in the range [start, stop).
+
+        Only the chunks that overlap this range are read, a batch at a time,
+        so that the whole content is never held in memory at once.
+
+        Args:
+            content_hash: the hash of the content.
+            size: the size of the content, in bytes.
+            start: the index of the first byte to return.
+            stop: one more than the index of the last byte to return. If this
+                is None, the bytes up to the end of the content are returned.
+        """
+        if stop is None or stop > size:
+            stop = size
+        if start >= stop:
+            return
+
+        first_chunk_index = start // cls.CHUNK_SIZE_BYTES
+        last_chunk_index = (stop - 1) // cls.CHUNK_SIZE_BYTES
+        for batch_start in range(
+                first_chunk_index, last_chunk_index + 1,
+                MAX_CHUNKS_PER_BATCH):
+            chunk_indexes = range(batch_start, min(
+                batch_start + MAX_CHUNKS_PER_BATCH, last_chunk_index + 1))
+            chunks = ndb.get_multi([
+                ndb.Key(cls, cls._get_chunk_id(content_hash, chunk_index))
+                for chunk_index in chunk_indexes])
+
+            for (chunk_index, chunk) in zip(chunk_indexes, chunks):
+                if chunk is None:
+                    raise Exception(
+                        'Chunk %s of content %s not found.' %
+                        (chunk_index, content_hash))
+                chunk_start = chunk_index * cls.CHUNK_SIZE_BYTES
+                yield chunk.content[
+                    max(start - chunk_start, 0): stop - chunk_start]
+
+
+class FileContentModel(base_models.BaseModel):
+    """The content of a file, whose bytes are stored in FileChunkModel
+    entities.
+
+    File contents are content-addressed, so files with identical contents
+    (such as the copies of a file in cloned explorations) share a single
+    stored copy of the content. Contents are never changed once they are
+    stored, and every version of every file that refers to a content keeps
+    referring to it, so contents are never deleted.
+
+    The id/key of instances of this class is the hash of the content.
+    """
+    # The size of the content, in bytes.
+    size = ndb.IntegerProperty(indexed=False)
+
+    @classmethod
+    def get_content_hash(cls, raw_bytes):
+        return utils.convert_to_hash(raw_bytes, 28)
+
+    @classmethod
+    def save_content(cls, raw_bytes):
+        """Stores the given content, if it is not already stored, and returns
+        its hash.
+        """
+        content_hash = cls.get_content_hash(raw_bytes)
+        # The chunks are written before the content model, so if the content
+        # model exists then so do all of its chunks. Concurrent saves of the
+        # same content write identical entities, so they do not conflict.
+        if cls.get_by_id(content_hash) is None:
+            FileChunkModel.save_chunks(content_hash, raw_bytes)
+            cls(id=content_hash, size=len(raw_bytes)).put()
+        return content_hash
+
+
 class FileSnapshotMetadataModel(base_models.BaseSnapshotMetadataModel):
     """Class for storing the file snapshot commit history."""
     pass
@@ -90,7 +270,11 @@ class FileSnapshotContentModel(base_models.BaseSnapshotContentModel):
 
 
 class FileModel(base_models.VersionedModel):
-    """File data model, keyed by exploration id and absolute file name."""
+    """File data model, keyed by exploration id and absolute file name.
+
+    This model is only used for files that were saved before file contents
+    were stored in FileChunkModel entities.
+    """
     SNAPSHOT_METADATA_CLASS = FileSnapshotMetadataModel
     SNAPSHOT_CONTENT_CLASS = FileSnapshotContentModel
 
@@ -123,6 +307,13 @@ class FileModel(base_models.VersionedModel):
         model_id = cls._construct_id(exploration_id, filepath)
         return super(FileModel, cls).get(model_id, strict=strict)
 
+    @classmethod
+    def get_models(cls, exploration_id, filepaths, version_number=None):
+        model_ids = [
+            cls._construct_id(exploration_id, filepath)
+            for filepath in filepaths]
+        return super(FileModel, cls).get_models(model_ids, version_number)
+
     def commit(self, committer_id, commit_cmds):
         return super(FileModel, self).commit(committer_id, '', commit_cmds)
 
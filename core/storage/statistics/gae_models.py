@@ -19,26 +19,45 @@
 __author__ = 'Sean Lip'
 
 import logging
+import operator
+import random
 
 from core.platform import models
 (base_models,) = models.Registry.import_models([models.NAMES.base_model])
+transaction_services = models.Registry.import_transaction_services()
 import utils
 
 from google.appengine.ext import ndb
 
 QUERY_LIMIT = 100
 MAX_ANSWER_HASH_LEN = 100
+# The maximum number of entity groups that a cross-group transaction may
+# touch.
+MAX_ENTITIES_PER_TRANSACTION = 25
+# The number of shards for each state counter.
+NUM_STATE_COUNTER_SHARDS = 20
+# The number of shards for the total answer count of each state rule.
+NUM_ANSWER_LOG_SHARDS = 20
 
 
 def hash_answer(answer):
+    if isinstance(answer, unicode):
+        answer = answer.encode('utf-8')
     return utils.convert_to_hash(answer, MAX_ANSWER_HASH_LEN)
 
 
 class StateCounterModel(base_models.BaseModel):
-    """A set of counts that correspond to a state.
+    """A shard of the set of counts that correspond to a state.
 
-    The id/key of instances of this class has the form
-        [EXPLORATION_ID].[STATE_NAME].
+    The counts for a state are split across NUM_STATE_COUNTER_SHARDS shards,
+    so that concurrent updates to popular states do not contend for a single
+    entity. Each update is applied to a randomly chosen shard, and the counts
+    for the state are the sums of the counts over all of its shards.
+
+    The id/key of the first shard has the form
+        [EXPLORATION_ID].[STATE_NAME]
+    and the id/key of each other shard has the form
+        [EXPLORATION_ID].[STATE_NAME]:[SHARD_INDEX].
     """
     # Number of times the state was entered for the first time in a reader
     # session.
@@ -53,32 +72,59 @@ class StateCounterModel(base_models.BaseModel):
     # subsequently resolved by an exploration admin.
     active_answer_count = ndb.IntegerProperty(default=0, indexed=False)
 
+    # The names of the count properties.
+    COUNT_PROPERTY_NAMES = [
+        'first_entry_count', 'subsequent_entries_count',
+        'resolved_answer_count', 'active_answer_count']
+
+    @classmethod
+    def _get_shard_id(cls, exploration_id, state_name, shard_index):
+        # The first shard keeps the id that was used before counters were
+        # sharded, so that existing counts are still included.
+        counter_id = '.'.join([exploration_id, state_name])
+        if shard_index == 0:
+            return counter_id
+        return '%s:%s' % (counter_id, shard_index)
+
     @classmethod
-    def get_or_create(cls, exploration_id, state_name):
-        instance_id = '.'.join([exploration_id, state_name])
-        counter = cls.get(instance_id, strict=False)
-        if not counter:
-            counter = cls(id=instance_id)
-        return counter
+    def get_random_shard_id(cls, exploration_id, state_name):
+        """Returns the id of a randomly chosen shard for the given state."""
+        return cls._get_shard_id(
+            exploration_id, state_name,
+            random.randint(0, NUM_STATE_COUNTER_SHARDS - 1))
 
     @classmethod
-    def inc(cls, exploration_id, state_name, first_time):
-        """Increments the relevant counter for state entries."""
-        counter = cls.get_or_create(exploration_id, state_name)
+    def get_counts(cls, exploration_id, state_name):
+        """Returns a dict with the counts for a state, summed over shards.
 
-        if first_time:
-            counter.first_entry_count += 1
-        else:
-            counter.subsequent_entries_count += 1
+        The keys of the dict are the names in COUNT_PROPERTY_NAMES.
+        """
+        shards = ndb.get_multi([
+            ndb.Key(cls, cls._get_shard_id(exploration_id, state_name, ind))
+            for ind in range(NUM_STATE_COUNTER_SHARDS)])
 
-        counter.put()
+        counts = {prop_name: 0 for prop_name in cls.COUNT_PROPERTY_NAMES}
+        for shard in shards:
+            if shard is not None:
+                for prop_name in cls.COUNT_PROPERTY_NAMES:
+                    counts[prop_name] += getattr(shard, prop_name)
+        return counts
 
 
 class StateRuleAnswerLogModel(base_models.BaseModel):
-    """The log of all answers hitting a given state rule.
+    """A shard of the summary of the answers hitting a given state rule.
 
-    The id/key of instances of this class has the form
+    The answers themselves are stored as individual StateRuleAnswerModel
+    entities, so that recording an answer only touches a small, fixed number
+    of entities regardless of how many distinct answers have been submitted.
+    This model keeps the total count of unresolved answers for the rule,
+    split across NUM_ANSWER_LOG_SHARDS shards in the same way as
+    StateCounterModel.
+
+    The id/key of the first shard has the form
         [EXPLORATION_ID].[STATE_NAME].[HANDLER_NAME].[RULE_NAME]
+    and the id/key of each other shard has the form
+        [EXPLORATION_ID].[STATE_NAME].[HANDLER_NAME].[RULE_NAME]:[SHARD_INDEX].
 
     WARNING: If a change is made to existing rules in data/objects (e.g.
     renaming them or changing their signature), this class will contain
@@ -87,55 +133,116 @@ class StateRuleAnswerLogModel(base_models.BaseModel):
     WARNING: Rule names and args that are used to construct the key here must
     be < 400 characters in length, since these are used as part of the key.
     """
-    # Log of answers that hit this rule and that have not been resolved. The
+    # Legacy log of answers that hit this rule and that have not been
+    # resolved. This is only set on the first shard, and only for answers that
+    # were recorded before StateRuleAnswerModel was introduced. New answers
+    # are never added to it, but resolved answers are removed from it. The
     # JSON blob represents a dict. The keys of this dict are the answers
     # encoded as HTML strings, and the values are integer counts representing
     # how many times the answer has been entered.
     # WARNING: do not use default={} in JsonProperty, it does not work as you
     # expect.
     answers = ndb.JsonProperty(indexed=False)
+    # The number of unresolved answers recorded in this shard, excluding the
+    # legacy answers above.
+    total_answer_count = ndb.IntegerProperty(default=0, indexed=False)
 
     @classmethod
-    def get_or_create(cls, exploration_id, state_name, handler_name, rule_str):
-        # TODO(sll): Deprecate this method.
-        return cls.get_or_create_multi(exploration_id, [{
-            'state_name': state_name,
-            'handler_name': handler_name,
-            'rule_str': rule_str
-        }])[0]
+    def get_entity_id(cls, exploration_id, state_name, handler_name, rule_str):
+        # TODO(sll): Use a hash instead to disambiguate.
+        return '.'.join([
+            exploration_id, state_name, handler_name, rule_str])[:490]
 
     @classmethod
-    def _get_entity_key(cls, exploration_id, entity_id):
-        return ndb.Key(cls._get_kind(), entity_id)
+    def _get_shard_id(cls, answer_log_id, shard_index):
+        # The first shard keeps the id used before the logs were sharded, so
+        # that existing answer logs are still read.
+        if shard_index == 0:
+            return answer_log_id
+        return '%s:%s' % (answer_log_id, shard_index)
 
     @classmethod
-    def get_or_create_multi(cls, exploration_id, rule_data):
-        """Gets or creates entities for the given rules.
+    def get_random_shard_id(cls, answer_log_id):
+        return cls._get_shard_id(
+            answer_log_id, random.randint(0, NUM_ANSWER_LOG_SHARDS - 1))
 
-        Args:
-            exploration_id: the exploration id
-            rule_data: a list of dicts, each with the following keys:
-                (state_name, handler_name, rule_str).
-        """
-        # TODO(sll): Use a hash instead to disambiguate.
-        entity_ids = ['.'.join([
-            exploration_id, datum['state_name'],
-            datum['handler_name'], datum['rule_str']
-        ])[:490] for datum in rule_data]
 
-        entity_keys = [cls._get_entity_key(exploration_id, entity_id)
-                       for entity_id in entity_ids]
+class StateRuleAnswerModel(base_models.BaseModel):
+    """The number of times a given answer has hit a given state rule.
+
+    The id/key of instances of this class has the form
+        [ANSWER_LOG_ID_HASH].[ANSWER_HASH]
+    where ANSWER_LOG_ID is the id of the first StateRuleAnswerLogModel shard
+    for the rule.
+    """
+    # The id of the first StateRuleAnswerLogModel shard for the rule.
+    answer_log_id = ndb.StringProperty(required=True)
+    # The answer, encoded as an HTML string.
+    answer = ndb.TextProperty(required=True)
+    # The number of times this answer has been entered and not resolved.
+    count = ndb.IntegerProperty(default=0)
 
-        entities = ndb.get_multi(entity_keys)
-        entities_to_put = []
-        for ind, entity in enumerate(entities):
-            if entity is None:
-                new_entity = cls(id=entity_ids[ind], answers={})
-                entities_to_put.append(new_entity)
-                entities[ind] = new_entity
+    @classmethod
+    def get_entity_id(cls, answer_log_id, answer):
+        return '%s.%s' % (hash_answer(answer_log_id), hash_answer(answer))
 
-        ndb.put_multi(entities_to_put)
-        return entities
+
+def get_answer_log_summaries(exploration_id, rule_data, max_answers):
+    """Gets the most frequent unresolved answers for the given rules.
+
+    Args:
+        exploration_id: the exploration id
+        rule_data: a list of dicts, each with the following keys:
+            (state_name, handler_name, rule_str).
+        max_answers: the maximum number of answers to return for each rule.
+
+    Returns:
+        A list with one (answers, total_answer_count) tuple per rule. Here,
+        answers is a dict mapping the (at most max_answers) most frequent
+        unresolved answers to their counts, and total_answer_count is the
+        total count of the unresolved answers for the rule.
+    """
+    answer_log_ids = [StateRuleAnswerLogModel.get_entity_id(
+        exploration_id, datum['state_name'], datum['handler_name'],
+        datum['rule_str']
+    ) for datum in rule_data]
+
+    answer_futures = [
+        StateRuleAnswerModel.query().filter(
+            StateRuleAnswerModel.answer_log_id == answer_log_id
+        ).order(-StateRuleAnswerModel.count).fetch_async(max_answers)
+        for answer_log_id in answer_log_ids]
+    shards = ndb.get_multi([
+        ndb.Key(StateRuleAnswerLogModel,
+                StateRuleAnswerLogModel._get_shard_id(answer_log_id, ind))
+        for answer_log_id in answer_log_ids
+        for ind in range(NUM_ANSWER_LOG_SHARDS)])
+
+    summaries = []
+    for (log_ind, answer_future) in enumerate(answer_futures):
+        answers = {}
+        total_answer_count = 0
+        for answer_model in answer_future.get_result():
+            answers[answer_model.answer] = answer_model.count
+
+        log_shards = shards[
+            log_ind * NUM_ANSWER_LOG_SHARDS:
+            (log_ind + 1) * NUM_ANSWER_LOG_SHARDS]
+        for shard in log_shards:
+            if shard is None:
+                continue
+            total_answer_count += shard.total_answer_count
+            for (answer, count) in (shard.answers or {}).iteritems():
+                answers[answer] = answers.get(answer, 0) + count
+                total_answer_count += count
+
+        if len(answers) > max_answers:
+            answers = dict(sorted(
+                answers.iteritems(), key=operator.itemgetter(1),
+                reverse=True)[:max_answers])
+        summaries.append((answers, total_answer_count))
+
+    return summaries
 
 
 class FeedbackItemModel(base_models.BaseModel):
@@ -184,37 +291,136 @@ class FeedbackItemModel(base_models.BaseModel):
         ).filter(cls.status == 'new').fetch(QUERY_LIMIT)
 
 
-def process_submitted_answer(
-        exploration_id, exploration_version, state_name, handler_name,
-        rule, answer):
-    """Adds an answer to the answer log for the rule it hits.
+def apply_update_batch(update_batch):
+    """Applies a batch of integer property increments in a single
+    transaction, so that either all or none of them are applied.
 
     Args:
-        exploration_id: the exploration id
-        state_name: the state name
-        handler_name: a string representing the handler name (e.g., 'submit')
-        rule: the rule
-        answer: an HTML string representation of the answer
+        update_batch: a dict mapping at most MAX_ENTITIES_PER_TRANSACTION
+            entity keys to (model_class, init_kwargs, deltas) tuples. If the
+            entity does not exist, it is created as
+            model_class(id=key.id(), **init_kwargs). deltas is a dict mapping
+            integer property names to the amount by which the property should
+            be increased.
     """
-    # TODO(sll): Run these two updates in a transaction.
+    def _apply_updates_in_transaction():
+        keys = update_batch.keys()
+        entities = ndb.get_multi(keys)
+        for ind, key in enumerate(keys):
+            (model_class, init_kwargs, deltas) = update_batch[key]
+            if entities[ind] is None:
+                entities[ind] = model_class(id=key.id(), **init_kwargs)
+            for (prop_name, delta) in deltas.iteritems():
+                setattr(entities[ind], prop_name,
+                        getattr(entities[ind], prop_name) + delta)
+        ndb.put_multi(entities)
 
-    answer_log = StateRuleAnswerLogModel.get_or_create(
-        exploration_id, state_name, handler_name, str(rule))
-    if answer in answer_log.answers:
-        answer_log.answers[answer] += 1
-    else:
-        answer_log.answers[answer] = 1
+    transaction_services.run_in_transaction(_apply_updates_in_transaction)
 
-    # This may fail due to answer_log.answers being larger than 1 MB in size.
-    try:
-        answer_log.put()
-    except Exception as e:
-        logging.error(e)
-        pass
 
-    counter = StateCounterModel.get_or_create(exploration_id, state_name)
-    counter.active_answer_count += 1
-    counter.put()
+def _apply_entity_updates(updates_by_key):
+    """Applies integer property increments to the given entities.
+
+    The entities are read and written in batches, each within its own
+    transaction, so that concurrent updates are not lost. If a batch fails,
+    the error is logged and the remaining batches are still applied.
+
+    Args:
+        updates_by_key: a dict mapping entity keys to (model_class,
+            init_kwargs, deltas) tuples, as for apply_update_batch().
+
+    Returns:
+        a list of the batches that were not applied, in the format accepted
+        by apply_update_batch(). None of the updates in these batches have
+        been applied, so each of them can be retried without counting any
+        update twice.
+    """
+    keys = updates_by_key.keys()
+    failed_batches = []
+    for ind in range(0, len(keys), MAX_ENTITIES_PER_TRANSACTION):
+        update_batch = {
+            key: updates_by_key[key]
+            for key in keys[ind: ind + MAX_ENTITIES_PER_TRANSACTION]}
+        try:
+            apply_update_batch(update_batch)
+        except Exception as e:
+            logging.error('Could not apply statistics updates: %s' % e)
+            failed_batches.append(update_batch)
+    return failed_batches
+
+
+def _add_entity_update(updates_by_key, key, model_class, init_kwargs, deltas):
+    """Merges an update into updates_by_key (see _apply_entity_updates)."""
+    key_deltas = updates_by_key.setdefault(
+        key, (model_class, init_kwargs, {}))[2]
+    for (prop_name, delta) in deltas.iteritems():
+        key_deltas[prop_name] = key_deltas.get(prop_name, 0) + delta
+
+
+def apply_stats_deltas(state_counter_deltas, answer_log_deltas):
+    """Applies aggregated updates to state counters and answer logs.
+
+    All the affected entities are read and written in batches, within
+    transactions, so that concurrent updates are not lost. Each answer
+    results in an update to its own StateRuleAnswerModel and to one shard of
+    the total answer count for its rule, so the cost of recording an answer
+    does not grow with the number of answers already recorded.
+
+    The sharded counters are updated first, in their own transactions. The
+    per-answer counts are updated afterwards, in separate transactions: a
+    frequently-submitted answer is a single entity that may be contended,
+    so a failure to update it must not affect the counter updates.
+
+    The updates are applied in batches, and a batch that fails does not stop
+    the remaining batches from being applied. The batches that failed are
+    returned, so that they can be retried later.
+
+    Args:
+        state_counter_deltas: a dict mapping (exploration_id, state_name)
+            tuples to dicts. Each of these maps StateCounterModel property
+            names to the amount by which the property should be increased.
+            The amounts are added to a randomly chosen shard.
+        answer_log_deltas: a dict mapping (exploration_id, state_name,
+            handler_name, rule_str) tuples to dicts. Each of these maps
+            answers (HTML strings) to the number of times they were
+            submitted.
+
+    Returns:
+        a list of the batches of counter and answer updates that could not
+        be applied. Each batch should be retried by passing it to
+        apply_update_batch().
+    """
+    counter_updates_by_key = {}
+    answer_updates_by_key = {}
+    for (key_tuple, deltas) in state_counter_deltas.iteritems():
+        key = ndb.Key(
+            StateCounterModel, StateCounterModel.get_random_shard_id(
+                *key_tuple))
+        _add_entity_update(
+            counter_updates_by_key, key, StateCounterModel, {}, deltas)
+    for (key_tuple, deltas) in answer_log_deltas.iteritems():
+        # Different rules may share an answer log id after it is truncated.
+        answer_log_id = StateRuleAnswerLogModel.get_entity_id(*key_tuple)
+        for (answer, count) in deltas.iteritems():
+            key = ndb.Key(
+                StateRuleAnswerModel,
+                StateRuleAnswerModel.get_entity_id(answer_log_id, answer))
+            _add_entity_update(
+                answer_updates_by_key, key, StateRuleAnswerModel, {
+                    'answer_log_id': answer_log_id,
+                    'answer': answer,
+                }, {'count': count})
+
+        key = ndb.Key(
+            StateRuleAnswerLogModel,
+            StateRuleAnswerLogModel.get_random_shard_id(answer_log_id))
+        _add_entity_update(
+            counter_updates_by_key, key, StateRuleAnswerLogModel, {}, {
+                'total_answer_count': sum(deltas.values())})
+
+    return (
+        _apply_entity_updates(counter_updates_by_key) +
+        _apply_entity_updates(answer_updates_by_key))
 
 
 def resolve_answers(
@@ -231,23 +437,66 @@ def resolve_answers(
     # TODO(sll): Run this in a transaction (together with any updates to the
     # state).
     assert isinstance(answers, list)
-    answer_log = StateRuleAnswerLogModel.get_or_create(
+    # Each answer is resolved at most once.
+    answers = sorted(set(answers))
+    answer_log_id = StateRuleAnswerLogModel.get_entity_id(
         exploration_id, state_name, handler_name, rule_str)
 
+    def _delete_answers_in_transaction(keys):
+        answer_models = ndb.get_multi(keys)
+        ndb.delete_multi([
+            answer_model.key for answer_model in answer_models
+            if answer_model is not None])
+        return answer_models
+
+    answer_keys = [ndb.Key(
+        StateRuleAnswerModel,
+        StateRuleAnswerModel.get_entity_id(answer_log_id, answer)
+    ) for answer in answers]
+    answer_models = []
+    for ind in range(0, len(answer_keys), MAX_ENTITIES_PER_TRANSACTION):
+        answer_models += transaction_services.run_in_transaction(
+            _delete_answers_in_transaction,
+            answer_keys[ind: ind + MAX_ENTITIES_PER_TRANSACTION])
+
+    # Answers recorded before StateRuleAnswerModel was introduced are kept
+    # in the first answer log shard.
+    legacy_answer_log = StateRuleAnswerLogModel.get_by_id(answer_log_id)
+    legacy_answers = (
+        legacy_answer_log.answers if legacy_answer_log is not None else None
+    ) or {}
+
     resolved_count = 0
-    for answer in answers:
-        if answer not in answer_log.answers:
+    legacy_resolved_count = 0
+    for (ind, answer) in enumerate(answers):
+        if answer_models[ind] is None and answer not in legacy_answers:
             logging.error(
                 'Answer %s not found in answer log for rule %s of exploration '
                 '%s, state %s, handler %s' % (
                     answer, rule_str, exploration_id, state_name,
                     handler_name))
-        else:
-            resolved_count += answer_log.answers[answer]
-            del answer_log.answers[answer]
-    answer_log.put()
-
-    counter = StateCounterModel.get_or_create(exploration_id, state_name)
-    counter.active_answer_count -= resolved_count
-    counter.resolved_answer_count += resolved_count
-    counter.put()
+            continue
+        if answer_models[ind] is not None:
+            resolved_count += answer_models[ind].count
+        if answer in legacy_answers:
+            legacy_resolved_count += legacy_answers[answer]
+            del legacy_answers[answer]
+
+    if legacy_resolved_count:
+        legacy_answer_log.put()
+
+    updates_by_key = {}
+    _add_entity_update(updates_by_key, ndb.Key(
+        StateCounterModel, StateCounterModel.get_random_shard_id(
+            exploration_id, state_name)
+    ), StateCounterModel, {}, {
+        'active_answer_count': -(resolved_count + legacy_resolved_count),
+        'resolved_answer_count': resolved_count + legacy_resolved_count,
+    })
+    _add_entity_update(updates_by_key, ndb.Key(
+        StateRuleAnswerLogModel,
+        StateRuleAnswerLogModel.get_random_shard_id(answer_log_id)
+    ), StateRuleAnswerLogModel, {}, {
+        'total_answer_count': -resolved_count,
+    })
+    _apply_entity_updates(updates_by_key)
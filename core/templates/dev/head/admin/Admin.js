@@ -35,6 +35,7 @@ function Admin($scope, $http) {
     $http.get($scope.adminHandlerUrl).success(function(data) {
       $scope.configProperties = data.config_properties;
       $scope.computedProperties = data.computed_properties;
+      $scope.jobs = data.jobs;
     });
   };
 
@@ -120,6 +121,29 @@ function Admin($scope, $http) {
     });
   };
 
+  $scope.startJob = function(jobName) {
+    $scope.message = 'Starting job...';
+
+    var request = $.param({
+      csrf_token: GLOBALS.csrf_token,
+      payload: JSON.stringify({
+        action: 'start_job',
+        job_name: jobName
+      })
+    }, true);
+
+    $http.post(
+      $scope.adminHandlerUrl,
+      request,
+      {headers: {'Content-Type': 'application/x-www-form-urlencoded'}}).
+    success(function(data) {
+      $scope.message = 'Job started successfully.';
+      $scope.reloadConfigProperties();
+    }).error(function(errorResponse) {
+      $scope.message = 'Server error: ' + errorResponse.error;
+    });
+  };
+
   $scope.reloadExploration = function(explorationId) {
     if ($scope.message == 'Processing...') {
       return;
@@ -22,6 +22,9 @@ function LearnGallery($scope, $http, $rootScope, warningsData, oppiaRequestCreat
   $scope.learnGalleryDataUrl = '/learnhandler/data';
   $scope.categoryList = [];
   $scope.categories = {};
+  // The cursor at which the next page of each category starts, or null if
+  // all the explorations in that category have been loaded.
+  $scope.cursors = {};
   // The default is to show only explorations that have moved out of beta or
   // that this user has been invited to playtest.
   $scope.areAllBetaExplorationsShown = false;
@@ -34,6 +37,7 @@ function LearnGallery($scope, $http, $rootScope, warningsData, oppiaRequestCreat
   // Retrieves gallery data from the server.
   $http.get($scope.learnGalleryDataUrl).success(function(data) {
     $scope.categories = data.categories;
+    $scope.cursors = data.cursors;
 
     // Put the category names in a list.
     for (var category in $scope.categories) {
@@ -75,6 +79,26 @@ function LearnGallery($scope, $http, $rootScope, warningsData, oppiaRequestCreat
     }
   };
 
+  // Retrieves the next page of explorations in the given category.
+  $scope.loadMoreExplorations = function(category) {
+    var cursor = $scope.cursors[category];
+    if (!cursor) {
+      return;
+    }
+
+    $http.get(
+      $scope.learnGalleryDataUrl + '?category=' + encodeURIComponent(category) +
+      '&cursor=' + encodeURIComponent(cursor)
+    ).success(function(data) {
+      $scope.categories[category] = $scope.categories[category].concat(
+        data.categories[category] || []);
+      $scope.cursors[category] = data.cursors[category] || null;
+      $scope.initializeDisplay();
+    }).error(function(data) {
+      warningsData.addWarning(data.error || 'Error communicating with server.');
+    });
+  };
+
   $scope.showBetaExplorations = function() {
     $scope.areAllBetaExplorationsShown = true;
     $scope.initializeDisplay();
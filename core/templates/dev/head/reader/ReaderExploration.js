@@ -71,6 +71,7 @@ function ReaderExploration(
 
     messengerService.sendMessage(
       messengerService.EXPLORATION_RESET, $scope.stateName);
+    $scope.flushEvents();
     $scope.initializePage();
   };
 
@@ -173,6 +174,9 @@ function ReaderExploration(
     $scope.stateName = data.state_name;
     $scope.title = data.title;
     $scope.stateHistory = data.state_history;
+    // If this is non-null, answers that it covers are classified client-side.
+    $scope.stateMachine = data.state_machine;
+    $scope.eventQueue = [];
 
     messengerService.sendMessage(messengerService.EXPLORATION_LOADED, null);
     $scope.showPage = true;
@@ -184,6 +188,17 @@ function ReaderExploration(
       return;
     }
 
+    var clientSideData = $scope.getClientSideTransitionData(answer, handler);
+    if (clientSideData) {
+      messengerService.sendMessage(messengerService.STATE_TRANSITION, {
+        oldStateName: $scope.stateName,
+        jsonAnswer: JSON.stringify(answer),
+        newStateName: clientSideData.state_name
+      });
+      $scope.refreshPage(clientSideData);
+      return;
+    }
+
     var requestMap = {
       answer: answer,
       handler: handler,
@@ -213,6 +228,111 @@ function ReaderExploration(
     });
   };
 
+  // The maximum number of reader events to hold before sending them to the
+  // server.
+  $scope.MAX_QUEUED_EVENTS = 10;
+
+  $scope.recordEvent = function(event) {
+    $scope.eventQueue.push(event);
+    if ($scope.eventQueue.length >= $scope.MAX_QUEUED_EVENTS) {
+      $scope.flushEvents();
+    }
+  };
+
+  // Sends the queued reader events to the server. If isPageUnloading is true,
+  // the events are sent in a way that is not cancelled when the page unloads.
+  $scope.flushEvents = function(isPageUnloading) {
+    if (!$scope.eventQueue || $scope.eventQueue.length === 0) {
+      return;
+    }
+
+    var requestMap = {
+      events: $scope.eventQueue,
+      version: $scope.stateMachine.version
+    };
+    $scope.eventQueue = [];
+
+    var eventsUrl = '/explorehandler/events/' + $scope.explorationId;
+    var requestBody = oppiaRequestCreator.createRequest(requestMap);
+    var contentType = 'application/x-www-form-urlencoded';
+
+    if (!isPageUnloading) {
+      $http.post(
+          eventsUrl, requestBody, {headers: {'Content-Type': contentType}});
+      return;
+    }
+
+    // Browsers usually cancel asynchronous requests that are still pending
+    // when the page unloads, so the last batch of events is sent using a
+    // beacon. If beacons are not supported, or the beacon cannot be queued,
+    // a synchronous request is used instead.
+    if ($window.navigator.sendBeacon && $window.navigator.sendBeacon(
+        eventsUrl, new Blob([requestBody], {type: contentType}))) {
+      return;
+    }
+    var xhr = new XMLHttpRequest();
+    xhr.open('POST', eventsUrl, false);
+    xhr.setRequestHeader('Content-Type', contentType);
+    xhr.send(requestBody);
+  };
+
+  $window.addEventListener('beforeunload', function() {
+    $scope.flushEvents(true);
+  });
+
+  // Returns the transition data for an answer, computed using the client-side
+  // state machine, in the same format as the server's response. Returns null
+  // if the answer must be sent to the server instead.
+  $scope.getClientSideTransitionData = function(answer, handler) {
+    if (!$scope.stateMachine) {
+      return null;
+    }
+
+    var oldState = $scope.stateMachine.states[$scope.stateName];
+    var outcomes = oldState.outcomes[handler];
+    if (!outcomes || !outcomes.hasOwnProperty(String(answer))) {
+      return null;
+    }
+
+    var outcome = outcomes[String(answer)];
+    var newStateName = outcome.dest;
+    var finished = (newStateName === $scope.stateMachine.end_dest);
+    var newState = finished ? null : $scope.stateMachine.states[newStateName];
+    var sticky = (
+      !finished && newState.sticky &&
+      newState.widget_id === oldState.widget_id);
+    var stateHasChanged = (newStateName !== $scope.stateName);
+
+    $scope.recordEvent({
+      type: 'state_hit',
+      state_name: newStateName,
+      first_time: ($scope.stateHistory.indexOf(newStateName) === -1)
+    });
+    $scope.recordEvent({
+      type: 'answer_submitted',
+      state_name: $scope.stateName,
+      handler: handler,
+      answer: answer
+    });
+    if (finished) {
+      $scope.flushEvents();
+    }
+
+    var feedbackHtmls = outcome.feedback_html;
+    return {
+      reader_response_html: outcome.reader_response_html,
+      feedback_html: feedbackHtmls[
+        Math.floor(Math.random() * feedbackHtmls.length)],
+      question_html: (
+        (finished || !stateHasChanged) ? '' : newState.content_html),
+      interactive_html: (finished || sticky) ? '' : newState.interactive_html,
+      state_name: newStateName,
+      finished: finished,
+      params: finished ? {} : {answer: answer},
+      state_history: $scope.stateHistory.concat([newStateName])
+    };
+  };
+
   $scope.refreshPage = function(data) {
     warningsData.clear();
     $scope.answerIsBeingProcessed = false;
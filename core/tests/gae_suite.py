@@ -65,7 +65,7 @@ sys.path.append(root_dir)
 
 import feconf
 
-EXPECTED_TEST_COUNT = 262
+EXPECTED_TEST_COUNT = 306
 
 
 _PARSER = argparse.ArgumentParser()
@@ -18,6 +18,8 @@ import unittest
 import webtest
 
 from core.domain import config_domain
+from core.domain import exp_domain
+from core.domain import exp_services
 from core.platform import models
 (base_models, exp_models, file_models, stats_models, user_models) = (
     models.Registry.import_models([
@@ -29,6 +31,7 @@ from core.platform import models
 current_user_services = models.Registry.import_current_user_services()
 import feconf
 import main
+import utils
 
 import json
 
@@ -77,12 +80,16 @@ class TestBase(unittest.TestCase):
             exp_models.ExplorationSnapshotContentModel,
             exp_models.ExplorationRightsSnapshotMetadataModel,
             exp_models.ExplorationRightsSnapshotContentModel,
+            exp_models.ExplorationSummaryModel,
             file_models.FileMetadataSnapshotMetadataModel,
             file_models.FileMetadataSnapshotContentModel,
             file_models.FileSnapshotMetadataModel,
             file_models.FileSnapshotContentModel,
+            file_models.FileChunkModel,
+            file_models.FileContentModel,
             stats_models.StateCounterModel,
             stats_models.StateRuleAnswerLogModel,
+            stats_models.StateRuleAnswerModel,
             stats_models.FeedbackItemModel,
             user_models.UserSettingsModel,
         ])
@@ -218,6 +225,18 @@ class TestBase(unittest.TestCase):
     def get_user_id_from_email(self, email):
         return current_user_services.get_user_id_from_email(email)
 
+    def save_new_valid_exploration(self, exploration_id, owner_id):
+        """Saves a new strictly-validated exploration.
+
+        Returns the exploration domain object.
+        """
+        exploration = exp_domain.Exploration.create_default_exploration(
+            exploration_id, 'A title', 'A category')
+        exploration.states[exploration.init_state_name].widget.handlers[
+            0].rule_specs[0].dest = feconf.END_DEST
+        exp_services.save_new_exploration(owner_id, exploration)
+        return exploration
+
 
 class AppEngineTestBase(TestBase):
     """Base class for tests requiring App Engine services."""
@@ -234,6 +253,22 @@ class AppEngineTestBase(TestBase):
         os.environ['USER_ID'] = ''
         del os.environ['USER_IS_ADMIN']
 
+    def process_deferred_tasks(self):
+        """Runs the tasks in the default queue, including any tasks that they
+        add, until the queue is empty. Returns the number of tasks that ran.
+        """
+        from google.appengine.ext import deferred
+
+        num_tasks_run = 0
+        tasks = self.taskq.get_filtered_tasks(queue_names=['default'])
+        while tasks:
+            self.taskq.FlushQueue('default')
+            for task in tasks:
+                deferred.run(task.payload)
+                num_tasks_run += 1
+            tasks = self.taskq.get_filtered_tasks(queue_names=['default'])
+        return num_tasks_run
+
     def setUp(self):  # pylint: disable-msg=g-bad-name
         empty_environ()
 
@@ -256,6 +291,10 @@ class AppEngineTestBase(TestBase):
         self.testbed.init_taskqueue_stub()
         self.taskq = self.testbed.get_stub(testbed.TASKQUEUE_SERVICE_NAME)
 
+        # Values loaded by a previous test must not outlive its datastore.
+        utils.RequestCache.end_request()
+        config_domain.Registry.invalidate_computed_properties()
+
         # Set up the app to be tested.
         self.testapp = webtest.TestApp(main.app)
 
@@ -50,6 +50,9 @@ class Copier(value_generators_domain.BaseValueGenerator):
         else:
             return copy.deepcopy(value)
 
+    def generates_constant_value(self, value, parse_with_jinja=False):
+        return not (parse_with_jinja and jinja_utils.has_jinja_syntax(value))
+
 
 class RandomSelector(value_generators_domain.BaseValueGenerator):
     """Returns a random value from the input list."""
@@ -87,6 +90,9 @@ class RestrictedCopier(value_generators_domain.BaseValueGenerator):
                 'Value must be one of %s; received %s' % (self.choices, value))
         return copy.deepcopy(value)
 
+    def generates_constant_value(self, value, parse_with_jinja=False):
+        return not (parse_with_jinja and jinja_utils.has_jinja_syntax(value))
+
 
 class RangeRestrictedCopier(value_generators_domain.BaseValueGenerator):
     """Returns the input, after checking it is in a given interval."""
@@ -112,3 +118,6 @@ class RangeRestrictedCopier(value_generators_domain.BaseValueGenerator):
                 'Value must be between %s and %s, inclusive; received %s' %
                 (self.min_value, self.max_value, value))
         return copy.deepcopy(value)
+
+    def generates_constant_value(self, value):
+        return True
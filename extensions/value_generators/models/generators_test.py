@@ -35,10 +35,18 @@ class ValueGeneratorUnitTests(test_utils.GenericTestBase):
         self.assertEqual(generator.generate_value(
             {'a': 'b'}, **{'value': '{{a}}', 'parse_with_jinja': True}), 'b')
 
+        self.assertTrue(generator.generates_constant_value(value='{{a}}'))
+        self.assertTrue(generator.generates_constant_value(
+            value=['a'], parse_with_jinja=True))
+        self.assertFalse(generator.generates_constant_value(
+            value=['{{a}}'], parse_with_jinja=True))
+
     def test_random_selector(self):
         generator = generators.RandomSelector()
         self.assertIn(generator.generate_value(
             {}, **{'list_of_values': ['a', 'b', 'c']}), ['a', 'b', 'c'])
+        self.assertFalse(generator.generates_constant_value(
+            list_of_values=['a', 'b', 'c']))
 
     def test_restricted_copier(self):
         with self.assertRaises(TypeError):
@@ -46,3 +46,7 @@ class Continue(widget_domain.BaseWidget):
     # containing this widget. These should correspond to names of files in
     # feconf.DEPENDENCIES_TEMPLATES_DIR.
     _dependency_ids = []
+
+    def get_possible_answers(self, handler_name, state_customization_args):
+        # The frontend always submits an empty string.
+        return ['']
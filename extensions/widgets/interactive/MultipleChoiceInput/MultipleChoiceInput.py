@@ -49,3 +49,9 @@ class MultipleChoiceInput(widget_domain.BaseWidget):
     # containing this widget. These should correspond to names of files in
     # feconf.DEPENDENCIES_TEMPLATES_DIR.
     _dependency_ids = []
+
+    def get_possible_answers(self, handler_name, state_customization_args):
+        # The frontend submits the index of the selected choice.
+        choices = self._get_widget_param_instances(
+            state_customization_args, {})['choices']
+        return range(len(choices))
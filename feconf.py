@@ -120,7 +120,71 @@ ADMIN_COMMITTER_ID = 'admin'
 ADMIN_EMAIL_ADDRESS = 'admin@oppia'
 
 # The maximum size of an uploaded file, in bytes.
-MAX_FILE_SIZE_BYTES = 1048576
+MAX_FILE_SIZE_BYTES = 10485760
+
+# The maximum size of a file, in bytes, that may be cached in memcache. Items
+# stored in memcache must be smaller than 1 MB, including their keys.
+MAX_MEMCACHED_FILE_SIZE_BYTES = 921600
+
+# The maximum number of compiled answer handlers (one per exploration version,
+# state and handler name) to keep in the memory of each instance.
+MAX_COMPILED_HANDLERS_IN_CACHE = 500
+
+# The maximum number of compiled Jinja templates for parsed strings to keep in
+# the memory of each instance.
+MAX_JINJA_TEMPLATES_IN_CACHE = 500
+
+# The maximum number of precomputed interactive widget tags (one per
+# exploration version and state) to keep in the memory of each instance.
+MAX_WIDGET_TAGS_IN_CACHE = 500
+
+# The maximum number of precomputed reader page bundles (one per exploration
+# version) to keep in the memory of each instance.
+MAX_READER_BUNDLES_IN_CACHE = 200
+
+# The maximum number of historical exploration versions to keep in the memory
+# of each instance.
+MAX_EXPLORATION_VERSIONS_IN_CACHE = 100
+
+# The number of seconds for which exploration rights are cached in memcache.
+EXPLORATION_RIGHTS_CACHE_TTL_SECS = 300
+
+# The number of seconds after a cached value is deleted from memcache, because
+# the value changed, during which memcache_services.add_multi() will not put
+# a value for the same key back. This should be longer than a request that
+# loads the value from the datastore can take.
+MEMCACHE_DELETE_LOCK_SECS = 60
+
+# The number of seconds for which small files are cached in memcache.
+FILE_CACHE_TTL_SECS = 3600
+
+# The number of seconds for which the summed counts of a state are cached in
+# memcache. This bounds how long a stale sum, which was computed just before
+# the counts changed, can be served for.
+STATE_COUNTER_CACHE_TTL_SECS = 60
+
+# The number of seconds for which browsers may reuse a specific version of an
+# image without revalidating it.
+VERSIONED_IMAGE_CACHE_MAX_AGE_SECS = 3600
+
+# The maximum number of reader events accepted in a single request to the
+# stats events handler. Readers send their events in smaller batches than
+# this.
+MAX_EVENTS_PER_STATS_REQUEST = 50
+
+# The number of seconds for which each instance keeps the value of a computed
+# config property before recomputing it. Changes to config properties made on
+# the same instance take effect immediately.
+COMPUTED_PROPERTY_CACHE_TTL_SECS = 60
+
+# The number of explorations per category in each page of the learners'
+# gallery.
+LEARN_GALLERY_PAGE_SIZE = 20
+
+# The number of seconds for which the first page of the learners' gallery is
+# cached in memcache. Changes to explorations may take this long to appear on
+# it.
+LEARN_GALLERY_FIRST_PAGE_CACHE_TTL_SECS = 60
 
 # An ordered list of links to stand-alone pages to display in the 'About' tab.
 # Each item is a dict with two keys: the human-readable name of the link and
@@ -234,6 +298,7 @@ EXPLORATION_DATA_PREFIX = '/createhandler/data'
 EXPLORATION_URL_PREFIX = '/explore'
 EXPLORATION_INIT_URL_PREFIX = '/explorehandler/init'
 EXPLORATION_TRANSITION_URL_PREFIX = '/explorehandler/transition'
+EXPLORATION_EVENTS_URL_PREFIX = '/explorehandler/events'
 LEARN_GALLERY_URL = '/learn'
 LEARN_GALLERY_DATA_URL = '/learnhandler/data'
 NEW_EXPLORATION_URL = '/contributehandler/create_new'
@@ -19,10 +19,24 @@ import logging
 import os
 import math
 
+from core import counters
+import feconf
+import utils
+
 import jinja2
 from jinja2 import meta
 import json
 
+# The delimiters that mark the start of Jinja syntax in a template string.
+JINJA_START_DELIMITERS = ['{{', '{%', '{#']
+
+# Jinja environments for parse_string(), keyed by their autoescape setting.
+_STRING_ENVS = {}
+# An in-process cache of compiled templates for parse_string(). Each key is a
+# (string, autoescape) tuple, and the corresponding value is a 2-tuple whose
+# elements are the compiled template and the set of its undeclared variables.
+_STRING_TEMPLATE_CACHE = utils.LRUCache(feconf.MAX_JINJA_TEMPLATES_IN_CACHE)
+
 
 class JinjaConfig(object):
     """Contains Jinja configuration properties."""
@@ -67,9 +81,77 @@ def get_jinja_env(dir_path):
     return env
 
 
+def _get_string_env(autoescape):
+    """Returns the shared Jinja environment for parsing strings."""
+    if autoescape not in _STRING_ENVS:
+        env = jinja2.Environment(autoescape=autoescape)
+        env.filters.update(JinjaConfig.FILTERS)
+        _STRING_ENVS[autoescape] = env
+    return _STRING_ENVS[autoescape]
+
+
+def has_jinja_syntax(obj):
+    """Returns whether any string within `obj` contains Jinja syntax.
+
+    Only the strings that evaluate_object() would parse are checked, i.e.
+    dict keys are ignored.
+    """
+    if isinstance(obj, basestring):
+        return any([delimiter in obj for delimiter in JINJA_START_DELIMITERS])
+    elif isinstance(obj, list):
+        return any([has_jinja_syntax(item) for item in obj])
+    elif isinstance(obj, dict):
+        return any([has_jinja_syntax(value) for value in obj.values()])
+    else:
+        return False
+
+
+def _render_string_without_jinja_syntax(string):
+    """Returns what Jinja would render for a string with no Jinja syntax.
+
+    Jinja normalizes all newlines to '\\n' and removes a single trailing
+    newline, so the same is done here.
+    """
+    try:
+        result = unicode(string)
+    except UnicodeDecodeError:
+        raise Exception('Unable to parse string with Jinja: %s' % string)
+
+    result = result.replace('\r\n', '\n').replace('\r', '\n')
+    if result.endswith('\n'):
+        result = result[:-1]
+    return result
+
+
+def _get_compiled_template(string, autoescape):
+    """Returns a (template, undeclared_variables) tuple for the string."""
+    cache_key = (string, autoescape)
+    cached_value = _STRING_TEMPLATE_CACHE.get(cache_key)
+    if cached_value is not None:
+        counters.JINJA_TEMPLATE_CACHE_HIT.inc()
+        return cached_value
+
+    counters.JINJA_TEMPLATE_CACHE_MISS.inc()
+    env = _get_string_env(autoescape)
+    try:
+        parsed_string = env.parse(string)
+    except Exception:
+        raise Exception('Unable to parse string with Jinja: %s' % string)
+
+    value = (
+        env.from_string(parsed_string),
+        meta.find_undeclared_variables(parsed_string))
+    _STRING_TEMPLATE_CACHE.set(cache_key, value)
+    return value
+
+
 def parse_string(string, params, autoescape=True):
     """Parses a string using Jinja templating.
 
+    Compiled templates are cached in-process, keyed by the string and the
+    autoescape setting. Strings that contain no Jinja syntax are returned
+    without being passed through Jinja at all.
+
     Args:
       string: the string to be parsed.
       params: the parameters to parse the string with.
@@ -78,25 +160,20 @@ def parse_string(string, params, autoescape=True):
     Returns:
       the parsed string, or None if the string could not be parsed.
     """
-    env = jinja2.Environment(autoescape=autoescape)
-
-    env.filters.update(JinjaConfig.FILTERS)
-    try:
-        parsed_string = env.parse(string)
-    except Exception:
-        raise Exception('Unable to parse string with Jinja: %s' % string)
+    if not has_jinja_syntax(string):
+        return _render_string_without_jinja_syntax(string)
 
-    variables = meta.find_undeclared_variables(parsed_string)
+    template, variables = _get_compiled_template(string, autoescape)
     if any([var not in params for var in variables]):
         logging.info('Cannot parse %s fully using %s', string, params)
 
     try:
-        return env.from_string(string).render(params)
+        return template.render(params)
     except Exception:
         logging.error(
             'jinja_utils.parse_string() failed with args: %s, %s, %s' %
             (string, params, autoescape))
-        return env.from_string('[CONTENT PARSING ERROR]').render({})
+        return u'[CONTENT PARSING ERROR]'
 
 
 def evaluate_object(obj, params):
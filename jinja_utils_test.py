@@ -16,6 +16,7 @@
 
 __author__ = 'Sean Lip'
 
+from core import counters
 import jinja_utils
 import test_utils
 
@@ -63,6 +64,42 @@ class JinjaUtilsUnitTests(test_utils.GenericTestBase):
         parsed_str = jinja_utils.parse_string('int {{i}}', {'i': 2})
         self.assertEqual(parsed_str, 'int 2')
 
+    def test_parse_string_caches_compiled_templates(self):
+        template = 'cached {{test}} template'
+        misses_before = counters.JINJA_TEMPLATE_CACHE_MISS.value
+        hits_before = counters.JINJA_TEMPLATE_CACHE_HIT.value
+
+        self.assertEqual(
+            jinja_utils.parse_string(template, {'test': 'a'}),
+            'cached a template')
+        self.assertEqual(
+            jinja_utils.parse_string(template, {'test': '<b>'}),
+            'cached &lt;b&gt; template')
+        self.assertEqual(
+            jinja_utils.parse_string(
+                template, {'test': '<b>'}, autoescape=False),
+            'cached <b> template')
+
+        # The template is compiled once for each autoescape setting, and the
+        # repeated autoescaped parse reuses the cached template.
+        self.assertEqual(
+            counters.JINJA_TEMPLATE_CACHE_MISS.value - misses_before, 2)
+        self.assertEqual(
+            counters.JINJA_TEMPLATE_CACHE_HIT.value - hits_before, 1)
+
+    def test_parse_string_without_jinja_syntax(self):
+        misses_before = counters.JINJA_TEMPLATE_CACHE_MISS.value
+
+        # The output matches what Jinja itself would produce.
+        self.assertEqual(
+            jinja_utils.parse_string('<p>a & b</p>', {}), '<p>a & b</p>')
+        self.assertEqual(
+            jinja_utils.parse_string('a\r\nb\n', {}), 'a\nb')
+        self.assertEqual(jinja_utils.parse_string('', {}), '')
+
+        self.assertEqual(
+            counters.JINJA_TEMPLATE_CACHE_MISS.value, misses_before)
+
     def test_evaluate_object(self):
         parsed_object = jinja_utils.evaluate_object('abc', {})
         self.assertEqual(parsed_object, 'abc')
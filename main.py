@@ -161,6 +161,9 @@ urls = [
         (r'%s/<exploration_id>/<escaped_state_name>'
          % feconf.EXPLORATION_TRANSITION_URL_PREFIX),
         reader.FeedbackHandler, 'feedback_handler'),
+    get_redirect_route(
+        r'%s/<exploration_id>' % feconf.EXPLORATION_EVENTS_URL_PREFIX,
+        reader.StatsEventsHandler, 'stats_events_handler'),
     get_redirect_route(
         r'/explorehandler/give_feedback/<exploration_id>/<escaped_state_name>',
         reader.ReaderFeedbackHandler, 'reader_feedback_handler'),
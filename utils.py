@@ -17,6 +17,8 @@
 __author__ = 'sll@google.com (Sean Lip)'
 
 import base64
+import collections
+import copy
 import hashlib
 import json
 import os
@@ -209,6 +211,48 @@ def recursively_remove_key(obj, key_to_remove):
             recursively_remove_key(obj[key], key_to_remove)
 
 
+def get_dict_diff(old_dict, new_dict):
+    """Returns a list of operations that transforms old_dict into new_dict.
+
+    Nested dicts are compared recursively; all other values (including lists)
+    are replaced as a whole when they differ. Each operation is a dict with
+    keys 'op' ('set' or 'remove') and 'path' (a list of dict keys), and, for
+    'set' operations, 'value'. The operations can be applied using
+    apply_dict_diff().
+    """
+    diff = []
+    for key in old_dict:
+        if key not in new_dict:
+            diff.append({'op': 'remove', 'path': [key]})
+    for key, value in new_dict.iteritems():
+        if key not in old_dict:
+            diff.append({'op': 'set', 'path': [key], 'value': value})
+        elif isinstance(value, dict) and isinstance(old_dict[key], dict):
+            for item in get_dict_diff(old_dict[key], value):
+                item['path'] = [key] + item['path']
+                diff.append(item)
+        elif value != old_dict[key]:
+            diff.append({'op': 'set', 'path': [key], 'value': value})
+    return diff
+
+
+def apply_dict_diff(adict, diff):
+    """Applies a list of operations from get_dict_diff() to adict in place,
+    and returns adict.
+    """
+    for item in diff:
+        parent = adict
+        for key in item['path'][:-1]:
+            parent = parent[key]
+        if item['op'] == 'remove':
+            del parent[item['path'][-1]]
+        elif item['op'] == 'set':
+            parent[item['path'][-1]] = copy.deepcopy(item['value'])
+        else:
+            raise Exception('Invalid dict diff operation: %s' % item['op'])
+    return adict
+
+
 def get_random_int(upper_bound):
     """Returns a random integer in [0, upper_bound)."""
     assert upper_bound >= 0 and isinstance(upper_bound, int)
@@ -313,3 +357,103 @@ def convert_to_hash(string, max_length):
         hashlib.sha1(string).digest())
 
     return encoded_string[:max_length]
+
+
+class LRUCache(object):
+    """A bounded in-process cache that evicts its least-recently-used items.
+
+    This cache is local to a single instance; it is not shared across
+    instances, and its contents do not survive instance restarts.
+    """
+
+    def __init__(self, max_size):
+        if max_size < 1:
+            raise Exception('Invalid LRU cache size: %s' % max_size)
+        self._max_size = max_size
+        self._items = collections.OrderedDict()
+
+    def get(self, key, default=None):
+        """Returns the value for key, or default if it is not in the cache."""
+        if key not in self._items:
+            return default
+
+        # Move the key to the most-recently-used end of the ordering.
+        value = self._items.pop(key)
+        self._items[key] = value
+        return value
+
+    def set(self, key, value):
+        """Adds or replaces the value for key, evicting an item if needed."""
+        if key in self._items:
+            del self._items[key]
+        elif len(self._items) >= self._max_size:
+            self._items.popitem(last=False)
+        self._items[key] = value
+
+    def delete(self, key):
+        """Removes key from the cache, if it is present."""
+        self._items.pop(key, None)
+
+    def clear(self):
+        """Removes all items from the cache."""
+        self._items.clear()
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+
+class RequestCache(object):
+    """An in-process cache whose contents are only valid during a single
+    request.
+
+    Values are only stored while a request is being handled, i.e. between
+    calls to RequestCache.start_request() and RequestCache.end_request(), and
+    every cache is emptied at both of these points. Outside a request (for
+    example, in background jobs), lookups always miss.
+    """
+
+    # All the request caches that have been created.
+    _instances = []
+    # Whether a request is currently being handled.
+    _is_active = False
+
+    def __init__(self):
+        self._items = {}
+        RequestCache._instances.append(self)
+
+    @classmethod
+    def start_request(cls):
+        """Empties all request caches, and starts storing values in them."""
+        for instance in cls._instances:
+            instance.clear()
+        RequestCache._is_active = True
+
+    @classmethod
+    def end_request(cls):
+        """Empties all request caches, and stops storing values in them."""
+        RequestCache._is_active = False
+        for instance in cls._instances:
+            instance.clear()
+
+    def get(self, key, default=None):
+        """Returns the value for key, or default if it is not in the cache."""
+        return self._items.get(key, default)
+
+    def set(self, key, value):
+        """Adds or replaces the value for key, if a request is active."""
+        if RequestCache._is_active:
+            self._items[key] = value
+
+    def delete(self, key):
+        """Removes key from the cache, if it is present."""
+        self._items.pop(key, None)
+
+    def clear(self):
+        """Removes all items from the cache."""
+        self._items.clear()
+
+    def __contains__(self, key):
+        return key in self._items
@@ -136,3 +136,42 @@ class UtilsTests(test_utils.GenericTestBase):
         self.assertEqual(len(full_hash), 28)
         self.assertEqual(len(abbreviated_hash), 5)
         self.assertEqual(full_hash[:5], abbreviated_hash)
+
+    def test_lru_cache(self):
+        """Test the LRUCache class."""
+        cache = utils.LRUCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+
+        # 'b' is now the least-recently-used key, so it gets evicted.
+        cache.set('c', 3)
+        self.assertNotIn('b', cache)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('b', 'default'), 'default')
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual(len(cache), 2)
+
+        cache.delete('a')
+        self.assertNotIn('a', cache)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_dict_diff(self):
+        """Test the get_dict_diff() and apply_dict_diff() methods."""
+        old_dict = {
+            'a': 1,
+            'b': {'c': [1, 2], 'd': {'e': 'f'}, 'g': 'h'},
+            'i': 'j',
+        }
+        new_dict = {
+            'a': 1,
+            'b': {'c': [1, 2, 3], 'd': {'e': 'f'}, 'k': 'l'},
+            'm': {'n': 'o'},
+        }
+
+        diff = utils.get_dict_diff(old_dict, new_dict)
+        self.assertEqual(len(diff), 5)
+        self.assertEqual(utils.apply_dict_diff(old_dict, diff), new_dict)
+        self.assertEqual(utils.get_dict_diff(new_dict, new_dict), [])